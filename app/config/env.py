@@ -121,6 +121,95 @@ TASKS_RESET_USER_DATA_USAGE = config(
     "TASKS_RESET_USER_DATA_USAGE", default=3600, cast=int
 )
 
+# users seen from more source IPs than their ip_limit are taken off the nodes for this long
+IP_LIMIT_RESTRICT_DURATION = config(
+    "IP_LIMIT_RESTRICT_DURATION", default=300, cast=int
+)
+
+# peak events streaming to dashboard viewers
+PEAK_STREAM_SUBSCRIBER_QUEUE_SIZE = config(
+    "PEAK_STREAM_SUBSCRIBER_QUEUE_SIZE", default=256, cast=int
+)
+PEAK_STREAM_RECONNECT_DELAY = config(
+    "PEAK_STREAM_RECONNECT_DELAY", default=5, cast=float
+)
+
+# backend logs streaming to dashboard viewers
+LOG_STREAM_SUBSCRIBER_QUEUE_SIZE = config(
+    "LOG_STREAM_SUBSCRIBER_QUEUE_SIZE", default=64, cast=int
+)
+LOG_STREAM_RECONNECT_DELAY = config(
+    "LOG_STREAM_RECONNECT_DELAY", default=5, cast=float
+)
+LOG_STREAM_REPLAY_SIZE = config("LOG_STREAM_REPLAY_SIZE", default=100, cast=int)
+
+# node connections: a few multiplexed HTTP/2 channels per node instead of a pool
+# of exclusive ones, and TLS session resumption when a channel reconnects
+NODE_CHANNEL_MULTIPLEX = config("NODE_CHANNEL_MULTIPLEX", default=False, cast=bool)
+NODE_MULTIPLEXED_CHANNELS = config("NODE_MULTIPLEXED_CHANNELS", default=2, cast=int)
+NODE_TLS_SESSION_RESUMPTION = config(
+    "NODE_TLS_SESSION_RESUMPTION", default=True, cast=bool
+)
+
+# how many nodes are brought up at once when the panel starts
+NODE_STARTUP_CONCURRENCY = config("NODE_STARTUP_CONCURRENCY", default=16, cast=int)
+
+# host metrics and backend stats of all nodes are polled together every
+# FLEET_METRICS_INTERVAL seconds while the dashboard reads them, node endpoints
+# answer from that snapshot while it's younger than FLEET_METRICS_MAX_AGE
+FLEET_METRICS_INTERVAL = config("FLEET_METRICS_INTERVAL", default=15.0, cast=float)
+FLEET_METRICS_MAX_AGE = config("FLEET_METRICS_MAX_AGE", default=30.0, cast=float)
+FLEET_METRICS_HISTORY_SIZE = config("FLEET_METRICS_HISTORY_SIZE", default=240, cast=int)
+
+# health probes, pool upkeep and cleanup of all nodes run from one scheduler, each job
+# in a random slot of its interval that drifts by up to NODE_MAINTENANCE_JITTER of it
+NODE_MAINTENANCE_CONCURRENCY = config(
+    "NODE_MAINTENANCE_CONCURRENCY", default=16, cast=int
+)
+NODE_MAINTENANCE_JITTER = config("NODE_MAINTENANCE_JITTER", default=0.1, cast=float)
+
+# with load-aware host ordering every node's load is scored each NODE_LOAD_INTERVAL
+# seconds into NODE_LOAD_LEVELS levels, subscriptions are only ordered anew when a
+# node changes level or stops being available
+NODE_LOAD_INTERVAL = config("NODE_LOAD_INTERVAL", default=60.0, cast=float)
+NODE_LOAD_LEVELS = config("NODE_LOAD_LEVELS", default=4, cast=int)
+
+# rendered subscriptions are kept until a user, host, inbound, service or settings
+# change or for SUBSCRIPTION_CACHE_TTL seconds, whichever comes first (0 disables)
+SUBSCRIPTION_CACHE_TTL = config("SUBSCRIPTION_CACHE_TTL", default=3600.0, cast=float)
+SUBSCRIPTION_CACHE_MAX_BYTES = config(
+    "SUBSCRIPTION_CACHE_MAX_BYTES", default=64 * 1024 * 1024, cast=int
+)
+
+# processes rendering subscriptions that aren't cached (0 renders them in a thread)
+SUBSCRIPTION_RENDER_WORKERS = config("SUBSCRIPTION_RENDER_WORKERS", default=2, cast=int)
+
+# after a host, inbound or settings change the subscriptions of clients due within
+# SUBSCRIPTION_CACHE_TTL are rendered again ahead of them, at most
+# SUBSCRIPTION_PREWARM_RATE per second (0 disables), once no change came for
+# SUBSCRIPTION_PREWARM_DELAY seconds
+SUBSCRIPTION_PREWARM_RATE = config("SUBSCRIPTION_PREWARM_RATE", default=20.0, cast=float)
+SUBSCRIPTION_PREWARM_DELAY = config("SUBSCRIPTION_PREWARM_DELAY", default=10.0, cast=float)
+SUBSCRIPTION_PREWARM_MAX_USERS = config(
+    "SUBSCRIPTION_PREWARM_MAX_USERS", default=10000, cast=int
+)
+
+# subscription fetch times and user agents are buffered and written in batches
+SUBSCRIPTION_ACCESS_FLUSH_INTERVAL = config(
+    "SUBSCRIPTION_ACCESS_FLUSH_INTERVAL", default=5.0, cast=float
+)
+SUBSCRIPTION_ACCESS_BUFFER_SIZE = config(
+    "SUBSCRIPTION_ACCESS_BUFFER_SIZE", default=50000, cast=int
+)
+
+# peak events are buffered and upserted in batches
+PEAK_EVENTS_FLUSH_INTERVAL = config(
+    "PEAK_EVENTS_FLUSH_INTERVAL", default=0.3, cast=float
+)
+PEAK_EVENTS_BUFFER_SIZE = config(
+    "PEAK_EVENTS_BUFFER_SIZE", default=5000, cast=int
+)
+
 # CORS security configuration
 CORS_ALLOWED_ORIGINS = config(
     "CORS_ALLOWED_ORIGINS",
@@ -0,0 +1,245 @@
+"""write-behind buffers that turn many small writes into periodic bulk statements"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Hashable
+
+from sqlalchemy.orm import Session
+
+from app.config.env import (
+    PEAK_EVENTS_FLUSH_INTERVAL,
+    PEAK_EVENTS_BUFFER_SIZE,
+    SUBSCRIPTION_ACCESS_FLUSH_INTERVAL,
+    SUBSCRIPTION_ACCESS_BUFFER_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    Buffers rows in memory, last write wins per key unless `merge_fn(old, new)`
+    is given, and flushes them through `flush_fn(db, rows)` every `interval`
+    seconds or as soon as half of the buffer is used. Rows are dropped (and counted) when the
+    buffer is full, so a stalled database can't grow memory unbounded. A failed flush puts
+    its rows back for the next one, as far as the buffer has room.
+
+    `add` is thread-safe so it can be called from sync route handlers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush_fn: Callable[[Session, list[dict]], int],
+        interval: float,
+        max_size: int,
+        merge_fn: Callable[[dict, dict], dict] | None = None,
+    ):
+        self.name = name
+        self.interval = interval
+        self.max_size = max_size
+        self._flush_fn = flush_fn
+        self._merge_fn = merge_fn
+        self._buffer: dict[Hashable, dict] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self.metrics = {
+            "queued": 0,
+            "written": 0,
+            "dropped": 0,
+            "requeued": 0,
+            "skipped": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "last_flush_duration": 0.0,
+        }
+
+    def add(self, key: Hashable, row: dict) -> bool:
+        """queue a row; returns False if it was dropped because the buffer is full"""
+        with self._lock:
+            if key not in self._buffer and len(self._buffer) >= self.max_size:
+                self.metrics["dropped"] += 1
+                return False
+            if self._merge_fn and key in self._buffer:
+                row = self._merge_fn(self._buffer[key], row)
+            self._buffer[key] = row
+            self.metrics["queued"] += 1
+            should_wake = len(self._buffer) >= self.max_size // 2
+        if should_wake and self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def _write(self, rows: list[dict]) -> int:
+        from app.db import GetDB
+
+        with GetDB() as db:
+            return self._flush_fn(db, rows)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return
+                batch = self._buffer
+                self._buffer = {}
+            rows = list(batch.values())
+            started = time.monotonic()
+            try:
+                written = await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                self.metrics["failed_flushes"] += 1
+                requeued = self._requeue(batch)
+                logger.error(
+                    "%s: failed to flush %i rows, %i put back: %s",
+                    self.name,
+                    len(rows),
+                    requeued,
+                    e,
+                )
+                return
+            if written < len(rows):
+                # rows the flush function skipped, e.g. of removed users
+                self.metrics["skipped"] += len(rows) - written
+                logger.warning(
+                    "%s: %i of %i rows weren't written",
+                    self.name,
+                    len(rows) - written,
+                    len(rows),
+                )
+            self.metrics["flushes"] += 1
+            self.metrics["written"] += written
+            self.metrics["last_flush_duration"] = time.monotonic() - started
+            logger.debug("%s: flushed %i rows", self.name, len(rows))
+
+    def _requeue(self, batch: dict[Hashable, dict]) -> int:
+        """put the rows of a failed flush back, rows queued since win"""
+        requeued = 0
+        with self._lock:
+            for key, row in batch.items():
+                if key in self._buffer:
+                    if self._merge_fn:
+                        self._buffer[key] = self._merge_fn(row, self._buffer[key])
+                elif len(self._buffer) < self.max_size:
+                    self._buffer[key] = row
+                else:
+                    self.metrics["dropped"] += 1
+                    continue
+                requeued += 1
+            self.metrics["requeued"] += requeued
+        return requeued
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """stops the periodic flush and writes out whatever is still buffered"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+def _write_peak_events(db: Session, rows: list[dict]) -> int:
+    from app.db import crud
+
+    return crud.upsert_peak_events(db, rows)
+
+
+def _merge_peak_events(old: dict, new: dict) -> dict:
+    # a replayed start event must not wipe out a resolution queued before it
+    if new["resolved_at"] is None and old["resolved_at"] is not None:
+        return old
+    return new
+
+
+peak_events_writer = BatchWriter(
+    "peak_events_writer",
+    _write_peak_events,
+    interval=PEAK_EVENTS_FLUSH_INTERVAL,
+    max_size=PEAK_EVENTS_BUFFER_SIZE,
+    merge_fn=_merge_peak_events,
+)
+
+
+def queue_peak_event(
+    node_id: int,
+    category: str,
+    metric: str,
+    value: float,
+    threshold: float,
+    level: str,
+    dedupe_key: str,
+    context_json,
+    started_at,
+    resolved_at,
+    seq: int,
+) -> bool:
+    """queue a peak event for the next batched upsert"""
+    return peak_events_writer.add(
+        (node_id, dedupe_key, started_at),
+        {
+            "node_id": node_id,
+            "category": category,
+            "metric": metric,
+            "value": value,
+            "threshold": threshold,
+            "level": level,
+            "dedupe_key": dedupe_key,
+            "context_json": context_json,
+            "started_at": started_at,
+            "resolved_at": resolved_at,
+            "seq": seq,
+        },
+    )
+
+
+def _write_sub_updates(db: Session, rows: list[dict]) -> int:
+    from app.db import crud
+
+    return crud.update_users_sub(db, rows)
+
+
+sub_updates_writer = BatchWriter(
+    "sub_updates_writer",
+    _write_sub_updates,
+    interval=SUBSCRIPTION_ACCESS_FLUSH_INTERVAL,
+    max_size=SUBSCRIPTION_ACCESS_BUFFER_SIZE,
+)
+
+
+def queue_sub_update(user_id: int, user_agent: str) -> bool:
+    """record a subscription fetch, written with the next batched update"""
+    return sub_updates_writer.add(
+        user_id,
+        {
+            "id": user_id,
+            "sub_updated_at": datetime.now(timezone.utc),
+            "sub_last_user_agent": user_agent[:512],
+        },
+    )
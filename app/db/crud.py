@@ -1,4 +1,5 @@
 import json
+import logging
 import secrets
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
@@ -6,8 +7,8 @@ from enum import Enum
 from types import NoneType
 from typing import List, Optional, Tuple, Union
 
-from sqlalchemy import and_, update, select, func, cast, Date, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, bindparam, update, select, func, cast, Date
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.db.models import (
     JWT,
@@ -43,7 +44,9 @@ from app.models.user import (
     UserNodeUsageSeries,
     UserUsageSeriesResponse,
 )
+from app.utils.keygen import forget_credentials
 
+logger = logging.getLogger(__name__)
 
 def add_default_hosts(db: Session, inbounds: List[Inbound]):
     hosts = [
@@ -76,12 +79,12 @@ def ensure_node_backends(db: Session, backends, node_id: int):
 
 
 def ensure_node_inbounds(db: Session, inbounds: List[Inbound], node_id: int):
-    current_tags = [
-        i[0]
-        for i in db.execute(
-            select(Inbound.tag).filter(Inbound.node_id == node_id)
+    current_configs = dict(
+        db.execute(
+            select(Inbound.tag, Inbound.config).filter(Inbound.node_id == node_id)
         ).all()
-    ]
+    )
+    current_tags = list(current_configs)
     updated_tags = set(i.tag for i in list(inbounds))
     inbound_additions, tag_deletions = list(), set()
     for tag in current_tags:
@@ -95,6 +98,9 @@ def ensure_node_inbounds(db: Session, inbounds: List[Inbound], node_id: int):
 
     for inb in inbounds:
         if inb.tag in current_tags:
+            # unchanged inbounds aren't written, every node resync gets here
+            if current_configs[inb.tag] == inb.config:
+                continue
             stmt = (
                 update(Inbound)
                 .where(
@@ -166,43 +172,22 @@ def get_inbounds_hosts(
     )
 
 
-def get_hosts_for_user(session, user_id):
-    # Fetch the user object with services loaded to avoid N+1 queries
-    from sqlalchemy.orm import selectinload
-    user = session.query(User).options(selectinload(User.services)).filter(User.id == user_id).one()
-
-    # Query for hosts linked through user's services and inbounds
-    result_query = session.query(InboundHost).filter(
-        and_(
-            # Exclude disabled hosts
-            InboundHost.is_disabled.is_(False),
-            or_(
-                # Case 1: Host has an inbound linked to a service of the user
-                InboundHost.inbound.has(
-                    Inbound.services.any(
-                        Service.id.in_([s.id for s in user.services])
-                    )
-                ),
-                # Case 2: Host has no inbound
-                and_(
-                    InboundHost.inbound_id.is_(
-                        None
-                    ),  # Host does not have an inbound
-                    or_(
-                        # Host is directly related to a service of the user
-                        InboundHost.services.any(
-                            Service.id.in_([s.id for s in user.services])
-                        ),
-                        # Host is available to all
-                        InboundHost.universal.is_(True),
-                    ),
-                ),
-            ),
+def get_subscription_hosts(db: Session):
+    """every enabled host with what subscriptions need of it, in a few queries"""
+    return (
+        db.query(InboundHost)
+        .filter(InboundHost.is_disabled.is_(False))
+        .options(
+            selectinload(InboundHost.inbound).selectinload(Inbound.services),
+            selectinload(InboundHost.services),
+            selectinload(InboundHost.chain)
+            .selectinload(HostChain.chained_host)
+            .selectinload(InboundHost.inbound),
         )
+        .order_by(InboundHost.id)
+        .all()
     )
 
-    return result_query.all()
-
 
 def get_all_inbounds(db: Session):
     return db.query(Inbound).all()
@@ -336,6 +321,39 @@ def get_user(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
 
+def get_subscription_user(db: Session, username: str):
+    """a user with everything serving their subscription reads loaded"""
+    return (
+        db.query(User)
+        .options(selectinload(User.services), joinedload(User.admin))
+        .filter(User.username == username)
+        .first()
+    )
+
+
+def get_subscription_users(db: Session, user_ids: list[int]) -> list[User]:
+    """like `get_subscription_user`, for many users by id"""
+    return (
+        db.query(User)
+        .options(selectinload(User.services), joinedload(User.admin))
+        .filter(User.id.in_(user_ids))
+        .all()
+    )
+
+
+def get_subscription_clients(db: Session, since: datetime):
+    """(id, sub_updated_at, sub_last_user_agent) of users who fetched since `since`"""
+    return (
+        db.query(User.id, User.sub_updated_at, User.sub_last_user_agent)
+        .filter(
+            User.removed.is_(False),
+            User.sub_last_user_agent.isnot(None),
+            User.sub_updated_at >= since,
+        )
+        .all()
+    )
+
+
 def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
@@ -713,6 +731,7 @@ def reset_user_data_usage(db: Session, dbuser: User):
 
 
 def revoke_user_sub(db: Session, dbuser: User):
+    forget_credentials(dbuser.key)
     setattr(dbuser, 'key', secrets.token_hex(16))
     setattr(dbuser, 'sub_revoked_at', datetime.now(timezone.utc))
     db.commit()
@@ -733,6 +752,38 @@ def update_user_sub(db: Session, dbuser: User, user_agent: str):
     db.commit()
 
 
+def update_users_sub(db: Session, rows: list[dict]) -> int:
+    """
+    Bulk update of sub_updated_at/sub_last_user_agent, one executemany
+    UPDATE for rows of `id`, `sub_updated_at` and `sub_last_user_agent`.
+    Rows of users removed in the meantime are skipped and not counted.
+    """
+    if not rows:
+        return 0
+    table = User.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("user_id"))
+        .values(
+            sub_updated_at=bindparam("sub_updated_at"),
+            sub_last_user_agent=bindparam("sub_last_user_agent"),
+        )
+    )
+    result = db.execute(
+        stmt,
+        [
+            {
+                "user_id": row["id"],
+                "sub_updated_at": row["sub_updated_at"],
+                "sub_last_user_agent": row["sub_last_user_agent"],
+            }
+            for row in rows
+        ],
+    )
+    db.commit()
+    return result.rowcount
+
+
 def reset_all_users_data_usage(db: Session, admin: Optional[Admin] = None):
     query = db.query(User)
 
@@ -933,6 +984,23 @@ def get_nodes(
     return query.all()
 
 
+def get_nodes_health(db: Session) -> tuple[dict[int, NodeStatus], set[int]]:
+    """the status of every node and the ids of nodes with an ongoing critical peak"""
+    from app.db.models import NodePeakEvent, PeakLevel
+
+    statuses = dict(db.query(Node.id, Node.status).all())
+    critical = {
+        node_id
+        for node_id, in db.query(NodePeakEvent.node_id)
+        .filter(
+            NodePeakEvent.resolved_at.is_(None),
+            NodePeakEvent.level == PeakLevel.CRITICAL,
+        )
+        .distinct()
+    }
+    return statuses, critical
+
+
 def get_node_usage(
     db: Session, start: datetime, end: datetime, node: Node
 ) -> TrafficUsageSeries:
@@ -1140,6 +1208,81 @@ def upsert_peak_event(
             raise ValueError("Peak event deduplication failed")
 
 
+def upsert_peak_events(db: Session, events: list[dict]) -> int:
+    """
+    Bulk upsert of peak events keyed on (node_id, dedupe_key, started_at).
+    An existing event only gets its resolved_at filled in, as in upsert_peak_event.
+    Falls back to row-by-row upserts if the batch hits another constraint.
+    """
+    from app.db.models import NodePeakEvent
+
+    if not events:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    else:
+        for event in events:
+            upsert_peak_event(db, **event)
+        return len(events)
+
+    table = NodePeakEvent.__table__
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            **event,
+            "context_json": json.dumps(event["context_json"]) if event["context_json"] else "{}",
+            "created_at": now,
+        }
+        for event in events
+    ]
+
+    stmt = dialect_insert(table)
+    if dialect in ("mysql", "mariadb"):
+        stmt = stmt.on_duplicate_key_update(
+            resolved_at=func.coalesce(stmt.inserted.resolved_at, table.c.resolved_at)
+        )
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["node_id", "dedupe_key", "started_at"],
+            set_={
+                "resolved_at": func.coalesce(
+                    stmt.excluded.resolved_at, table.c.resolved_at
+                )
+            },
+        )
+
+    from sqlalchemy.exc import IntegrityError
+
+    try:
+        db.execute(stmt, rows)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        written = 0
+        for row in rows:
+            try:
+                db.execute(stmt, [row])
+                db.commit()
+                written += 1
+            except IntegrityError as e:
+                db.rollback()
+                logger.warning(
+                    "skipping peak event %s of node %s (seq %s): %s",
+                    row["dedupe_key"],
+                    row["node_id"],
+                    row["seq"],
+                    e.orig,
+                )
+        return written
+    return len(rows)
+
+
 def get_peak_events(
     db: Session,
     node_id: int,
@@ -67,7 +67,7 @@ def get_subscription_user(
     except ValueError:
         raise HTTPException(status_code=404)
 
-    db_user = crud.get_user(db, username)
+    db_user = crud.get_subscription_user(db, username)
     if db_user and str(db_user.key) == str(key):
         return db_user
     else:
@@ -35,6 +35,7 @@ class NodeStatus(str, Enum):
 
 class NodeConnectionBackend(str, Enum):
     grpclib = "grpclib"
+    grpcio = "grpcio"
 
 
 class NodeSettings(BaseModel):
@@ -157,6 +158,33 @@ class HostSystemMetrics(BaseModel):
     uptime: UptimeMetrics
     open_ports: List[PortInfo]
 
+class HostMetricsSample(BaseModel):
+    timestamp_ms: int
+    cpu_usage: float
+    memory_usage: float
+    disk_usage: float
+    load_average_1m: float
+    network_bytes_sent: int
+    network_bytes_received: int
+
+class HostMetricsHistory(BaseModel):
+    node_id: int
+    sample_interval_ms: int
+    samples: List[HostMetricsSample]
+
+class NodeFleetMetrics(BaseModel):
+    node_id: int
+    updated_at: Optional[float] = None
+    stale: bool
+    error: Optional[str] = None
+    host: Optional[HostSystemMetrics] = None
+    backends: Optional[Dict[str, BackendStats]] = None
+    history: List[HostMetricsSample] = []
+
+class FleetMetricsResponse(BaseModel):
+    nodes: List[NodeFleetMetrics]
+    timestamp: str
+
 # Container Models
 class LogLevel(str, Enum):
     DEBUG = "DEBUG"
@@ -26,6 +26,7 @@ class SubscriptionSettings(BaseModel):
     support_link: str
     update_interval: int
     shuffle_configs: bool = False
+    order_hosts_by_load: bool = False
     placeholder_if_disabled: bool = True
     placeholder_remark: str = "disabled"
     rules: list[SubscriptionRule]
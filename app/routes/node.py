@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import os
+import re
 from typing import Annotated
 from datetime import datetime
 from fastapi import Depends, Request
@@ -20,6 +21,8 @@ from sqlalchemy import select
 from starlette.websockets import WebSocketDisconnect
 
 from app import wildosnode
+from app.wildosnode import log_stream, peak_stream
+from app.wildosnode.fleet_metrics import get_fleet_telemetry
 from app.wildosnode.grpc_client import (
     GRPC_FAST_TIMEOUT,
     GRPC_SLOW_TIMEOUT, 
@@ -27,6 +30,7 @@ from app.wildosnode.grpc_client import (
     GRPC_STREAM_TIMEOUT
 )
 from app.db import crud, get_tls_certificate
+from app.db.batch_writer import queue_peak_event
 from app.db.models import Node
 from app.dependencies import (
     DBDep,
@@ -46,6 +50,8 @@ from app.models.node import (
     BackendConfig,
     BackendStats,
     HostSystemMetrics,
+    HostMetricsHistory,
+    HostMetricsSample,
     ContainerLog,
     ContainerFile,
     PortInfo,
@@ -53,6 +59,8 @@ from app.models.node import (
     PortActionResponse,
     ContainerRestartResponse,
     AllBackendsStatsResponse,
+    FleetMetricsResponse,
+    NodeFleetMetrics,
     PeakEvent,
     PeakEventCreate,
 )
@@ -225,6 +233,32 @@ def get_node_settings(db: DBDep, admin: SudoAdminDep):
     return NodeSettings(certificate=str(tls.certificate) if tls and hasattr(tls, 'certificate') and tls.certificate is not None else "")
 
 
+@router.get("/metrics", response_model=FleetMetricsResponse)
+async def get_fleet_metrics(
+    admin: SudoAdminDep,
+    max_age: float | None = Query(None, ge=0, description="Poll nodes whose snapshot is older than this many seconds"),
+    history: bool = Query(False, description="Include the recent samples kept on the panel"),
+):
+    """Get the host metrics and backend stats of all nodes from the panel's cache"""
+    fleet = get_fleet_telemetry()
+    max_age = fleet.max_age if max_age is None else max_age
+    return FleetMetricsResponse(
+        nodes=[
+            NodeFleetMetrics(
+                node_id=telemetry.node_id,
+                updated_at=telemetry.updated_at or None,
+                stale=telemetry.age() > max_age,
+                error=telemetry.error,
+                host=telemetry.host,
+                backends=telemetry.backends,
+                history=list(telemetry.history) if history else [],
+            )
+            for telemetry in await fleet.get_all(max_age)
+        ],
+        timestamp=datetime.now().isoformat(),
+    )
+
+
 @router.get("/{node_id}", response_model=NodeResponse)
 def get_node(node_id: int, db: DBDep, admin: SudoAdminDep):
     db_node = crud.get_node_by_id(db, node_id)
@@ -241,6 +275,10 @@ async def node_logs(
     websocket: WebSocket,
     db: DBDep,
     include_buffer: bool = True,
+    level: str | None = None,
+    pattern: str | None = None,
+    user: str | None = None,
+    batch: bool = False,
 ):
     # Extract token using secure Sec-WebSocket-Protocol method only
     token, selected_subprotocol = _extract_ws_token(websocket)
@@ -258,12 +296,28 @@ async def node_logs(
     else:
         await websocket.accept()
         
+    if pattern:
+        try:
+            re.compile(pattern)
+        except re.error:
+            return await websocket.close(reason="Invalid pattern", code=4400)
+
     try:
-        async for line in wildosnode.nodes[node_id].get_logs(
-            name=backend, include_buffer=include_buffer
+        async for lines in log_stream.subscribe(
+            node_id,
+            backend,
+            include_buffer=include_buffer,
+            level=level,
+            pattern=pattern,
+            user=user,
         ):
             try:
-                await websocket.send_text(line or "")
+                # batching viewers get one frame per node batch
+                if batch:
+                    await websocket.send_text("".join(lines))
+                else:
+                    for line in lines:
+                        await websocket.send_text(line)
             except WebSocketDisconnect:
                 break
     finally:
@@ -481,11 +535,19 @@ def get_usage(
 
 @router.get("/{node_id}/{backend}/stats", response_model=BackendStats)
 async def get_backend_stats(
-    node_id: int, backend: str, db: DBDep, admin: SudoAdminDep
+    node_id: int,
+    backend: str,
+    db: DBDep,
+    admin: SudoAdminDep,
+    max_age: float | None = Query(None, ge=0, description="Accept cached stats up to this many seconds old"),
 ):
     if not (node := wildosnode.nodes.get(node_id)):
         raise node_not_found_error()
 
+    telemetry = await get_fleet_telemetry().get(node_id, max_age)
+    if not telemetry.backends_error and telemetry.backends and backend in telemetry.backends:
+        return telemetry.backends[backend]
+
     try:
         stats = await asyncio.wait_for(node.get_backend_stats(backend), timeout=GRPC_FAST_TIMEOUT)
     except Exception:
@@ -536,18 +598,60 @@ async def alter_node_xray_config(
 # Host System Monitoring Endpoints
 @router.get("/{node_id}/host/metrics", response_model=HostSystemMetrics)
 async def get_host_system_metrics(
-    node_id: int, db: DBDep, admin: SudoAdminDep
+    node_id: int,
+    db: DBDep,
+    admin: SudoAdminDep,
+    max_age: float | None = Query(None, ge=0, description="Accept cached metrics up to this many seconds old"),
 ):
     """Get host system metrics (CPU, RAM, disk, network, uptime)"""
+    if node_id not in wildosnode.nodes:
+        raise node_not_found_error()
+
+    telemetry = await get_fleet_telemetry().get(node_id, max_age)
+    if telemetry.host_error or telemetry.host is None:
+        logger.error(f"Failed to get host metrics for node {node_id}: {telemetry.host_error}")
+        raise ServerError("Failed to retrieve host system metrics")
+    return telemetry.host
+
+
+@router.get("/{node_id}/host/metrics/history", response_model=HostMetricsHistory)
+async def get_host_metrics_history(
+    node_id: int,
+    db: DBDep,
+    admin: SudoAdminDep,
+    since_ms: int = Query(0, ge=0, description="Return samples since timestamp (milliseconds)"),
+    until_ms: int | None = Query(None, ge=0, description="Return samples until timestamp (milliseconds)"),
+    max_points: int = Query(300, ge=0, le=5000, description="Downsample to at most this many points (0 = all)")
+):
+    """Get host metrics history sampled on the node, without re-sampling"""
     if not (node := wildosnode.nodes.get(node_id)):
         raise node_not_found_error()
 
     try:
-        metrics = await asyncio.wait_for(node.get_host_system_metrics(), timeout=GRPC_FAST_TIMEOUT)
-        return metrics
+        history = await asyncio.wait_for(
+            node.get_host_metrics_history(since_ms, until_ms, max_points),
+            timeout=GRPC_FAST_TIMEOUT
+        )
     except Exception as e:
-        logger.error(f"Failed to get host metrics for node {node_id}: {e}")
-        raise ServerError("Failed to retrieve host system metrics")
+        logger.error(f"Failed to get host metrics history for node {node_id}: {e}")
+        raise ServerError("Failed to retrieve host metrics history")
+
+    return HostMetricsHistory(
+        node_id=node_id,
+        sample_interval_ms=history.sample_interval_ms,
+        samples=[
+            HostMetricsSample(
+                timestamp_ms=sample.timestamp_ms,
+                cpu_usage=sample.cpu_usage,
+                memory_usage=sample.memory_usage,
+                disk_usage=sample.disk_usage,
+                load_average_1m=sample.load_average_1m,
+                network_bytes_sent=sample.network_bytes_sent,
+                network_bytes_received=sample.network_bytes_received,
+            )
+            for sample in history.samples
+        ]
+    )
 
 
 @router.get("/{node_id}/host/ports", response_model=list[PortInfo])
@@ -648,14 +752,20 @@ async def get_container_logs(
     node_id: int, 
     db: DBDep, 
     admin: SudoAdminDep,
-    tail: int = Query(100, description="Number of log lines to return")
+    tail: int = Query(100, description="Number of log lines to return"),
+    max_age: float | None = Query(None, ge=0, description="Accept cached logs up to this many seconds old"),
 ):
     """Get container logs"""
     if not (node := wildosnode.nodes.get(node_id)):
         raise node_not_found_error()
 
     try:
-        logs = await asyncio.wait_for(node.get_container_logs(tail=tail), timeout=GRPC_STREAM_TIMEOUT)
+        logs = await get_fleet_telemetry().cached(
+            node_id,
+            ("container_logs", tail),
+            lambda: asyncio.wait_for(node.get_container_logs(tail=tail), timeout=GRPC_STREAM_TIMEOUT),
+            max_age,
+        )
         return logs
     except Exception as e:
         logger.error(f"Failed to get container logs for node {node_id}: {e}")
@@ -667,7 +777,8 @@ async def get_container_files(
     node_id: int, 
     db: DBDep, 
     admin: SudoAdminDep,
-    path: str = Query("/app", description="Path to list files from")
+    path: str = Query("/app", description="Path to list files from"),
+    max_age: float | None = Query(None, ge=0, description="Accept a cached listing up to this many seconds old"),
 ):
     """Get list of files in container directory"""
     # Validate path to prevent directory traversal attacks
@@ -688,7 +799,12 @@ async def get_container_files(
         raise node_not_found_error()
 
     try:
-        files = await asyncio.wait_for(node.get_container_files(path=normalized_path), timeout=GRPC_FAST_TIMEOUT)
+        files = await get_fleet_telemetry().cached(
+            node_id,
+            ("container_files", normalized_path),
+            lambda: asyncio.wait_for(node.get_container_files(path=normalized_path), timeout=GRPC_FAST_TIMEOUT),
+            max_age,
+        )
         return files
     except Exception as e:
         logger.error(f"Failed to get container files for node {node_id}: {e}")
@@ -705,6 +821,7 @@ async def restart_container(
 
     try:
         result = await asyncio.wait_for(node.restart_container(), timeout=GRPC_SLOW_TIMEOUT)
+        get_fleet_telemetry().invalidate(node_id)
         return ContainerRestartResponse(
             success=result if result is not None else False, 
             message="Container restart initiated" if result else "Failed to restart container"
@@ -717,45 +834,26 @@ async def restart_container(
 # Batch Backend Stats Endpoint (for performance optimization)
 @router.get("/{node_id}/backends/stats", response_model=AllBackendsStatsResponse)
 async def get_all_backends_stats(
-    node_id: int, db: DBDep, admin: SudoAdminDep
+    node_id: int,
+    db: DBDep,
+    admin: SudoAdminDep,
+    max_age: float | None = Query(None, ge=0, description="Accept cached stats up to this many seconds old"),
 ):
     """Get stats for all backends of a node in one request"""
-    if not (node := wildosnode.nodes.get(node_id)):
+    if node_id not in wildosnode.nodes:
         raise node_not_found_error()
 
-    try:
-        all_stats = await asyncio.wait_for(node.get_all_backends_stats(), timeout=GRPC_FAST_TIMEOUT)
-        
-        # Convert protobuf BackendStats to model BackendStats with safe conversion
-        converted_stats = {}
-        if all_stats:
-            for backend_name, proto_stats in all_stats.items():
-                try:
-                    # Check if it's already a BackendStats model instance
-                    if isinstance(proto_stats, BackendStats):
-                        converted_stats[backend_name] = proto_stats
-                    # Check if it's a protobuf object with 'running' attribute
-                    elif hasattr(proto_stats, 'running') and hasattr(proto_stats, '__class__'):
-                        # Safe protobuf to model conversion
-                        running_value = getattr(proto_stats, 'running', False)
-                        converted_stats[backend_name] = BackendStats(running=bool(running_value))
-                    else:
-                        # Fallback: create default BackendStats
-                        converted_stats[backend_name] = BackendStats(running=False)
-                except Exception as e:
-                    logger.warning(f"Failed to convert backend stats for {backend_name}: {e}")
-                    # Fallback to default stats on conversion error
-                    converted_stats[backend_name] = BackendStats(running=False)
-        
-        return AllBackendsStatsResponse(
-            backends=converted_stats,
-            node_id=node_id,
-            timestamp=datetime.now().isoformat()
-        )
-    except Exception as e:
-        logger.error(f"Failed to get all backend stats for node {node_id}: {e}")
+    telemetry = await get_fleet_telemetry().get(node_id, max_age)
+    if telemetry.backends_error or telemetry.backends is None:
+        logger.error(f"Failed to get all backend stats for node {node_id}: {telemetry.backends_error}")
         raise ServerError("Failed to retrieve backend stats")
 
+    return AllBackendsStatsResponse(
+        backends=telemetry.backends,
+        node_id=node_id,
+        timestamp=datetime.fromtimestamp(telemetry.backends_updated_at).isoformat()
+    )
+
 
 # Peak Events Monitoring Endpoints
 @router.get("/{node_id}/peak/events", response_model=list[PeakEvent])
@@ -818,7 +916,7 @@ async def stream_peak_events(
     if not admin or not admin.is_sudo:
         return await websocket.close(reason="You're not allowed", code=4403)
 
-    if not (node := wildosnode.nodes.get(node_id)):
+    if not wildosnode.nodes.get(node_id):
         return await websocket.close(reason="Node not found", code=4404)
 
     # Accept WebSocket connection with proper subprotocol if present
@@ -828,7 +926,8 @@ async def stream_peak_events(
         await websocket.accept()
     
     try:
-        async for event in node.stream_peak_events():
+        # all viewers of a node share a single upstream stream
+        async for event in peak_stream.subscribe(node_id):
             # Convert protobuf event to dict using correct field names
             if event is not None:
                 event_dict = {
@@ -871,9 +970,8 @@ async def save_peak_event(
         started_at = datetime.fromtimestamp(peak_event.started_at_ms / 1000)
         resolved_at = datetime.fromtimestamp(peak_event.resolved_at_ms / 1000) if peak_event.resolved_at_ms else None
         
-        # Upsert peak event with deduplication
-        db_peak_event = crud.upsert_peak_event(
-            db=db,
+        # Queue for the batched upsert with deduplication
+        queued = queue_peak_event(
             node_id=node_id,
             category=peak_event.category.value,
             metric=peak_event.metric,
@@ -886,10 +984,14 @@ async def save_peak_event(
             resolved_at=resolved_at,
             seq=peak_event.seq
         )
+        if not queued:
+            raise ServiceUnavailableError("Peak event buffer is full, retry later")
         
-        logger.info(f"Peak event saved for node {node_id}: {peak_event.category} {peak_event.metric} = {peak_event.value}%")
-        return {"success": True, "event_id": db_peak_event.id}
+        logger.info(f"Peak event queued for node {node_id}: {peak_event.category} {peak_event.metric} = {peak_event.value}%")
+        return {"success": True, "queued": True}
         
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Failed to save peak event for node {node_id}: {e}")
         raise ServerError("Failed to save peak event")
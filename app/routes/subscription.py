@@ -1,21 +1,31 @@
-import re
+import asyncio
 from collections import defaultdict
 
+import xxhash
+
 from fastapi import APIRouter
 from fastapi import Header, Path, Request, Response
 from ..exceptions import NotFoundError
 from starlette.responses import HTMLResponse
 
 from app.db import crud
-from app.db.models import Settings
+from app.db.batch_writer import queue_sub_update
 from app.dependencies import DBDep, SubUserDep, StartDateDep, EndDateDep
-from app.models.settings import SubscriptionSettings
 from app.models.system import TrafficUsageSeries
 from app.models.user import UserResponse
 from app.utils.share import (
     encode_title,
-    generate_subscription,
     generate_subscription_template,
+    get_rendered_subscription,
+    get_subscription_settings,
+    rule_config_format,
+)
+from app.utils.subscription_cache import (
+    COMPRESS_MIN_SIZE,
+    ENCODERS,
+    RenderedSubscription,
+    SubscriptionCache,
+    get_subscription_cache,
 )
 
 router = APIRouter(prefix="/sub", tags=["Subscription"])
@@ -49,11 +59,73 @@ def get_subscription_user_info(user: UserResponse) -> dict:
     }
 
 
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """the preferred content coding of ENCODERS the client accepts"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    for coding in ("br", "gzip"):
+        if coding in ENCODERS and accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def subscription_response(
+    request: Request,
+    cache: SubscriptionCache,
+    rendered: RenderedSubscription,
+    media_type: str,
+    headers: dict,
+) -> Response:
+    """
+    The rendered body, compressed if the client accepts it, or 304 if the
+    client already has it. The ETag covers the headers too, so a usage
+    change in subscription-userinfo isn't hidden behind an unchanged body.
+    """
+    encoding = None
+    if len(rendered.body) >= COMPRESS_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    digest = xxhash.xxh64_hexdigest(
+        "\n".join([rendered.etag, *(f"{k}: {v}" for k, v in headers.items())])
+    )
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers = {
+        **headers,
+        "etag": etag,
+        "vary": "Accept-Encoding",
+        "cache-control": "private, no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    ):
+        cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["content-encoding"] = encoding
+        return Response(
+            content=cache.encode(rendered, encoding),
+            media_type=media_type,
+            headers=headers,
+        )
+    return Response(content=rendered.body, media_type=media_type, headers=headers)
+
+
 @router.get("/{username}/{key}")
-def user_subscription(
+async def user_subscription(
     db_user: SubUserDep,
     request: Request,
-    db: DBDep,
     user_agent: str = Header(default=""),
 ):
     """
@@ -62,18 +134,18 @@ def user_subscription(
 
     user: UserResponse = UserResponse.model_validate(db_user)
 
-    crud.update_user_sub(db, db_user, user_agent)
+    queue_sub_update(db_user.id, user_agent)
 
-    subscription_settings = SubscriptionSettings.model_validate(
-        db.query(Settings.subscription).first()[0]
-    )
+    subscription_settings, user_agent_matcher = await get_subscription_settings()
 
     if (
         subscription_settings.template_on_acceptance
         and "text/html" in request.headers.get("Accept", [])
     ):
         return HTMLResponse(
-            generate_subscription_template(db_user, subscription_settings)
+            await asyncio.to_thread(
+                generate_subscription_template, db_user, subscription_settings
+            )
         )
 
     response_headers = {
@@ -88,37 +160,33 @@ def user_subscription(
         ),
     }
 
-    for rule in subscription_settings.rules:
-        if re.match(rule.pattern, user_agent):
-            if rule.result.value == "template":
-                return HTMLResponse(
-                    generate_subscription_template(
-                        db_user, subscription_settings
-                    )
-                )
-            elif rule.result.value == "block":
-                raise NotFoundError("Access blocked by subscription rule", "SUBSCRIPTION_BLOCKED")
-            elif rule.result.value == "base64-links":
-                b64 = True
-                config_format = "links"
-            else:
-                b64 = False
-                config_format = rule.result.value
-
-            conf = generate_subscription(
-                user=db_user,
-                config_format=config_format,
-                as_base64=b64,
-                use_placeholder=not user.is_active
-                and subscription_settings.placeholder_if_disabled,
-                placeholder_remark=subscription_settings.placeholder_remark,
-                shuffle=subscription_settings.shuffle_configs,
-            )
-            return Response(
-                content=conf,
-                media_type=config_mimetype[rule.result],
-                headers=response_headers,
+    result = user_agent_matcher.match(user_agent)
+    if result is None:
+        return None
+
+    if result.value == "template":
+        return HTMLResponse(
+            await asyncio.to_thread(
+                generate_subscription_template, db_user, subscription_settings
             )
+        )
+    elif result.value == "block":
+        raise NotFoundError("Access blocked by subscription rule", "SUBSCRIPTION_BLOCKED")
+    config_format, b64 = rule_config_format(result)
+
+    use_placeholder = (
+        not user.is_active and subscription_settings.placeholder_if_disabled
+    )
+    rendered = await get_rendered_subscription(
+        db_user, subscription_settings, config_format, b64, use_placeholder
+    )
+    return subscription_response(
+        request,
+        get_subscription_cache(),
+        rendered,
+        config_mimetype[result],
+        response_headers,
+    )
 
 
 @router.get("/{username}/{key}/info", response_model=UserResponse)
@@ -151,8 +219,7 @@ client_type_mime_type = {
 
 
 @router.get("/{username}/{key}/{client_type}")
-def user_subscription_with_client_type(
-    db: DBDep,
+async def user_subscription_with_client_type(
     db_user: SubUserDep,
     request: Request,
     client_type: str = Path(
@@ -165,9 +232,7 @@ def user_subscription_with_client_type(
 
     user: UserResponse = UserResponse.model_validate(db_user)
 
-    subscription_settings = SubscriptionSettings.model_validate(
-        db.query(Settings.subscription).first()[0]
-    )
+    subscription_settings, _ = await get_subscription_settings()
 
     response_headers = {
         "content-disposition": f'attachment; filename="{user.username}"',
@@ -181,17 +246,22 @@ def user_subscription_with_client_type(
         ),
     }
 
-    conf = generate_subscription(
-        user=db_user,
-        config_format="links" if client_type == "v2ray" else client_type,
-        as_base64=client_type == "v2ray",
-        use_placeholder=not user.is_active
-        and subscription_settings.placeholder_if_disabled,
-        placeholder_remark=subscription_settings.placeholder_remark,
-        shuffle=subscription_settings.shuffle_configs,
+    config_format = "links" if client_type == "v2ray" else client_type
+    as_base64 = client_type == "v2ray"
+    use_placeholder = (
+        not user.is_active and subscription_settings.placeholder_if_disabled
+    )
+    rendered = await get_rendered_subscription(
+        db_user,
+        subscription_settings,
+        config_format,
+        as_base64,
+        use_placeholder,
     )
-    return Response(
-        content=conf,
-        media_type=client_type_mime_type[client_type],
-        headers=response_headers,
+    return subscription_response(
+        request,
+        get_subscription_cache(),
+        rendered,
+        client_type_mime_type[client_type],
+        response_headers,
     )
@@ -20,6 +20,7 @@ from app.models.system import (
     TrafficUsageSeries,
 )
 from app.models.user import UserExpireStrategy
+from app.utils.subscription_settings import subscription_settings
 
 router = APIRouter(tags=["System"], prefix="/system")
 
@@ -73,6 +74,9 @@ def update_subscription_settings(
         db.refresh(settings)
     db.commit()
     db.refresh(settings)
+    subscription_settings.set(
+        SubscriptionSettings.model_validate(settings.subscription)
+    )
     return settings.subscription
 
 
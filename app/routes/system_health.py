@@ -5,10 +5,17 @@ from fastapi import APIRouter, Depends
 from typing import Dict, Any
 
 from ..dependencies import SudoAdminDep, DBDep
-from ..exceptions import ServerError, ServiceUnavailableError, APIError
+from ..exceptions import BadRequestError, ServerError, ServiceUnavailableError, APIError
 from ..utils.system_monitor import disk_monitor
 from ..db.maintenance import db_maintenance, scheduled_database_cleanup
 from ..utils.logging_config import system_monitor_logger
+from ..tasks.nodes import startup_progress
+from ..tasks.subscription_prewarm import subscription_prewarmer
+from ..wildosnode.scheduler import get_metrics as get_maintenance_metrics
+from ..wildosnode.node_load import get_metrics as get_node_load_metrics
+from ..utils.subscription_cache import get_metrics as get_subscription_cache_metrics
+from ..db.batch_writer import sub_updates_writer
+from ..utils.subscription_render import render_pool
 from .. import __version__
 
 router = APIRouter(prefix="/api/system", tags=["system"])
@@ -32,13 +39,21 @@ async def readiness_check():
         is_safe, disk_info = disk_monitor.check_disk_space()
         db_health = db_maintenance.check_database_health()
         
-        # Simple pass/fail readiness logic
+        # Simple pass/fail readiness logic, nodes still coming up don't fail it
         ready = is_safe and db_health["healthy"]
+        nodes = startup_progress.as_dict()
         
         if ready:
+            if not startup_progress.done:
+                return {
+                    "status": "partially_ready",
+                    "message": f"Service is ready, {nodes['pending']} of {nodes['total']} nodes are still starting",
+                    "nodes": nodes
+                }
             return {
                 "status": "ready",
-                "message": "Service is ready to accept traffic"
+                "message": "Service is ready to accept traffic",
+                "nodes": nodes
             }
         else:
             # Return 503 Service Unavailable if not ready
@@ -190,4 +205,45 @@ async def monitoring_status(_: SudoAdminDep):
         )
 
 
+@router.get("/node-maintenance")
+async def node_maintenance(_: SudoAdminDep):
+    """Get per-node health probe and maintenance job latency and skew"""
+    return get_maintenance_metrics()
+
+
+@router.get("/subscription-cache")
+async def subscription_cache(_: SudoAdminDep):
+    """Get subscription cache, render pool, access bookkeeping and node load counters"""
+    return {
+        **get_subscription_cache_metrics(),
+        "access_writer": {**sub_updates_writer.metrics, "buffered": len(sub_updates_writer)},
+        "render_pool": render_pool.get_metrics(),
+        "node_load": get_node_load_metrics(),
+    }
+
+
+@router.get("/subscription-prewarm")
+async def subscription_prewarm(_: SudoAdminDep):
+    """Get the progress of pre-warming the subscription cache"""
+    return subscription_prewarmer.get_metrics()
+
+
+@router.post("/subscription-prewarm")
+async def start_subscription_prewarm(_: SudoAdminDep, rate: float | None = None):
+    """Pre-warm the subscription cache now, optionally changing the renders per second"""
+    if rate is not None:
+        if rate < 0:
+            raise BadRequestError("rate can't be negative", "INVALID_RATE")
+        subscription_prewarmer.rate = rate
+    subscription_prewarmer.run()
+    return subscription_prewarmer.get_metrics()
+
+
+@router.delete("/subscription-prewarm")
+async def cancel_subscription_prewarm(_: SudoAdminDep):
+    """Cancel the pending or running pre-warming"""
+    subscription_prewarmer.cancel()
+    return subscription_prewarmer.get_metrics()
+
+
 __all__ = ["router"]
\ No newline at end of file
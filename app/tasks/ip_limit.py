@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app import wildosnode
+from app.config.env import IP_LIMIT_RESTRICT_DURATION
+from app.db import GetDB
+from app.db.models import User
+
+logger = logging.getLogger(__name__)
+
+# uid -> monotonic time the restriction is lifted at
+_restricted: dict[int, float] = {}
+
+
+async def enforce_ip_limits(online_ips: dict[int, set[int]]) -> None:
+    """
+    takes users connecting from more distinct IPs than their `ip_limit`
+    off the nodes for `IP_LIMIT_RESTRICT_DURATION` seconds, and restores
+    those whose restriction is over
+    :param online_ips: ip fingerprints per user, merged over all nodes
+    """
+    now = time.monotonic()
+    expired = [uid for uid, until in _restricted.items() if until <= now]
+    candidates = [
+        uid
+        for uid, ips in online_ips.items()
+        if len(ips) > 1 and uid not in _restricted
+    ]
+    if not expired and not candidates:
+        return
+
+    for uid in expired:
+        del _restricted[uid]
+    restrict, restore = await asyncio.to_thread(
+        _load_users, online_ips, candidates, expired
+    )
+    for user in restrict:
+        wildosnode.operations.update_user(user, remove=True)
+        _restricted[user.id] = now + IP_LIMIT_RESTRICT_DURATION
+        logger.info(
+            "User `%s` connected from %i IPs (limit %i), restricted for %is",
+            user.username,
+            len(online_ips[user.id]),
+            user.ip_limit,
+            IP_LIMIT_RESTRICT_DURATION,
+        )
+    for user in restore:
+        wildosnode.operations.update_user(user)
+        logger.info("User `%s` ip limit restriction lifted", user.username)
+
+
+def _load_users(
+    online_ips: dict[int, set[int]], candidates: list[int], expired: list[int]
+) -> tuple[list[User], list[User]]:
+    """the users over their ip limit and the ones to restore, with their inbounds"""
+    restrict, restore = [], []
+    with GetDB() as db:
+        if candidates:
+            stmt = (
+                select(User)
+                .where(User.id.in_(candidates), User.ip_limit > 0)
+                .options(selectinload(User.inbounds))
+            )
+            for user in db.execute(stmt).scalars():
+                if len(online_ips[user.id]) > user.ip_limit and user.is_active:
+                    restrict.append(user)
+        if expired:
+            stmt = (
+                select(User)
+                .where(User.id.in_(expired), User.activated.is_(True))
+                .options(selectinload(User.inbounds))
+            )
+            restore = [user for user in db.execute(stmt).scalars() if user.is_active]
+    return restrict, restore
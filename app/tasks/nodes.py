@@ -1,10 +1,90 @@
+import asyncio
+import logging
+import time
+
 from app import wildosnode
+from app.config.env import NODE_STARTUP_CONCURRENCY
 from app.db import GetDB, crud, get_tls_certificate
+from app.wildosnode.grpc_client import get_node_tls_material
+
+logger = logging.getLogger(__name__)
+
+
+class NodesStartupProgress:
+    """how far bringing up the enabled nodes got, reported by `/ready`"""
+
+    def __init__(self):
+        self.total = 0
+        self.online = 0
+        self.degraded = 0
+        self.failed = 0
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def pending(self) -> int:
+        return self.total - self.online - self.degraded - self.failed
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def as_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "online": self.online,
+            "degraded": self.degraded,
+            "failed": self.failed,
+            "pending": self.pending,
+            "done": self.done,
+        }
+
+
+startup_progress = NodesStartupProgress()
 
 
 async def nodes_startup():
-    with GetDB() as db:
-        certificate = get_tls_certificate(db)
-        db_nodes = crud.get_nodes(db=db, enabled=True)
-        for db_node in db_nodes:
-            await wildosnode.operations.add_node(db_node, certificate)
+    progress = startup_progress
+    progress.started_at = time.time()
+    semaphore = asyncio.Semaphore(NODE_STARTUP_CONCURRENCY)
+
+    async def bring_up(db_node, certificate, tls_material):
+        async with semaphore:
+            try:
+                connected = await wildosnode.operations.add_node(
+                    db_node, certificate, tls_material
+                )
+            except Exception as e:
+                progress.failed += 1
+                logger.error("failed to bring up node %i: %s", db_node.id, e)
+                return
+        if connected:
+            progress.online += 1
+        else:
+            progress.degraded += 1
+
+    try:
+        with GetDB() as db:
+            certificate = get_tls_certificate(db)
+            db_nodes = crud.get_nodes(db=db, enabled=True)
+            progress.total = len(db_nodes)
+            tls_material = get_node_tls_material(reload=True) if db_nodes else None
+            await asyncio.gather(
+                *(bring_up(db_node, certificate, tls_material) for db_node in db_nodes)
+            )
+    except Exception as e:
+        # nobody awaits this task, /ready must not wait for it forever
+        progress.failed += progress.pending
+        logger.error("failed to bring up the nodes: %s", e)
+        return
+    finally:
+        progress.finished_at = time.time()
+
+    logger.info(
+        "brought up %i nodes in %.1fs: %i online, %i degraded, %i failed",
+        progress.total,
+        progress.finished_at - progress.started_at,
+        progress.online,
+        progress.degraded,
+        progress.failed,
+    )
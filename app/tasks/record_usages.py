@@ -5,10 +5,13 @@ from datetime import datetime, timezone
 from sqlalchemy import and_, select, insert, update, bindparam
 
 from app import wildosnode
+from app.config.env import TASKS_RECORD_USER_USAGES_INTERVAL
 from app.db import GetDB
 from app.db.models import NodeUsage, NodeUserUsage, User
 from app.wildosnode import WildosNodeBase
+from app.wildosnode.node_load import get_node_load
 from app.tasks.data_usage_percent_reached import data_usage_percent_reached
+from app.tasks.ip_limit import enforce_ip_limits
 
 
 def record_user_usage_logs(
@@ -115,15 +118,17 @@ def record_node_stats(node_id: int, usage: int):
 
 async def get_users_stats(
     node_id: int, node: WildosNodeBase
-) -> tuple[int, list[dict]]:
+) -> tuple[int, list[dict], dict[int, list[int]]]:
     try:
         params = list()
-        for stat in await asyncio.wait_for(node.fetch_users_stats(), 10):
+        stats = await asyncio.wait_for(node.fetch_users_stats(), 10)
+        for stat in stats.users_stats:
             if stat.usage:
                 params.append({"uid": stat.uid, "value": stat.usage})
-        return node_id, params
+        online_ips = {entry.uid: entry.ip_hashes for entry in stats.online_ips}
+        return node_id, params, online_ips
     except:
-        return node_id, []
+        return node_id, [], {}
 
 
 async def record_user_usages():
@@ -135,7 +140,22 @@ async def record_user_usages():
             for node_id, node in wildosnode.nodes.items()
         ]
     )
-    api_params = {node_id: params for node_id, params in list(results)}
+    api_params = {node_id: params for node_id, params, _ in results}
+
+    # the same ip seen by several nodes has the same fingerprint
+    online_ips = defaultdict(set)
+    for _, _, node_online_ips in results:
+        for uid, ip_hashes in node_online_ips.items():
+            online_ips[uid].update(ip_hashes)
+    await enforce_ip_limits(online_ips)
+
+    node_load = get_node_load()
+    for node_id, params, node_online_ips in results:
+        node_load.record_usage(
+            node_id,
+            sum(param["value"] for param in params) / TASKS_RECORD_USER_USAGES_INTERVAL,
+            len(node_online_ips),
+        )
 
     users_usage = defaultdict(int)
     for node_id, params in api_params.items():
@@ -0,0 +1,239 @@
+"""renders subscriptions again ahead of their clients after the cache was dropped"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config.env import (
+    SUBSCRIPTION_PREWARM_DELAY,
+    SUBSCRIPTION_PREWARM_MAX_USERS,
+    SUBSCRIPTION_PREWARM_RATE,
+)
+from app.db import GetDB, crud
+from app.models.settings import ConfigTypes
+from app.utils.share import (
+    get_rendered_subscription,
+    get_subscription_settings,
+    host_load,
+    host_topology,
+    rule_config_format,
+    subscription_cache_key,
+)
+from app.utils.subscription_cache import get_subscription_cache
+
+logger = logging.getLogger(__name__)
+
+# users loaded from the database at once
+CHUNK_SIZE = 100
+
+
+class PrewarmProgress:
+    """how far the current or last pre-warming run got"""
+
+    def __init__(self):
+        self.state = "idle"
+        self.total = 0
+        self.warmed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    def reset(self) -> None:
+        self.__init__()
+
+    @property
+    def pending(self) -> int:
+        return self.total - self.warmed - self.skipped - self.failed
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "total": self.total,
+            "warmed": self.warmed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "pending": self.pending,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class SubscriptionPrewarmer:
+    """
+    After a host topology or settings change dropped every cached
+    subscription, renders those of the clients expected back within the
+    cache's ttl again, soonest first, in the format their last user agent
+    got. Changes are debounced by `delay` seconds and a change during a run
+    starts it over. Renders are paced to `rate` per second, 0 only runs
+    when started by hand.
+    """
+
+    def __init__(
+        self,
+        rate: float = SUBSCRIPTION_PREWARM_RATE,
+        delay: float = SUBSCRIPTION_PREWARM_DELAY,
+        max_users: int = SUBSCRIPTION_PREWARM_MAX_USERS,
+    ):
+        self.rate = rate
+        self.delay = delay
+        self.max_users = max_users
+        self.progress = PrewarmProgress()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        listeners = get_subscription_cache().invalidation_listeners
+        if self._changed not in listeners:
+            listeners.append(self._changed)
+
+    def stop(self) -> None:
+        listeners = get_subscription_cache().invalidation_listeners
+        if self._changed in listeners:
+            listeners.remove(self._changed)
+        self.cancel()
+        self._loop = None
+
+    def _changed(self) -> None:
+        # invalidations are committed from request threads as well
+        if self._loop is not None and self.rate > 0:
+            self._loop.call_soon_threadsafe(self.run, self.delay)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def run(self, delay: float = 0.0) -> None:
+        """(re)start a run after `delay` seconds, replacing one waiting or running"""
+        self.cancel()
+        self._task = asyncio.ensure_future(self._run(delay))
+
+    def cancel(self) -> None:
+        if self.running:
+            self._task.cancel()
+            self.progress.state = "cancelled"
+            self.progress.finished_at = time.time()
+        self._task = None
+
+    async def _run(self, delay: float) -> None:
+        progress = self.progress
+        progress.reset()
+        if delay > 0:
+            progress.state = "waiting"
+            await asyncio.sleep(delay)
+        progress.state = "running"
+        progress.started_at = time.time()
+        try:
+            await self._warm(progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            progress.state = "failed"
+            logger.error("subscription pre-warming failed: %s", e)
+        else:
+            progress.state = "done"
+            logger.info(
+                "pre-warmed %i subscriptions, skipped %i, %i failed",
+                progress.warmed,
+                progress.skipped,
+                progress.failed,
+            )
+        progress.finished_at = time.time()
+
+    def _candidates(self, update_interval: int, ttl: float) -> list[int]:
+        """ids of users whose clients are expected within `ttl`, soonest first"""
+        now = datetime.now(timezone.utc)
+        interval = timedelta(hours=max(update_interval, 1))
+        horizon = now + timedelta(seconds=ttl)
+        with GetDB() as db:
+            clients = crud.get_subscription_clients(
+                db, (now - 2 * interval).replace(tzinfo=None)
+            )
+        due = sorted(
+            (expected, user_id)
+            for user_id, updated_at, _ in clients
+            if (expected := _utc(updated_at) + interval) <= horizon
+        )
+        return [user_id for _, user_id in due[: self.max_users]]
+
+    async def _warm(self, progress: PrewarmProgress) -> None:
+        cache = get_subscription_cache()
+        if not cache.enabled:
+            return
+        subscription_settings, user_agent_matcher = await get_subscription_settings()
+        user_ids = await asyncio.to_thread(
+            self._candidates, subscription_settings.update_interval, cache.ttl
+        )
+        progress.total = len(user_ids)
+        # keys are built from the templates of the current hosts
+        await asyncio.to_thread(host_topology.refresh)
+        next_render = time.monotonic()
+        for i in range(0, len(user_ids), CHUNK_SIZE):
+            with GetDB() as db:
+                db_users = await asyncio.to_thread(
+                    crud.get_subscription_users, db, user_ids[i : i + CHUNK_SIZE]
+                )
+                for db_user in db_users:
+                    result = user_agent_matcher.match(db_user.sub_last_user_agent)
+                    if result is None or result in (
+                        ConfigTypes.template,
+                        ConfigTypes.block,
+                    ):
+                        progress.skipped += 1
+                        continue
+                    config_format, as_base64 = rule_config_format(result)
+                    use_placeholder = (
+                        not db_user.is_active
+                        and subscription_settings.placeholder_if_disabled
+                    )
+                    key = subscription_cache_key(
+                        db_user,
+                        subscription_settings,
+                        config_format,
+                        as_base64,
+                        use_placeholder,
+                        host_load(subscription_settings),
+                    )
+                    if cache.cached(key):
+                        progress.skipped += 1
+                        continue
+                    if self.rate > 0:
+                        await asyncio.sleep(max(0.0, next_render - time.monotonic()))
+                        next_render = max(next_render, time.monotonic()) + 1 / self.rate
+                    try:
+                        await get_rendered_subscription(
+                            db_user,
+                            subscription_settings,
+                            config_format,
+                            as_base64,
+                            use_placeholder,
+                            prewarm=True,
+                        )
+                    except Exception as e:
+                        progress.failed += 1
+                        logger.debug(
+                            "failed to pre-warm the subscription of user %i: %s",
+                            db_user.id,
+                            e,
+                        )
+                    else:
+                        progress.warmed += 1
+            # users removed since they were picked
+            progress.skipped += min(CHUNK_SIZE, len(user_ids) - i) - len(db_users)
+
+    def get_metrics(self) -> dict:
+        return {
+            **self.progress.as_dict(),
+            "rate": self.rate,
+            "delay": self.delay,
+            "max_users": self.max_users,
+        }
+
+
+subscription_prewarmer = SubscriptionPrewarmer()
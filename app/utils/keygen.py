@@ -1,5 +1,8 @@
 import base64
+import threading
 import uuid
+from collections import OrderedDict
+from typing import NamedTuple
 
 import xxhash
 from nacl.public import PrivateKey
@@ -23,3 +26,38 @@ def gen_password(key: str) -> str:
 
 def generate_curve25519_pbk(key: str) -> str:
     return base64.b64encode(PrivateKey(key.encode()).encode()).decode()
+
+
+USER_CREDENTIALS_CACHE_SIZE = 10000
+
+
+class UserCredentials(NamedTuple):
+    uuid: uuid.UUID
+    password: str
+    ed25519: str
+
+
+_credentials: OrderedDict[str, UserCredentials] = OrderedDict()
+_credentials_lock = threading.Lock()
+
+
+def derive_credentials(key: str) -> UserCredentials:
+    """the proxy credentials of a subscription key, remembered for the most recent keys"""
+    with _credentials_lock:
+        credentials = _credentials.get(key)
+        if credentials is not None:
+            _credentials.move_to_end(key)
+            return credentials
+    credentials = UserCredentials(
+        uuid.UUID(gen_uuid(key)), gen_password(key), generate_curve25519_pbk(key)
+    )
+    with _credentials_lock:
+        _credentials[key] = credentials
+        if len(_credentials) > USER_CREDENTIALS_CACHE_SIZE:
+            _credentials.popitem(last=False)
+    return credentials
+
+
+def forget_credentials(key: str) -> None:
+    with _credentials_lock:
+        _credentials.pop(key, None)
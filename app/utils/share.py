@@ -1,50 +1,54 @@
+import asyncio
 import base64
 import ipaddress
 import json
 import random
 import secrets
+import threading
 from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime as dt, timedelta
-from importlib import resources
-from typing import Literal, Union, List, Type
+from functools import lru_cache
+from string import Formatter
+from typing import Literal, Union, List
 from uuid import UUID
 
 from jdatetime import date as jd
-from v2share import (
-    V2Data,
-    SingBoxConfig,
-    ClashConfig,
-    ClashMetaConfig,
-    XrayConfig,
-    WireGuardConfig,
-)
-from v2share.base import BaseConfig
+from sqlalchemy.orm import Session
+from v2share import V2Data
 from v2share.data import MuxCoolSettings as V2MuxCoolSettings
 from v2share.data import MuxSettings as V2MuxSettings
 from v2share.data import SingBoxMuxSettings as V2SingBoxMuxSettings
 from v2share.data import SplitHttpSettings as V2SplitHttpSettings
 from v2share.data import XMuxSettings as V2XMuxSettings
 from v2share.data import XrayNoise
-from v2share.links import LinksConfig
 
-from app.config.env import (
-    XRAY_SUBSCRIPTION_TEMPLATE,
-    SINGBOX_SUBSCRIPTION_TEMPLATE,
-    CLASH_SUBSCRIPTION_TEMPLATE,
-    SUBSCRIPTION_PAGE_TEMPLATE,
-)
+from app.config.env import SUBSCRIPTION_PAGE_TEMPLATE
 from app.db import GetDB
-from app.db.crud import get_hosts_for_user
+from app.db.crud import get_subscription_hosts
 from app.models.proxy import (
     InboundHostSecurity,
     SplitHttpSettings,
     MuxSettings,
 )
-from app.models.settings import SubscriptionSettings
+from app.models.settings import ConfigTypes, SubscriptionSettings
 from app.models.user import UserResponse, UserExpireStrategy
 from app.templates import render_template
-from app.utils.keygen import gen_uuid, gen_password, generate_curve25519_pbk
+from app.utils.keygen import UserCredentials, derive_credentials
+from app.utils.subscription_cache import (
+    RenderedSubscription,
+    get_subscription_cache,
+)
+from app.utils.subscription_render import (
+    render_pool,
+    render_subscription,
+    subscription_handlers,
+)
+from app.utils.subscription_settings import (
+    subscription_settings as subscription_settings_snapshot,
+)
 from app.utils.system import get_public_ip, readable_size
+from app.wildosnode.node_load import NodeLoadSnapshot, get_node_load
 
 SERVER_IP = get_public_ip()
 
@@ -53,27 +57,6 @@ ACTIVITY_EMOJIS = {
     False: "❌",
 }
 
-subscription_handlers: dict[str, Type[BaseConfig]] = {
-    "links": LinksConfig,
-    "xray": XrayConfig,
-    "clash-meta": ClashMetaConfig,
-    "clash": ClashConfig,
-    "sing-box": SingBoxConfig,
-    "wireguard": WireGuardConfig,
-}
-
-handlers_templates = {
-    LinksConfig: None,
-    WireGuardConfig: None,
-    XrayConfig: XRAY_SUBSCRIPTION_TEMPLATE
-    or resources.files("app.templates") / "xray.json",
-    ClashConfig: CLASH_SUBSCRIPTION_TEMPLATE,
-    ClashMetaConfig: CLASH_SUBSCRIPTION_TEMPLATE,
-    SingBoxConfig: SINGBOX_SUBSCRIPTION_TEMPLATE
-    or resources.files("app.templates") / "sing-box.json",
-}
-
-
 def generate_subscription_template(
     db_user, subscription_settings: SubscriptionSettings
 ):
@@ -84,6 +67,7 @@ def generate_subscription_template(
         and subscription_settings.placeholder_if_disabled,
         placeholder_remark=subscription_settings.placeholder_remark,
         shuffle=subscription_settings.shuffle_configs,
+        load=host_load(subscription_settings),
     ).split()
     return render_template(
         SUBSCRIPTION_PAGE_TEMPLATE,
@@ -98,7 +82,27 @@ def generate_subscription(
     use_placeholder: bool = False,
     placeholder_remark: str = "disabled",
     shuffle: bool = False,
+    db: Session | None = None,
+    load: NodeLoadSnapshot | None = None,
 ) -> str:
+    configs = build_subscription_configs(
+        user, config_format, use_placeholder, placeholder_remark, db, load
+    )
+    return render_subscription(config_format, configs, as_base64, shuffle)
+
+
+def build_subscription_configs(
+    user: "UserResponse",
+    config_format: str,
+    use_placeholder: bool = False,
+    placeholder_remark: str = "disabled",
+    db: Session | None = None,
+    load: NodeLoadSnapshot | None = None,
+) -> list[V2Data]:
+    """
+    the user specific part of a subscription, what's left is rendering it,
+    hosts are ordered by node `load` when it's given
+    """
     extra_data = UserResponse.model_validate(user).model_dump(
         exclude={"subscription_url", "services", "inbounds"}
     )
@@ -107,14 +111,6 @@ def generate_subscription(
     if config_format not in subscription_handlers.keys():
         raise ValueError(f'Unsupported format "{config_format}"')
 
-    subscription_handler_class = subscription_handlers[config_format]
-    if template_path := handlers_templates[subscription_handler_class]:
-        subscription_handler = subscription_handler_class(
-            template_path=template_path
-        )
-    else:
-        subscription_handler = subscription_handler_class()
-
     if use_placeholder:
         placeholder_config = V2Data(
             "vmess",
@@ -122,22 +118,149 @@ def generate_subscription(
             "127.0.0.1",
             80,
         )
-        configs = [placeholder_config]
+        return [placeholder_config]
+
+    return generate_user_configs(
+        user.service_ids,
+        user.key,
+        user.id,
+        format_variables,
+        chaining_support=subscription_handlers[config_format].chaining_support,
+        db=db,
+        load=load,
+    )
 
+
+def rule_config_format(result: ConfigTypes) -> tuple[str, bool]:
+    """the format and base64 flag a subscription rule's result renders as"""
+    if result == ConfigTypes.base64_links:
+        return "links", True
+    return result.value, False
+
+
+async def get_subscription_settings():
+    """the settings snapshot, reloaded off the event loop if it's stale"""
+    return subscription_settings_snapshot.current() or await asyncio.to_thread(
+        subscription_settings_snapshot.get
+    )
+
+
+def host_load(subscription_settings: SubscriptionSettings) -> NodeLoadSnapshot | None:
+    """the node load to order hosts by, if load-aware ordering is on"""
+    if subscription_settings.order_hosts_by_load:
+        return get_node_load().snapshot()
+    return None
+
+
+def _expiry(user) -> tuple:
+    return user.expire_strategy, user.expire_date, user.usage_duration
+
+
+# what each user specific format variable is computed from, days and
+# time left also move with the clock and are left to the cache's ttl
+USER_FORMAT_VARIABLES = {
+    "USERNAME": lambda user: user.username,
+    "DATA_USAGE": lambda user: readable_size(user.used_traffic),
+    "DATA_LIMIT": lambda user: user.data_limit,
+    "DATA_LEFT": lambda user: user.data_limit
+    and readable_size(max(user.data_limit - user.used_traffic, 0)),
+    "DAYS_LEFT": _expiry,
+    "EXPIRE_DATE": _expiry,
+    "JALALI_EXPIRE_DATE": _expiry,
+    "TIME_LEFT": _expiry,
+    "STATUS_EMOJI": lambda user: user.is_active,
+}
+
+
+@lru_cache(maxsize=1024)
+def template_variables(template: str | None) -> frozenset[str]:
+    """the user specific format variables `template` substitutes"""
+    if not template:
+        return frozenset()
+    try:
+        fields = {
+            field.split(".")[0].split("[")[0]
+            for _, field, _, _ in Formatter().parse(template)
+            if field
+        }
+    except ValueError:
+        return frozenset(USER_FORMAT_VARIABLES)
+    return frozenset(fields & USER_FORMAT_VARIABLES.keys())
+
+
+def subscription_cache_key(
+    db_user,
+    subscription_settings: SubscriptionSettings,
+    config_format: str,
+    as_base64: bool,
+    use_placeholder: bool,
+    load: NodeLoadSnapshot | None,
+) -> tuple:
+    if use_placeholder:
+        variables = template_variables(subscription_settings.placeholder_remark)
     else:
-        configs = generate_user_configs(
-            user.inbounds,
-            user.key,
-            user.id,
-            format_variables,
-            chaining_support=subscription_handler.chaining_support,
-        )
+        variables = host_topology.variables
+    return get_subscription_cache().key(
+        db_user,
+        config_format,
+        as_base64,
+        tuple(
+            (name, USER_FORMAT_VARIABLES[name](db_user)) for name in sorted(variables)
+        ),
+        use_placeholder,
+        subscription_settings.placeholder_remark,
+        subscription_settings.shuffle_configs,
+        load.epoch if load is not None else None,
+    )
 
-    subscription_handler.add_proxies(configs)
-    config = subscription_handler.render(sort=True, shuffle=shuffle)
 
-    return (
-        config if not as_base64 else base64.b64encode(config.encode()).decode()
+async def get_rendered_subscription(
+    db_user,
+    subscription_settings,
+    config_format: str,
+    as_base64: bool,
+    use_placeholder: bool,
+    prewarm: bool = False,
+) -> RenderedSubscription:
+    """
+    The cached subscription, or on a miss the user's configs built in a
+    thread and rendered by the render pool. The user must be loaded with
+    `crud.get_subscription_user` so building the cache key reads no rows.
+    """
+    load = host_load(subscription_settings)
+    # the key holds the format variables of the current hosts' templates
+    if host_topology.stale:
+        await asyncio.to_thread(host_topology.refresh)
+
+    def build() -> list[V2Data]:
+        # coalesced callers share this render, it can't use a caller's session
+        with GetDB() as db:
+            return build_subscription_configs(
+                db_user,
+                config_format,
+                use_placeholder,
+                subscription_settings.placeholder_remark,
+                db,
+                load,
+            )
+
+    async def render() -> str:
+        configs = await asyncio.to_thread(build)
+        return await render_pool.render(
+            config_format, configs, as_base64, subscription_settings.shuffle_configs
+        )
+
+    return await get_subscription_cache().get_or_render(
+        subscription_cache_key(
+            db_user,
+            subscription_settings,
+            config_format,
+            as_base64,
+            use_placeholder,
+            load,
+        ),
+        render,
+        prewarm,
     )
 
 
@@ -164,13 +287,20 @@ def format_time_left(seconds_left: int) -> str:
     return " ".join(result)
 
 
-def calculate_client_address(interface_address: str, user_id: int) -> str:
+@lru_cache(maxsize=256)
+def _parse_interface(interface_address: str):
     try:
         interface = ipaddress.ip_interface(interface_address)
-        address = interface.ip
-        network = interface.network
     except ValueError:
+        return None
+    return interface.ip, interface.network
+
+
+def calculate_client_address(interface_address: str, user_id: int) -> str:
+    parsed = _parse_interface(interface_address)
+    if parsed is None:
         return ""
+    address, network = parsed
     user_address = network[user_id]
     if user_address == network[0]:
         user_address = network.broadcast_address - 1
@@ -236,80 +366,60 @@ def setup_format_variables(extra_data: dict) -> dict:
     return format_variables
 
 
-def generate_user_configs(
-    inbounds: list,
-    key: str,
-    user_id: int,
-    format_variables: dict,
-    chaining_support: bool,
-) -> Union[List, str]:
-    salt = secrets.token_hex(8)
-    configs = []
-
-    with GetDB() as db:
-        hosts = get_hosts_for_user(db, user_id)
-
-    for host in hosts:
-        chained_hosts = [c.chained_host for c in host.chain]
-        if chained_hosts and not chaining_support:
-            continue
-        data = create_config(
-            host, key, format_variables, salt, user_id, chained_hosts
-        )
-        configs.append(data)
-
-    return configs
-
-
-def create_config(
-    host, key, format_variables, salt, user_id, next_hosts: list | None = None
-):
-    if next_hosts is None:
-        next_hosts = []
-
+@dataclass(frozen=True)
+class HostDescriptor:
+    """everything about a host that doesn't depend on the user"""
+
+    id: int
+    protocol: str
+    network: str | None
+    has_inbound: bool
+    node_id: int | None
+    remark: str
+    address: str
+    port: int
+    path: str | None
+    inbound_path: str | None
+    sni_list: tuple[str, ...]
+    host_list: tuple[str, ...]
+    tls: str | None
+    header_type: str | None
+    alpn: str | None
+    fingerprint: str | None
+    reality_pbk: str | None
+    reality_sid: str | None
+    interface_address: str | None
+    flow: str | None
+    dns_servers: tuple[str, ...]
+    mtu: int | None
+    allowed_ips: tuple[str, ...] | None
+    allow_insecure: bool
+    uuid: UUID | None
+    password: str | None
+    early_data: int | None
+    splithttp_settings: V2SplitHttpSettings | None
+    mux_settings: V2MuxSettings | None
+    http_headers: dict | None
+    shadowsocks_method: str
+    shadowtls_version: int | None
+    weight: int
+    xray_noises: tuple[XrayNoise, ...] | None
+    fragment: dict | None
+    chain: tuple["HostDescriptor", ...] = ()
+
+
+def compile_host(host, chain: bool = True) -> HostDescriptor:
+    """
+    parse and validate a host once, `host` must still be attached to its
+    session since its inbound and chain are lazy loaded
+    """
     if host.inbound:
-        inbound, protocol = (
-            json.loads(host.inbound.config),
-            host.inbound.protocol,
-        )
+        inbound = json.loads(host.inbound.config)
+        protocol = host.inbound.protocol.value
         network = inbound.get("network")
-        auth_uuid, auth_password = UUID(gen_uuid(key)), gen_password(key)
     else:
         inbound, protocol, network = {}, host.host_protocol, host.host_network
-        auth_uuid, auth_password = (
-            UUID(host.uuid) if host.uuid else None
-        ), host.password
-
-    format_variables.update(
-        {
-            "PROTOCOL": (
-                host.inbound.protocol.value
-                if host.inbound
-                else host.host_protocol
-            )
-        }
-    )
-    format_variables.update({"TRANSPORT": network or "<missing>"})
-
-    host_snis = host.sni.split(",") if host.sni else []
-    sni_list = host_snis or inbound.get("sni", [])
-    if sni_list:
-        sni = random.choice(sni_list).replace("*", salt)
-    else:
-        sni = ""
 
-    host_hosts = host.host.split(",") if host.host else []
-    req_host_list = host_hosts or inbound.get("host", [])
-    if req_host_list:
-        req_host = random.choice(req_host_list).replace("*", salt)
-    else:
-        req_host = ""
-
-    host_tls = (
-        None
-        if host.security == InboundHostSecurity.inbound_default
-        else host.security.value
-    )
     splithttp_settings = (
         SplitHttpSettings.model_validate(host.splithttp_settings)
         if host.splithttp_settings
@@ -321,40 +431,46 @@ def create_config(
         else None
     )
 
-    data = V2Data(
-        host.inbound.protocol.value if host.inbound else host.host_protocol,
-        host.remark.format_map(format_variables),
-        host.address.format_map(format_variables),
-        host.port or inbound.get("port", 0),
-        transport_type=network,
-        sni=sni,
-        host=req_host,
-        tls=host_tls or inbound.get("tls"),
+    return HostDescriptor(
+        id=host.id,
+        protocol=protocol,
+        network=network,
+        has_inbound=host.inbound is not None,
+        node_id=host.inbound.node_id if host.inbound else None,
+        remark=host.remark,
+        address=host.address,
+        port=host.port or inbound.get("port", 0),
+        path=host.path,
+        inbound_path=inbound.get("path"),
+        sni_list=tuple(
+            host.sni.split(",") if host.sni else inbound.get("sni", [])
+        ),
+        host_list=tuple(
+            host.host.split(",") if host.host else inbound.get("host", [])
+        ),
+        tls=(
+            None
+            if host.security == InboundHostSecurity.inbound_default
+            else host.security.value
+        )
+        or inbound.get("tls"),
         header_type=host.header_type or inbound.get("header_type"),
         alpn=host.alpn if host.alpn != "none" else None,
-        path=(
-            host.path.format_map(format_variables)
-            if host.path
-            else inbound.get("path")
-        ),
         fingerprint=host.fingerprint.value or inbound.get("fp"),
         reality_pbk=inbound.get("pbk"),
         reality_sid=inbound.get("sid"),
-        client_address=calculate_client_address(
-            inbound.get("address"), user_id
-        ),
+        interface_address=inbound.get("address"),
         flow=host.flow or inbound.get("flow"),
-        dns_servers=(host.dns_servers.split(",") if host.dns_servers else []),
+        dns_servers=tuple(host.dns_servers.split(",") if host.dns_servers else ()),
         mtu=host.mtu,
         allowed_ips=(
-            list(map(str.strip, host.allowed_ips.split(",")))
+            tuple(map(str.strip, host.allowed_ips.split(",")))
             if host.allowed_ips
             else None
         ),
         allow_insecure=host.allowinsecure,
-        uuid=auth_uuid,
-        password=auth_password,
-        ed25519=generate_curve25519_pbk(key),
+        uuid=UUID(host.uuid) if not host.inbound and host.uuid else None,
+        password=None if host.inbound else host.password,
         early_data=host.early_data,
         splithttp_settings=(
             V2SplitHttpSettings(
@@ -397,20 +513,214 @@ def create_config(
         or inbound.get("shadowtls_version"),
         weight=host.weight,
         xray_noises=(
-            [XrayNoise(**noise) for noise in host.udp_noises]
+            tuple(XrayNoise(**noise) for noise in host.udp_noises)
             if host.udp_noises
             else None
         ),
+        fragment=host.fragment or None,
+        # only the first level of a chain is followed, like the nodes do
+        chain=(
+            tuple(compile_host(c.chained_host, chain=False) for c in host.chain)
+            if chain
+            else ()
+        ),
+    )
+
+
+class HostTopology:
+    """
+    Every enabled host compiled once and indexed by the services it's
+    offered to, rebuilt whenever a host, chain, inbound or service changes.
+    A user's hosts are then looked up from their service ids alone.
+    """
+
+    def __init__(self):
+        self._version = -1
+        self._by_service: dict[int, tuple[HostDescriptor, ...]] = {}
+        self._universal: tuple[HostDescriptor, ...] = ()
+        self._variables: frozenset[str] = frozenset()
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        return self._version != get_subscription_cache().hosts_version
+
+    @property
+    def variables(self) -> frozenset[str]:
+        """
+        the user specific format variables any host's templates substitute,
+        all of them until the current topology was built
+        """
+        if self.stale:
+            return frozenset(USER_FORMAT_VARIABLES)
+        return self._variables
+
+    def _build(self, db: Session) -> None:
+        by_service: dict[int, list[HostDescriptor]] = defaultdict(list)
+        universal = []
+        variables = set()
+        for host in get_subscription_hosts(db):
+            descriptor = compile_host(host)
+            for compiled in (descriptor, *descriptor.chain):
+                for template in (compiled.remark, compiled.address, compiled.path):
+                    variables |= template_variables(template)
+            if host.inbound_id is not None:
+                service_ids = host.inbound.service_ids if host.inbound else []
+            else:
+                service_ids = host.service_ids
+                if host.universal:
+                    universal.append(descriptor)
+            for service_id in service_ids:
+                by_service[service_id].append(descriptor)
+        self._by_service = {k: tuple(v) for k, v in by_service.items()}
+        self._universal = tuple(universal)
+        self._variables = frozenset(variables)
+
+    def refresh(self, db: Session | None = None) -> None:
+        """rebuild the topology if a host, chain, inbound or service changed since"""
+        if db is None:
+            with GetDB() as db:
+                return self.refresh(db)
+        version = get_subscription_cache().hosts_version
+        with self._lock:
+            if version != self._version:
+                self._build(db)
+                # a change committed while building is picked up by the next call
+                self._version = version
+
+    def hosts_for(self, db: Session, service_ids: list[int]) -> list[HostDescriptor]:
+        self.refresh(db)
+        with self._lock:
+            by_service, universal = self._by_service, self._universal
+        hosts = {host.id: host for host in universal}
+        for service_id in service_ids:
+            for host in by_service.get(service_id, ()):
+                hosts[host.id] = host
+        return [hosts[host_id] for host_id in sorted(hosts)]
+
+
+host_topology = HostTopology()
+
+
+def order_hosts_by_load(
+    hosts: list[HostDescriptor], load: NodeLoadSnapshot
+) -> list[HostDescriptor]:
+    """
+    hosts on the least loaded nodes first, hosts on unavailable nodes left
+    out unless no other host is left. Renderers sort by weight afterwards
+    and keep this order within the same weight.
+    """
+    available = [host for host in hosts if host.node_id not in load.unavailable]
+    return sorted(available or hosts, key=lambda host: load.level(host.node_id))
+
+
+def generate_user_configs(
+    service_ids: list[int],
+    key: str,
+    user_id: int,
+    format_variables: dict,
+    chaining_support: bool,
+    db: Session | None = None,
+    load: NodeLoadSnapshot | None = None,
+) -> Union[List, str]:
+    salt = secrets.token_hex(8)
+    configs = []
+
+    credentials = derive_credentials(key)
+
+    if db is None:
+        with GetDB() as db:
+            hosts = host_topology.hosts_for(db, service_ids)
+    else:
+        hosts = host_topology.hosts_for(db, service_ids)
+    if load is not None:
+        hosts = order_hosts_by_load(hosts, load)
+
+    for host in hosts:
+        if host.chain and not chaining_support:
+            continue
+        data = create_config(host, credentials, format_variables, salt, user_id)
+        configs.append(data)
+
+    return configs
+
+
+def create_config(
+    host: HostDescriptor,
+    credentials: UserCredentials,
+    format_variables,
+    salt,
+    user_id,
+    chain=None,
+):
+    if chain is None:
+        chain = host.chain
+
+    if host.has_inbound:
+        auth_uuid, auth_password = credentials.uuid, credentials.password
+    else:
+        auth_uuid, auth_password = host.uuid, host.password
+
+    format_variables.update({"PROTOCOL": host.protocol})
+    format_variables.update({"TRANSPORT": host.network or "<missing>"})
+
+    if host.sni_list:
+        sni = random.choice(host.sni_list).replace("*", salt)
+    else:
+        sni = ""
+
+    if host.host_list:
+        req_host = random.choice(host.host_list).replace("*", salt)
+    else:
+        req_host = ""
+
+    data = V2Data(
+        host.protocol,
+        host.remark.format_map(format_variables),
+        host.address.format_map(format_variables),
+        host.port,
+        transport_type=host.network,
+        sni=sni,
+        host=req_host,
+        tls=host.tls,
+        header_type=host.header_type,
+        alpn=host.alpn,
+        path=(
+            host.path.format_map(format_variables)
+            if host.path
+            else host.inbound_path
+        ),
+        fingerprint=host.fingerprint,
+        reality_pbk=host.reality_pbk,
+        reality_sid=host.reality_sid,
+        client_address=calculate_client_address(
+            host.interface_address, user_id
+        ),
+        flow=host.flow,
+        dns_servers=list(host.dns_servers),
+        mtu=host.mtu,
+        allowed_ips=(
+            list(host.allowed_ips) if host.allowed_ips is not None else None
+        ),
+        allow_insecure=host.allow_insecure,
+        uuid=auth_uuid,
+        password=auth_password,
+        ed25519=credentials.ed25519,
+        early_data=host.early_data,
+        splithttp_settings=host.splithttp_settings,
+        mux_settings=host.mux_settings,
+        http_headers=host.http_headers,
+        shadowsocks_method=host.shadowsocks_method,
+        shadowtls_version=host.shadowtls_version,
+        weight=host.weight,
+        xray_noises=(
+            list(host.xray_noises) if host.xray_noises is not None else None
+        ),
         next=(
             create_config(
-                next_hosts[0],
-                key,
-                format_variables,
-                salt,
-                user_id,
-                next_hosts[1:],
+                chain[0], credentials, format_variables, salt, user_id, chain[1:]
             )
-            if next_hosts
+            if chain
             else None
         ),
     )
@@ -0,0 +1,350 @@
+"""keeps rendered subscription bodies until something they're built from changes"""
+
+import asyncio
+import gzip
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+import xxhash
+from sqlalchemy import event
+
+from app.config.env import SUBSCRIPTION_CACHE_MAX_BYTES, SUBSCRIPTION_CACHE_TTL
+from app.db.base import SessionLocal
+from app.db.models import (
+    HostChain,
+    Inbound,
+    InboundHost,
+    Service,
+    Settings,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# rows every user's host list is built from
+TOPOLOGY_MODELS = (InboundHost, HostChain, Inbound, Service)
+
+# smaller bodies are always sent as they are
+COMPRESS_MIN_SIZE = 1024
+
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+if brotli is not None:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=5)
+
+
+class RenderedSubscription:
+    """a rendered body with its content hash and compressed variants"""
+
+    __slots__ = ("key", "body", "etag", "created", "variants")
+
+    def __init__(self, key: tuple, body: str):
+        self.key = key
+        self.body = body.encode()
+        self.etag = xxhash.xxh128_hexdigest(self.body)
+        self.created = time.monotonic()
+        self.variants: dict[str, bytes] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(map(len, self.variants.values()))
+
+
+class SubscriptionCache:
+    """
+    An LRU of rendered subscriptions bounded by the size of the bodies.
+
+    Keys hold the user's id, key and services and the inputs of the format
+    variables the hosts' templates substitute, so usage updates written with
+    bulk statements only miss when a template shows the usage. Host topology
+    and settings changes bump a version that's part of every key, user
+    changes drop that user's entries. `ttl` bounds how long the per-render
+    parts (SNI salt, shuffled order, days and time left) are reused.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = SUBSCRIPTION_CACHE_MAX_BYTES,
+        ttl: float = SUBSCRIPTION_CACHE_TTL,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.settings_version = 0
+        self.hosts_version = 0
+        self._entries: OrderedDict[tuple, RenderedSubscription] = OrderedDict()
+        self._by_user: dict[int, set[tuple]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.not_modified = 0
+        self.coalesced = 0
+        self.prewarmed = 0
+        self._rendering: dict[tuple, asyncio.Future] = {}
+        # called after host topology or settings changes, e.g. to warm the cache up again
+        self.invalidation_listeners: list[Callable[[], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def key(
+        self,
+        db_user,
+        config_format: str,
+        as_base64: bool,
+        variables: tuple,
+        *options,
+    ) -> tuple:
+        """
+        the cache key of a user's subscription in one format, `variables`
+        holds what the substituted format variables are computed from
+        """
+        return (
+            db_user.id,
+            config_format,
+            as_base64,
+            options,
+            self.settings_version,
+            self.hosts_version,
+            db_user.key,
+            tuple(db_user.service_ids),
+            variables,
+        )
+
+    def cached(self, key: tuple) -> bool:
+        """whether `key` is cached and fresh, without counting a lookup"""
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry.created <= self.ttl
+
+    def _lookup(self, key: tuple, count: bool = True) -> RenderedSubscription | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return entry
+                self._remove(key)
+                self.expirations += 1
+            if count:
+                self.misses += 1
+        return None
+
+    def _rendered(self, key: tuple, body: str) -> RenderedSubscription:
+        entry = RenderedSubscription(key, body)
+        with self._lock:
+            # a change committed while rendering moved the versions on
+            if key[4:6] == (self.settings_version, self.hosts_version):
+                self._store(entry)
+        return entry
+
+    async def get_or_render(
+        self,
+        key: tuple,
+        render: Callable[[], Awaitable[str]],
+        prewarm: bool = False,
+    ) -> RenderedSubscription:
+        """
+        the cached subscription or `render()`'s, concurrent misses share one
+        render. `prewarm` lookups aren't counted as client hits or misses.
+        """
+        if not self.enabled:
+            return RenderedSubscription(key, await render())
+        entry = self._lookup(key, count=not prewarm)
+        if entry is not None:
+            return entry
+        task = self._rendering.get(key)
+        if task is None:
+
+            async def render_and_store() -> RenderedSubscription:
+                entry = self._rendered(key, await render())
+                if prewarm:
+                    self.prewarmed += 1
+                return entry
+
+            task = asyncio.ensure_future(render_and_store())
+            self._rendering[key] = task
+            task.add_done_callback(lambda _: self._rendering.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def encode(self, entry: RenderedSubscription, encoding: str) -> bytes:
+        """the body compressed with `encoding`, compressed once per entry"""
+        variant = entry.variants.get(encoding)
+        if variant is not None:
+            return variant
+        variant = ENCODERS[encoding](entry.body)
+        with self._lock:
+            if encoding not in entry.variants:
+                entry.variants[encoding] = variant
+                if self._entries.get(entry.key) is entry:
+                    self._bytes += len(variant)
+                    self._evict()
+        return variant
+
+    def _store(self, entry: RenderedSubscription) -> None:
+        if entry.size > self.max_bytes:
+            return
+        if entry.key in self._entries:
+            self._remove(entry.key)
+        self._entries[entry.key] = entry
+        self._by_user.setdefault(entry.key[0], set()).add(entry.key)
+        self._bytes += entry.size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+            self.invalidations += 1
+
+    def invalidate_hosts(self) -> None:
+        with self._lock:
+            self.hosts_version += 1
+            self._clear()
+        self._notify()
+
+    def invalidate_settings(self) -> None:
+        with self._lock:
+            self.settings_version += 1
+            self._clear()
+        self._notify()
+
+    def _notify(self) -> None:
+        for listener in self.invalidation_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error("subscription cache invalidation listener failed: %s", e)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._by_user.clear()
+        self._bytes = 0
+        self.invalidations += 1
+
+    def get_metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "not_modified": self.not_modified,
+            "coalesced": self.coalesced,
+            "prewarmed": self.prewarmed,
+            "encodings": list(ENCODERS),
+            "settings_version": self.settings_version,
+            "hosts_version": self.hosts_version,
+        }
+
+
+_cache: SubscriptionCache | None = None
+
+
+def get_subscription_cache() -> SubscriptionCache:
+    global _cache
+    if _cache is None:
+        _cache = SubscriptionCache()
+    return _cache
+
+
+def get_metrics() -> dict:
+    return get_subscription_cache().get_metrics()
+
+
+def _pending(session) -> dict:
+    return session.info.setdefault(
+        "subscription_cache", {"users": set(), "hosts": False, "settings": False}
+    )
+
+
+def _record(session, model, user_id: int | None = None) -> None:
+    if issubclass(model, TOPOLOGY_MODELS):
+        _pending(session)["hosts"] = True
+    elif issubclass(model, Settings):
+        _pending(session)["settings"] = True
+    elif issubclass(model, User) and user_id is not None:
+        _pending(session)["users"].add(user_id)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session, _flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        _record(session, type(obj), getattr(obj, "id", None))
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    # bulk user updates (usage, sub_updated_at) change the key by themselves
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    models = [
+        mapper.class_
+        for mapper in orm_execute_state.all_mappers
+        if issubclass(mapper.class_, (*TOPOLOGY_MODELS, Settings))
+    ]
+    if not models:
+        return None
+    result = orm_execute_state.invoke_statement()
+    # statements matching no rows change nothing, -1 is an unknown count
+    if getattr(result, "rowcount", -1) != 0:
+        for model in models:
+            _record(orm_execute_state.session, model)
+    return result
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session):
+    pending = session.info.pop("subscription_cache", None)
+    if pending is None:
+        return
+    cache = get_subscription_cache()
+    if pending["settings"]:
+        cache.invalidate_settings()
+    if pending["hosts"]:
+        cache.invalidate_hosts()
+    for user_id in pending["users"]:
+        cache.invalidate_user(user_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("subscription_cache", None)
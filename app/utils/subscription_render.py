@@ -0,0 +1,190 @@
+"""renders subscription documents, in worker processes when the pool is enabled"""
+
+import asyncio
+import base64
+import bisect
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib import resources
+from typing import Type
+
+from v2share import (
+    V2Data,
+    SingBoxConfig,
+    ClashConfig,
+    ClashMetaConfig,
+    XrayConfig,
+    WireGuardConfig,
+)
+from v2share.base import BaseConfig
+from v2share.links import LinksConfig
+
+from app.config.env import (
+    XRAY_SUBSCRIPTION_TEMPLATE,
+    SINGBOX_SUBSCRIPTION_TEMPLATE,
+    CLASH_SUBSCRIPTION_TEMPLATE,
+    SUBSCRIPTION_RENDER_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+subscription_handlers: dict[str, Type[BaseConfig]] = {
+    "links": LinksConfig,
+    "xray": XrayConfig,
+    "clash-meta": ClashMetaConfig,
+    "clash": ClashConfig,
+    "sing-box": SingBoxConfig,
+    "wireguard": WireGuardConfig,
+}
+
+handlers_templates = {
+    LinksConfig: None,
+    WireGuardConfig: None,
+    XrayConfig: XRAY_SUBSCRIPTION_TEMPLATE
+    or resources.files("app.templates") / "xray.json",
+    ClashConfig: CLASH_SUBSCRIPTION_TEMPLATE,
+    ClashMetaConfig: CLASH_SUBSCRIPTION_TEMPLATE,
+    SingBoxConfig: SINGBOX_SUBSCRIPTION_TEMPLATE
+    or resources.files("app.templates") / "sing-box.json",
+}
+
+
+def subscription_handler(config_format: str) -> BaseConfig:
+    if config_format not in subscription_handlers.keys():
+        raise ValueError(f'Unsupported format "{config_format}"')
+
+    subscription_handler_class = subscription_handlers[config_format]
+    if template_path := handlers_templates[subscription_handler_class]:
+        return subscription_handler_class(template_path=template_path)
+    return subscription_handler_class()
+
+
+def render_subscription(
+    config_format: str,
+    configs: list[V2Data],
+    as_base64: bool = False,
+    shuffle: bool = False,
+) -> str:
+    handler = subscription_handler(config_format)
+    handler.add_proxies(configs)
+    config = handler.render(sort=True, shuffle=shuffle)
+
+    return (
+        config if not as_base64 else base64.b64encode(config.encode()).decode()
+    )
+
+
+def _timed_render(*args) -> tuple[str, float]:
+    started = time.perf_counter()
+    return render_subscription(*args), time.perf_counter() - started
+
+
+class Histogram:
+    """counts of observations in milliseconds, cumulative like prometheus buckets"""
+
+    BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        buckets, total = {}, 0
+        for bound, count in zip((*self.BUCKETS, "+Inf"), self.counts):
+            total += count
+            buckets[str(bound)] = total
+        return {"buckets": buckets, "count": self.count, "sum": self.sum}
+
+
+class RenderPool:
+    """
+    Renders subscriptions in `workers` spawned processes so big Clash and
+    sing-box documents don't hold the GIL of the API process. With no
+    workers, or after the pool broke, rendering runs in a thread instead.
+    """
+
+    def __init__(self, workers: int = SUBSCRIPTION_RENDER_WORKERS):
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.renders = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.render_time = Histogram()
+        self.queue_time = Histogram()
+
+    def _get_executor(self) -> ProcessPoolExecutor | None:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def render(
+        self,
+        config_format: str,
+        configs: list[V2Data],
+        as_base64: bool = False,
+        shuffle: bool = False,
+    ) -> str:
+        args = (config_format, configs, as_base64, shuffle)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        started = time.perf_counter()
+        try:
+            if executor is not None:
+                try:
+                    body, render_seconds = await loop.run_in_executor(
+                        executor, _timed_render, *args
+                    )
+                except BrokenProcessPool:
+                    logger.warning("subscription render pool broke, restarting it")
+                    self._executor = None
+                    executor.shutdown(wait=False)
+                    executor = None
+                    self.fallbacks += 1
+            if executor is None:
+                body, render_seconds = await asyncio.to_thread(_timed_render, *args)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.queue_depth -= 1
+        self.renders += 1
+        self.render_time.observe(render_seconds * 1000)
+        self.queue_time.observe(
+            max(0.0, time.perf_counter() - started - render_seconds) * 1000
+        )
+        return body
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "renders": self.renders,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "render_time_ms": self.render_time.snapshot(),
+            "queue_time_ms": self.queue_time.snapshot(),
+        }
+
+
+render_pool = RenderPool()
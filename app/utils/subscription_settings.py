@@ -0,0 +1,101 @@
+"""an in-process snapshot of the subscription settings and their user-agent rules"""
+
+import logging
+import re
+import threading
+from functools import lru_cache
+
+from app.db import GetDB
+from app.db.models import Settings
+from app.models.settings import ConfigTypes, SubscriptionRule, SubscriptionSettings
+from app.utils.subscription_cache import get_subscription_cache
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT_CACHE_SIZE = 1024
+
+# numbered backreferences can't survive being renumbered into one pattern
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class UserAgentMatcher:
+    """
+    The rules compiled into one alternation, tried in order like `re.match`
+    on each of them would. The result of a user agent is remembered.
+    """
+
+    def __init__(self, rules: list[SubscriptionRule]):
+        self._results: dict[int, ConfigTypes] = {}
+        self._rules: list[tuple[re.Pattern, ConfigTypes]] = []
+        self._combined: re.Pattern | None = None
+        parts = []
+        group = 1
+        for rule in rules:
+            pattern = rule.pattern
+            if isinstance(pattern, str):
+                try:
+                    pattern = re.compile(pattern)
+                except re.error as e:
+                    logger.warning("skipping subscription rule `%s`: %s", pattern, e)
+                    continue
+            self._rules.append((pattern, rule.result))
+            self._results[group] = rule.result
+            parts.append(f"({pattern.pattern})")
+            group += 1 + pattern.groups
+        if parts and all(
+            p.flags == re.UNICODE and not _BACKREFERENCE.search(p.pattern)
+            for p, _ in self._rules
+        ):
+            try:
+                self._combined = re.compile("|".join(parts))
+            except re.error:
+                pass
+        self.match = lru_cache(maxsize=USER_AGENT_CACHE_SIZE)(self._match)
+
+    def _match(self, user_agent: str) -> ConfigTypes | None:
+        """the result of the first rule matching `user_agent`"""
+        if self._combined is not None:
+            match = self._combined.match(user_agent)
+            if match is None or match.lastindex is None:
+                return None
+            return self._results[match.lastindex]
+        for pattern, result in self._rules:
+            if pattern.match(user_agent):
+                return result
+        return None
+
+
+class SubscriptionSettingsSnapshot:
+    """reloaded from the database once the settings have changed"""
+
+    def __init__(self):
+        self._version: int | None = None
+        self._snapshot: tuple[SubscriptionSettings, UserAgentMatcher] | None = None
+        self._lock = threading.Lock()
+
+    def set(self, settings: SubscriptionSettings, version: int | None = None) -> None:
+        matcher = UserAgentMatcher(settings.rules)
+        with self._lock:
+            self._snapshot = (settings, matcher)
+            self._version = (
+                get_subscription_cache().settings_version if version is None else version
+            )
+
+    def current(self) -> tuple[SubscriptionSettings, UserAgentMatcher] | None:
+        """the snapshot if it's up to date, without touching the database"""
+        if self._version != get_subscription_cache().settings_version:
+            return None
+        return self._snapshot
+
+    def get(self) -> tuple[SubscriptionSettings, UserAgentMatcher]:
+        version = get_subscription_cache().settings_version
+        if self._version != version:
+            with GetDB() as db:
+                settings = SubscriptionSettings.model_validate(
+                    db.query(Settings.subscription).first()[0]
+                )
+            self.set(settings, version)
+        return self._snapshot
+
+
+subscription_settings = SubscriptionSettingsSnapshot()
@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 from typing import AsyncGenerator, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .service_pb2 import PeakEvent, HostSystemMetrics, FileInfo, BackendStats
+    from .service_pb2 import PeakEvent, HostSystemMetrics, HostMetricsHistory, FileInfo, BackendStats
     from google.protobuf.internal.containers import RepeatedScalarFieldContainer, RepeatedCompositeFieldContainer
 
 
@@ -16,10 +16,17 @@ class WildosNodeBase(ABC):
         """updates a user on the node"""
 
     async def fetch_users_stats(self):
-        """get user stats from the node"""
-
-    async def get_logs(self, name: str, include_buffer: bool) -> AsyncGenerator[str, None]:
-        """Return async generator for log lines"""
+        """get user stats and online IPs from the node"""
+
+    async def get_logs(
+        self,
+        name: str,
+        include_buffer: bool,
+        level: str | None = None,
+        pattern: str | None = None,
+        user: str | None = None,
+    ) -> AsyncGenerator[list[str], None]:
+        """Return async generator for batches of log lines filtered on the node"""
         if False:  # Make this a generator
             yield
 
@@ -39,6 +46,11 @@ class WildosNodeBase(ABC):
         """Get host system metrics (CPU, RAM, disk, network, uptime)"""
         ...
 
+    async def get_host_metrics_history(
+        self, since_ms: int = 0, until_ms: int | None = None, max_points: int = 0
+    ) -> 'HostMetricsHistory':
+        """Get sampled host metrics history, downsampled on the node"""
+
     async def get_host_open_ports(self):
         """Get list of open ports on host system"""
         pass
@@ -73,8 +85,8 @@ class WildosNodeBase(ABC):
         """Get stats for all backends of a node in one request"""
         ...
 
-    async def stream_peak_events(self) -> AsyncGenerator['PeakEvent', None]:
-        """WebSocket endpoint for real-time peak events streaming"""
+    async def stream_peak_events(self, after_seq: int = 0) -> AsyncGenerator['PeakEvent', None]:
+        """Stream real-time peak events, resuming after `after_seq`"""
         if False:  # Make this a generator
             yield
 
@@ -0,0 +1,294 @@
+"""keeps the latest host metrics and backend stats of every node in memory"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from app.config.env import (
+    FLEET_METRICS_HISTORY_SIZE,
+    FLEET_METRICS_INTERVAL,
+    FLEET_METRICS_MAX_AGE,
+    NODE_MAINTENANCE_CONCURRENCY,
+)
+from app.models.node import (
+    BackendStats,
+    CPUMetrics,
+    DiskMetrics,
+    DiskPartition,
+    HostMetricsSample,
+    HostSystemMetrics,
+    MemoryMetrics,
+    NetworkInterface,
+    NetworkMetrics,
+    UptimeMetrics,
+)
+from .scheduler import MaintenanceJob, get_maintenance_scheduler
+
+logger = logging.getLogger(__name__)
+
+GB = 1024**3
+
+
+def _format_uptime(seconds: int) -> str:
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    return f"{days}d {hours}h {seconds // 60}m"
+
+
+def host_metrics_from_proto(metrics) -> HostSystemMetrics:
+    """the api model of a node's `HostSystemMetrics` message"""
+    memory_total = int(metrics.memory_total * GB)
+    memory_used = int(memory_total * metrics.memory_usage / 100)
+    disk_total = int(metrics.disk_total * GB)
+    disk_used = int(disk_total * metrics.disk_usage / 100)
+    return HostSystemMetrics(
+        cpu=CPUMetrics(
+            usage=metrics.cpu_usage,
+            load_average=[
+                metrics.load_average_1m,
+                metrics.load_average_5m,
+                metrics.load_average_15m,
+            ],
+        ),
+        memory=MemoryMetrics(
+            total=str(memory_total),
+            used=str(memory_used),
+            available=str(memory_total - memory_used),
+            usage_percent=metrics.memory_usage,
+        ),
+        disk=DiskMetrics(
+            root_usage_percent=metrics.disk_usage,
+            partitions=[
+                DiskPartition(
+                    device="",
+                    mount_point="/",
+                    total=str(disk_total),
+                    used=str(disk_used),
+                    available=str(disk_total - disk_used),
+                    usage_percent=metrics.disk_usage,
+                )
+            ],
+        ),
+        network=NetworkMetrics(
+            interfaces=[
+                NetworkInterface(
+                    name=nic.name,
+                    ip="",
+                    rx_bytes=str(nic.bytes_received),
+                    tx_bytes=str(nic.bytes_sent),
+                    speed="",
+                )
+                for nic in metrics.network_interfaces
+            ]
+        ),
+        uptime=UptimeMetrics(
+            seconds=metrics.uptime_seconds,
+            formatted=_format_uptime(metrics.uptime_seconds),
+        ),
+        open_ports=[],
+    )
+
+
+class NodeTelemetry:
+    """
+    the last polled host metrics and backend stats of a node, each with the
+    error of its last poll so one failing RPC doesn't hide the other
+    """
+
+    def __init__(self, node_id: int, history_size: int):
+        self.node_id = node_id
+        self.host: HostSystemMetrics | None = None
+        self.backends: dict[str, BackendStats] | None = None
+        self.updated_at = 0.0
+        self.backends_updated_at = 0.0
+        self.host_error: str | None = None
+        self.backends_error: str | None = None
+        self.history: deque[HostMetricsSample] = deque(maxlen=history_size)
+        # short lived answers of the other per-node endpoints, by request
+        self.responses: dict[tuple, tuple[float, Any]] = {}
+        self._poll: asyncio.Task | None = None
+
+    @property
+    def error(self) -> str | None:
+        errors = [
+            f"{part}: {error}"
+            for part, error in (
+                ("host", self.host_error),
+                ("backends", self.backends_error),
+            )
+            if error is not None
+        ]
+        return "; ".join(errors) or None
+
+    def age(self) -> float:
+        return time.time() - self.updated_at if self.updated_at else float("inf")
+
+    def record_backends(self, backends: dict) -> None:
+        self.backends = {
+            name: BackendStats(running=bool(stats.running))
+            for name, stats in backends.items()
+        }
+        self.backends_updated_at = time.time()
+        self.backends_error = None
+
+    def record_host(self, metrics) -> None:
+        self.host = host_metrics_from_proto(metrics)
+        self.host_error = None
+        self.history.append(
+            HostMetricsSample(
+                timestamp_ms=int(time.time() * 1000),
+                cpu_usage=metrics.cpu_usage,
+                memory_usage=metrics.memory_usage,
+                disk_usage=metrics.disk_usage,
+                load_average_1m=metrics.load_average_1m,
+                network_bytes_sent=sum(n.bytes_sent for n in metrics.network_interfaces),
+                network_bytes_received=sum(
+                    n.bytes_received for n in metrics.network_interfaces
+                ),
+            )
+        )
+
+
+class FleetTelemetry:
+    """
+    Polls the host metrics and backend stats of all nodes on one schedule so
+    dashboard reads are answered from memory instead of an RPC per request.
+
+    Polling pauses while nobody reads, the first read after that polls the
+    node on demand. Concurrent on-demand polls of a node share one RPC.
+    """
+
+    def __init__(
+        self,
+        interval: float = FLEET_METRICS_INTERVAL,
+        max_age: float = FLEET_METRICS_MAX_AGE,
+        history_size: int = FLEET_METRICS_HISTORY_SIZE,
+    ):
+        self.interval = interval
+        self.max_age = max_age
+        self.history_size = history_size
+        self._nodes: dict[int, NodeTelemetry] = {}
+        self._job: MaintenanceJob | None = None
+        self._last_read = 0.0
+
+    def start(self) -> None:
+        if self._job is None:
+            self._job = get_maintenance_scheduler().schedule(
+                "fleet_metrics", self.refresh, self.interval
+            )
+
+    def stop(self) -> None:
+        get_maintenance_scheduler().cancel(self._job)
+        self._job = None
+
+    def _telemetry(self, node_id: int) -> NodeTelemetry:
+        if node_id not in self._nodes:
+            self._nodes[node_id] = NodeTelemetry(node_id, self.history_size)
+        return self._nodes[node_id]
+
+    async def _fetch(self, node_id: int) -> NodeTelemetry:
+        from app import wildosnode
+        from .grpc_client import GRPC_FAST_TIMEOUT
+
+        telemetry = self._telemetry(node_id)
+        node = wildosnode.nodes.get(node_id)
+        if node is None:
+            return telemetry
+        metrics, backends = await asyncio.gather(
+            asyncio.wait_for(node.get_host_system_metrics(), GRPC_FAST_TIMEOUT),
+            asyncio.wait_for(node.get_all_backends_stats(), GRPC_FAST_TIMEOUT),
+            return_exceptions=True,
+        )
+        if isinstance(metrics, BaseException):
+            telemetry.host_error = str(metrics) or type(metrics).__name__
+            logger.debug("failed to poll host metrics of node %i: %s", node_id, metrics)
+        else:
+            telemetry.record_host(metrics)
+        if isinstance(backends, BaseException):
+            telemetry.backends_error = str(backends) or type(backends).__name__
+            logger.debug("failed to poll backend stats of node %i: %s", node_id, backends)
+        else:
+            telemetry.record_backends(backends or {})
+        if telemetry.host_error is None or telemetry.backends_error is None:
+            telemetry.updated_at = time.time()
+        return telemetry
+
+    def poll(self, node_id: int) -> Awaitable[NodeTelemetry]:
+        """poll a node now, joining a poll that's already running"""
+        telemetry = self._telemetry(node_id)
+        if telemetry._poll is None or telemetry._poll.done():
+            telemetry._poll = asyncio.ensure_future(self._fetch(node_id))
+        return asyncio.shield(telemetry._poll)
+
+    async def refresh(self) -> None:
+        """poll every node, scheduled every `interval` seconds"""
+        from app import wildosnode
+
+        for node_id in set(self._nodes) - set(wildosnode.nodes):
+            del self._nodes[node_id]
+        if time.time() - self._last_read > self.interval * 10:
+            return
+        semaphore = asyncio.Semaphore(NODE_MAINTENANCE_CONCURRENCY)
+
+        async def poll(node_id: int) -> None:
+            async with semaphore:
+                await self.poll(node_id)
+
+        await asyncio.gather(*(poll(node_id) for node_id in list(wildosnode.nodes)))
+
+    async def get(self, node_id: int, max_age: float | None = None) -> NodeTelemetry:
+        """the telemetry of a node, polled first if older than `max_age` seconds"""
+        self._last_read = time.time()
+        telemetry = self._telemetry(node_id)
+        if telemetry.age() > (self.max_age if max_age is None else max_age):
+            telemetry = await self.poll(node_id)
+        return telemetry
+
+    async def get_all(self, max_age: float | None = None) -> list[NodeTelemetry]:
+        from app import wildosnode
+
+        return list(
+            await asyncio.gather(
+                *(self.get(node_id, max_age) for node_id in sorted(wildosnode.nodes))
+            )
+        )
+
+    async def cached(
+        self,
+        node_id: int,
+        key: tuple,
+        fetch: Callable[[], Awaitable[Any]],
+        max_age: float | None = None,
+    ) -> Any:
+        """the answer of another per-node endpoint, fetched again when stale"""
+        telemetry = self._telemetry(node_id)
+        now = time.time()
+        hit = telemetry.responses.get(key)
+        if hit is not None and now - hit[0] <= (self.max_age if max_age is None else max_age):
+            return hit[1]
+        result = await fetch()
+        # drop what went stale so varying arguments don't pile up
+        telemetry.responses = {
+            k: v for k, v in telemetry.responses.items() if now - v[0] <= self.max_age
+        }
+        telemetry.responses[key] = (time.time(), result)
+        return result
+
+    def invalidate(self, node_id: int) -> None:
+        """forget what's cached about a node, e.g. after it was changed"""
+        telemetry = self._nodes.get(node_id)
+        if telemetry is not None:
+            telemetry.updated_at = 0.0
+            telemetry.responses.clear()
+
+
+_fleet: FleetTelemetry | None = None
+
+
+def get_fleet_telemetry() -> FleetTelemetry:
+    global _fleet
+    if _fleet is None:
+        _fleet = FleetTelemetry()
+    return _fleet
@@ -9,9 +9,13 @@ from functools import wraps
 from typing import Callable, TypeVar, Awaitable, Optional, Dict, Any, List, Union, Coroutine
 
 from grpclib import GRPCError
-from grpclib.client import Channel
 from grpclib.exceptions import StreamTerminatedError
 
+from app.config.env import (
+    NODE_CHANNEL_MULTIPLEX,
+    NODE_MULTIPLEXED_CHANNELS,
+    NODE_TLS_SESSION_RESUMPTION,
+)
 from .base import WildosNodeBase
 from .database import WildosNodeDB
 # Import enhanced error handling and recovery systems
@@ -29,7 +33,8 @@ from .recovery import (
     RecoveryMode, HealthStatus, with_recovery, get_recovery_manager
 )
 # Monitoring imports moved to functions to avoid circular dependencies
-from .service_grpc import WildosServiceStub
+from .scheduler import get_maintenance_scheduler
+from .transport import NodeTransport, GrpclibTransport, ResumingSSLContext, create_transport
 from .service_pb2 import (
     UserData,
     UsersData,
@@ -43,6 +48,8 @@ from .service_pb2 import (
     BackendStats,
     # Host system monitoring imports
     HostSystemMetrics,
+    HostMetricsQuery,
+    HostMetricsHistory,
     PortActionRequest,
     PortActionResponse,
     # Container management imports
@@ -56,6 +63,7 @@ from .service_pb2 import (
     # Peak monitoring imports
     PeakEvent,
     PeakQuery,
+    PeakStreamRequest,
     # Enum imports
     ConfigFormat,
     FileInfo
@@ -122,6 +130,7 @@ CONNECTION_LIFETIME = 3600.0  # Connection lifetime in seconds (1 hour)
 CONNECTION_POOL_TIMEOUT = 5.0  # Timeout to acquire connection from pool
 CONNECTION_IDLE_TIMEOUT = 300.0  # Close idle connections after 5 minutes
 CONNECTION_HEALTH_CHECK_INTERVAL = 60.0  # Health check interval in seconds
+NODE_MONITOR_INTERVAL = 10.0  # Pool monitoring and sync check interval in seconds
 CONNECTION_RETRY_DELAY = 2.0  # Delay between connection retry attempts
 
 # Type variable for retry decorator
@@ -790,9 +799,80 @@ def string_to_temp_file(content: str):
     return file
 
 
+class NodeTLSMaterial:
+    """
+    The panel's client certificate, the CA bundle and the pinned server
+    certificate, shared by the clients of all nodes so bringing up many
+    nodes reads them and writes their temp files only once
+    """
+    
+    def __init__(
+        self,
+        client_cert_pem: str,
+        client_key_pem: str,
+        ca_cert_pem: str,
+        pinned_server_cert_pem: Optional[str] = None
+    ):
+        self.client_cert_pem = client_cert_pem
+        self.client_key_pem = client_key_pem
+        self.ca_cert_pem = ca_cert_pem
+        self.pinned_server_cert_pem = pinned_server_cert_pem
+        
+        # The files live as long as this object, nodes must not close them
+        self.client_cert_file = string_to_temp_file(client_cert_pem)
+        self.client_key_file = string_to_temp_file(client_key_pem)
+        self.ca_cert_file = string_to_temp_file(ca_cert_pem)
+    
+    @classmethod
+    def load(cls) -> "NodeTLSMaterial":
+        """Load the panel client certificate and the server certificate to pin"""
+        cert_manager = _get_certificate_manager()()
+        
+        # Get panel client certificate for authentication with node
+        client_cert_pem, client_key_pem = cert_manager.get_panel_client_certificate()
+        ca_cert_pem = cert_manager.get_client_certificate_bundle()
+        
+        # Try to get server certificate from database for certificate pinning
+        pinned_server_cert_pem = None
+        try:
+            from .. import db as app_db  # Lazy import to avoid circular dependencies
+            from ..database import get_db
+            
+            db_session = next(get_db())
+            try:
+                tls_record = app_db.crud.get_tls_certificate(db_session)
+                if tls_record and tls_record.certificate:
+                    # Validate the certificate before using for pinning
+                    cert_validation = cert_manager.validate_certificate(tls_record.certificate)
+                    if cert_validation.get('valid', False):
+                        pinned_server_cert_pem = tls_record.certificate
+                        logger.info(f"Certificate pinning enabled for nodes - expires in {cert_validation.get('days_until_expiry', 'unknown')} days")
+                    else:
+                        logger.warning(f"Invalid server certificate in database: {cert_validation.get('error', 'unknown error')}")
+                else:
+                    logger.info("No server certificate found in database - certificate pinning disabled")
+            finally:
+                db_session.close()
+        except Exception as e:
+            logger.warning(f"Failed to retrieve server certificate from database: {e}")
+        
+        return cls(client_cert_pem, client_key_pem, ca_cert_pem, pinned_server_cert_pem)
+
+
+_node_tls_material: Optional[NodeTLSMaterial] = None
+
+
+def get_node_tls_material(reload: bool = False) -> NodeTLSMaterial:
+    """Get the shared TLS material of the node clients, loading it on first use"""
+    global _node_tls_material
+    if _node_tls_material is None or reload:
+        _node_tls_material = NodeTLSMaterial.load()
+    return _node_tls_material
+
+
 class ConnectionInfo:
     """Information about a connection in the pool"""
-    def __init__(self, channel: Channel, stub: WildosServiceStub):
+    def __init__(self, channel, stub):
         self.channel = channel
         self.stub = stub
         self.created_at = time.time()
@@ -800,6 +880,8 @@ class ConnectionInfo:
         self.in_use = False
         self.healthy = True
         self.use_count = 0
+        # calls currently multiplexed over the channel
+        self.active_streams = 0
 
     def is_expired(self) -> bool:
         """Check if connection has exceeded its lifetime"""
@@ -817,7 +899,10 @@ class ConnectionInfo:
     async def close(self):
         """Close the connection"""
         try:
-            self.channel.close()
+            # grpcio channels close asynchronously
+            close_result = self.channel.close()
+            if asyncio.iscoroutine(close_result):
+                await close_result
         except Exception as e:
             logger.warning(f"Error closing connection: {e}")
 
@@ -825,11 +910,26 @@ class ConnectionInfo:
 class ConnectionPool:
     """Thread-safe connection pool for gRPC channels optimized for Docker VPS environments"""
     
-    def __init__(self, node_id: int, address: str, port: int, ssl_context):
+    def __init__(
+        self,
+        node_id: int,
+        address: str,
+        port: int,
+        ssl_context,
+        transport: NodeTransport | None = None,
+        auth_metadata: Callable[[], list] | None = None,
+    ):
         self.node_id = node_id
         self.address = address
         self.port = port
         self.ssl_context = ssl_context
+        self.transport = transport or GrpclibTransport(ssl_context)
+        self._auth_metadata = auth_metadata or list
+
+        # Multiplexed channels are shared by concurrent calls instead of being checked out
+        self._multiplex = NODE_CHANNEL_MULTIPLEX
+        self._min_size = NODE_MULTIPLEXED_CHANNELS if self._multiplex else CONNECTION_POOL_SIZE
+        self._max_size = NODE_MULTIPLEXED_CHANNELS if self._multiplex else CONNECTION_POOL_MAX_SIZE
         
         # Connection pool management
         self._pool: list[ConnectionInfo] = []
@@ -846,20 +946,30 @@ class ConnectionPool:
             'connections_in_use': 0,
             'pool_hits': 0,
             'pool_misses': 0,
+            'connection_errors': 0,
             'health_check_failures': 0,
-            'last_health_check': 0
+            'last_health_check': 0,
+            'tls_handshakes': 0,
+            'tls_resumed_handshakes': 0,
+            'connect_time_full_ms': 0.0,
+            'connect_time_resumed_ms': 0.0,
         }
         
-        # Background tasks
-        self._health_check_task = None
-        self._cleanup_task = None
+        # Maintenance jobs on the shared scheduler
+        self._health_check_job = None
+        self._cleanup_job = None
         
-        logger.info(f"Initialized connection pool for node {node_id} at {address}:{port}")
+        logger.info(f"Initialized {self.transport.name} connection pool for node {node_id} at {address}:{port}")
 
     async def start(self):
-        """Start the connection pool and background tasks"""
-        self._health_check_task = asyncio.create_task(self._periodic_health_check())
-        self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+        """Start the connection pool and its maintenance jobs"""
+        scheduler = get_maintenance_scheduler()
+        self._health_check_job = scheduler.schedule(
+            "pool_health_check", self._health_check, CONNECTION_HEALTH_CHECK_INTERVAL, self.node_id
+        )
+        self._cleanup_job = scheduler.schedule(
+            "pool_cleanup", self._cleanup, CONNECTION_IDLE_TIMEOUT / 2, self.node_id
+        )
         
         # Pre-populate pool with initial connections
         await self._ensure_min_connections()
@@ -869,11 +979,10 @@ class ConnectionPool:
         logger.info(f"Shutting down connection pool for node {self.node_id}")
         self._shutdown = True
         
-        # Cancel background tasks
-        if self._health_check_task:
-            self._health_check_task.cancel()
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
+        # Cancel maintenance jobs
+        scheduler = get_maintenance_scheduler()
+        scheduler.cancel(self._health_check_job)
+        scheduler.cancel(self._cleanup_job)
         
         # Close all connections
         async with self._pool_lock:
@@ -883,7 +992,7 @@ class ConnectionPool:
             
         logger.info(f"Connection pool shutdown complete for node {self.node_id}")
 
-    async def acquire_connection(self) -> tuple[Channel, WildosServiceStub]:
+    async def acquire_connection(self) -> tuple[Any, Any]:
         """Acquire a connection from the pool with timeout"""
         if self._shutdown:
             raise RuntimeError("Connection pool is shutdown")
@@ -891,21 +1000,35 @@ class ConnectionPool:
         start_time = time.time()
         while (time.time() - start_time) < CONNECTION_POOL_TIMEOUT:
             async with self._pool_lock:
+                if self._multiplex:
+                    await self._drop_expired_connections()
+
                 # Try to find an available healthy connection
-                for conn_info in self._pool:
-                    if not conn_info.in_use and conn_info.healthy and not conn_info.is_expired():
-                        conn_info.in_use = True
-                        conn_info.mark_used()
-                        self._metrics['pool_hits'] += 1
-                        self._metrics['connections_in_use'] += 1
-                        logger.debug(f"Acquired existing connection for node {self.node_id}")
-                        return conn_info.channel, conn_info.stub
+                available = [
+                    c for c in self._pool
+                    if c.healthy and not c.is_expired() and (self._multiplex or not c.in_use)
+                ]
+                # a shared channel is only added while all existing ones carry calls
+                if available and (
+                    not self._multiplex
+                    or len(self._pool) >= self._max_size
+                    or min(c.active_streams for c in available) == 0
+                ):
+                    conn_info = min(available, key=lambda c: c.active_streams)
+                    conn_info.in_use = True
+                    conn_info.active_streams += 1
+                    conn_info.mark_used()
+                    self._metrics['pool_hits'] += 1
+                    self._metrics['connections_in_use'] += 1
+                    logger.debug(f"Acquired existing connection for node {self.node_id}")
+                    return conn_info.channel, conn_info.stub
                 
                 # If pool not at max capacity, create new connection
-                if len(self._pool) < CONNECTION_POOL_MAX_SIZE:
+                if len(self._pool) < self._max_size:
                     conn_info = await self._create_connection()
                     if conn_info:
                         conn_info.in_use = True
+                        conn_info.active_streams += 1
                         self._metrics['pool_misses'] += 1
                         self._metrics['connections_in_use'] += 1
                         logger.debug(f"Created new connection for node {self.node_id}")
@@ -916,12 +1039,13 @@ class ConnectionPool:
         
         raise TimeoutError(f"Failed to acquire connection for node {self.node_id} within {CONNECTION_POOL_TIMEOUT}s")
 
-    async def release_connection(self, channel: Channel):
+    async def release_connection(self, channel):
         """Release a connection back to the pool"""
         async with self._pool_lock:
             for conn_info in self._pool:
                 if conn_info.channel == channel:
-                    conn_info.in_use = False
+                    conn_info.active_streams = max(0, conn_info.active_streams - 1)
+                    conn_info.in_use = conn_info.active_streams > 0
                     self._metrics['connections_in_use'] = max(0, self._metrics['connections_in_use'] - 1)
                     logger.debug(f"Released connection for node {self.node_id}")
                     return
@@ -929,6 +1053,13 @@ class ConnectionPool:
             # If connection not found in pool, it might have been removed due to health check
             logger.warning(f"Attempted to release unknown connection for node {self.node_id}")
 
+    async def _drop_expired_connections(self):
+        """Close expired channels no call is using, so the fixed set of multiplexed channels renews"""
+        for conn_info in [c for c in self._pool if c.is_expired() and not c.in_use]:
+            self._pool.remove(conn_info)
+            await conn_info.close()
+            self._metrics['connections_closed'] += 1
+
     async def _create_connection(self) -> ConnectionInfo | None:
         """Create a new connection with enhanced error handling and monitoring"""
         try:
@@ -947,27 +1078,22 @@ class ConnectionPool:
                 port=self.port
             )
             
-            channel = Channel(self.address, self.port, ssl=self.ssl_context)
-            stub = WildosServiceStub(channel)
+            channel, stub = self.transport.create_channel(self.address, self.port)
             
             # Enhanced connection test with timeout and monitoring
             try:
-                # Check if channel has __connect__ method before awaiting
-                if hasattr(channel, '__connect__') and callable(getattr(channel, '__connect__')):
-                    await asyncio.wait_for(channel.__connect__(), timeout=GRPC_CONNECTION_TIMEOUT)
+                connect_started = time.perf_counter()
+                resumed = await asyncio.wait_for(self.transport.connect(channel), timeout=GRPC_CONNECTION_TIMEOUT)
+                self._record_handshake((time.perf_counter() - connect_started) * 1000, resumed is True)
                 
                 # Additional health check
                 await asyncio.wait_for(
-                    stub.FetchBackends(Empty(), metadata=[]),
+                    stub.FetchBackends(Empty(), metadata=self._auth_metadata()),
                     timeout=CONNECTION_HEALTH_CHECK_INTERVAL / 6
                 )
                 
             except asyncio.TimeoutError as e:
-                # Channel.close() might not be awaitable in grpclib
-                if hasattr(channel, 'close'):
-                    close_result = channel.close()
-                    if asyncio.iscoroutine(close_result):
-                        await close_result
+                await self.transport.close(channel)
                 timeout_error = create_error_with_context(
                     TimeoutError,
                     f"Connection timeout for node {self.node_id}: {e}",
@@ -1044,45 +1170,39 @@ class ConnectionPool:
             
             return None
 
+    def _record_handshake(self, duration_ms: float, resumed: bool):
+        """Count a connection setup and whether its TLS session was resumed"""
+        self._metrics['tls_handshakes'] += 1
+        if resumed:
+            self._metrics['tls_resumed_handshakes'] += 1
+            self._metrics['connect_time_resumed_ms'] += duration_ms
+        else:
+            self._metrics['connect_time_full_ms'] += duration_ms
+        self._monitoring.metrics.observe(
+            "node_connect_duration_ms",
+            duration_ms,
+            tags={'node_id': str(self.node_id), 'tls_resumed': str(resumed).lower()}
+        )
+
     async def _ensure_min_connections(self):
         """Ensure minimum number of connections in the pool"""
         async with self._pool_lock:
-            while len(self._pool) < CONNECTION_POOL_SIZE and not self._shutdown:
+            while len(self._pool) < self._min_size and not self._shutdown:
                 conn_info = await self._create_connection()
                 if not conn_info:
                     break
 
-    async def _periodic_health_check(self):
-        """Periodically check connection health and remove unhealthy ones"""
-        while not self._shutdown:
-            try:
-                await asyncio.sleep(CONNECTION_HEALTH_CHECK_INTERVAL)
-                await self._health_check()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in health check for node {self.node_id}: {e}")
-
-    # Removed duplicate _health_check method - using the one at line 1254 instead
+    async def _cleanup(self):
+        """Clean up idle connections, scheduled more often than the idle timeout"""
+        await self._cleanup_idle_connections()
         
         # Ensure minimum connections after cleanup
         await self._ensure_min_connections()
 
-    async def _periodic_cleanup(self):
-        """Periodically clean up idle connections"""
-        while not self._shutdown:
-            try:
-                await asyncio.sleep(CONNECTION_IDLE_TIMEOUT / 2)  # Check more frequently than timeout
-                await self._cleanup_idle_connections()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in cleanup for node {self.node_id}: {e}")
-
     async def _cleanup_idle_connections(self):
         """Clean up idle connections that exceed idle timeout"""
         async with self._pool_lock:
-            if len(self._pool) <= CONNECTION_POOL_SIZE:
+            if len(self._pool) <= self._min_size:
                 return  # Don't cleanup if at minimum size
             
             idle_connections = []
@@ -1091,7 +1211,7 @@ class ConnectionPool:
                     idle_connections.append(conn_info)
             
             # Keep minimum number of connections
-            connections_to_remove = len(idle_connections) - max(0, CONNECTION_POOL_SIZE - (len(self._pool) - len(idle_connections)))
+            connections_to_remove = len(idle_connections) - max(0, self._min_size - (len(self._pool) - len(idle_connections)))
             
             for conn_info in idle_connections[:connections_to_remove]:
                 self._pool.remove(conn_info)
@@ -1123,13 +1243,23 @@ class ConnectionPool:
         return {
             **self._metrics,
             'pool_size': len(self._pool),
-            'max_pool_size': CONNECTION_POOL_MAX_SIZE,
+            'max_pool_size': self._max_size,
+            'multiplexed': self._multiplex,
+            'active_streams': sum(c.active_streams for c in self._pool),
+            'connect_time_full_avg_ms': (
+                self._metrics['connect_time_full_ms']
+                / max(1, self._metrics['tls_handshakes'] - self._metrics['tls_resumed_handshakes'])
+            ),
+            'connect_time_resumed_avg_ms': (
+                self._metrics['connect_time_resumed_ms'] / max(1, self._metrics['tls_resumed_handshakes'])
+            ),
             'connections_available': available_connections,
             'connections_unhealthy': len([c for c in self._pool if not c.healthy]),
             'network_instability_count': getattr(self, '_network_instability_count', 0),
             'container_restart_detected': getattr(self, '_container_restart_detected', False),
             'node_id': self.node_id,
             'address': f"{self.address}:{self.port}",
+            'transport': self.transport.name,
             'component_name': getattr(self, '_component_name', f'connection_pool_node_{self.node_id}')
         }
 
@@ -1243,7 +1373,9 @@ class ConnectionPool:
         """Health check for recovery manager integration"""
         try:
             async with self._pool_lock:
-                healthy_connections = len([c for c in self._pool if c.healthy and not c.in_use])
+                healthy_connections = len([
+                    c for c in self._pool if c.healthy and (self._multiplex or not c.in_use)
+                ])
                 instability_count = getattr(self, '_network_instability_count', 0)
                 return healthy_connections > 0 and instability_count < 10
         except Exception:
@@ -1636,52 +1768,30 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
         ssl_cert: str,
         usage_coefficient: int = 1,
         auth_token: Optional[str] = None,
+        connection_backend: str = "grpclib",
+        tls_material: Optional["NodeTLSMaterial"] = None,
     ):
         self.id = node_id
         self._address = address
         self._port = port
         self._auth_token = auth_token
+        self._connection_backend = connection_backend
 
-        # Create certificate manager to get panel client certificate
-        cert_manager = _get_certificate_manager()()
+        # The panel's client certificate and the pinned server certificate are
+        # the same for every node, they're loaded once and shared
+        tls_material = tls_material or get_node_tls_material()
+        self._expected_server_cert_pem = tls_material.pinned_server_cert_pem
+        self._cert_pinning_enabled = tls_material.pinned_server_cert_pem is not None
         
-        # Get panel client certificate for authentication with node
-        client_cert_pem, client_key_pem = cert_manager.get_panel_client_certificate()
-        ca_cert_pem = cert_manager.get_client_certificate_bundle()
-        
-        # Store certificate data for pinning validation
-        self._expected_server_cert_pem = None
-        self._cert_pinning_enabled = False
-        
-        # Try to get server certificate from database for certificate pinning
-        try:
-            from .. import db as app_db  # Lazy import to avoid circular dependencies
-            from ..database import get_db
-            
-            # Get server certificate from database for this node
-            db_session = next(get_db())
-            try:
-                tls_record = app_db.crud.get_tls_certificate(db_session)
-                if tls_record and tls_record.certificate:
-                    # Validate the certificate before using for pinning
-                    cert_validation = cert_manager.validate_certificate(tls_record.certificate)
-                    if cert_validation.get('valid', False):
-                        self._expected_server_cert_pem = tls_record.certificate
-                        self._cert_pinning_enabled = True
-                        logger.info(f"Certificate pinning enabled for node {node_id} - expires in {cert_validation.get('days_until_expiry', 'unknown')} days")
-                    else:
-                        logger.warning(f"Invalid server certificate in database for node {node_id}: {cert_validation.get('error', 'unknown error')}")
-                else:
-                    logger.info(f"No server certificate found in database for node {node_id} - certificate pinning disabled")
-            finally:
-                db_session.close()
-        except Exception as e:
-            logger.warning(f"Failed to retrieve server certificate from database for node {node_id}: {e}")
-        
-        # Create temp files for certificates
-        self._client_cert_file = string_to_temp_file(client_cert_pem)
-        self._client_key_file = string_to_temp_file(client_key_pem)
-        self._ca_cert_file = string_to_temp_file(ca_cert_pem)
+        # grpcio takes the certificates as PEM instead of an SSLContext
+        self._client_cert_pem = tls_material.client_cert_pem
+        self._client_key_pem = tls_material.client_key_pem
+        self._ca_cert_pem = tls_material.ca_cert_pem
+
+        # Shared temp files with the certificates
+        self._client_cert_file = tls_material.client_cert_file
+        self._client_key_file = tls_material.client_key_file
+        self._ca_cert_file = tls_material.ca_cert_file
 
         # Create enhanced SSL context with strict security settings
         self._ssl_context = self._create_strict_ssl_context()
@@ -1697,16 +1807,20 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
         )
 
         # Initialize connection pool instead of single connection
-        self._connection_pool = ConnectionPool(node_id, address, port, self._ssl_context)
+        self._transport = self._create_transport()
+        self._connection_pool = ConnectionPool(
+            node_id, address, port, self._ssl_context,
+            transport=self._transport, auth_metadata=self._get_auth_metadata,
+        )
         self._pool_initialized = False
         
         # Backward compatibility - keep a primary channel for monitoring
         self._primary_channel = None
         self._primary_stub = None
         
-        self._monitor_task = None
+        self._monitor_job = None
         self._streaming_task = None
-        self._health_check_task = None  # New health check task
+        self._health_check_job = None
         self._last_health_check = 0.0   # Track last health check time
         self._consecutive_health_failures = 0  # Track consecutive health failures
 
@@ -1790,16 +1904,25 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
                 self._primary_channel = channel
                 self._primary_stub = stub
                 
-                # Start monitoring task
-                self._monitor_task = asyncio.create_task(self._monitor_pool())
-                
-                # Start periodic health check task
-                self._health_check_task = asyncio.create_task(self._periodic_health_check())
+                # Pool monitoring runs right away so the node gets synced, health
+                # checks take a random slot of the shared scheduler
+                scheduler = get_maintenance_scheduler()
+                self._monitor_job = scheduler.schedule(
+                    "monitor", self._monitor_pool, NODE_MONITOR_INTERVAL, self.id, delay=0
+                )
+                self._health_check_job = scheduler.schedule(
+                    "health_check", self._periodic_health_check,
+                    CONNECTION_HEALTH_CHECK_INTERVAL, self.id
+                )
+                monitoring.logger.info(
+                    f"Scheduled periodic health checks for node {self.id}",
+                    node_id=self.id,
+                    check_interval_seconds=CONNECTION_HEALTH_CHECK_INTERVAL
+                )
                 
                 # Register with recovery manager for auto-reconnect
                 recovery_manager.register_component(
                     component_id=f'node_{self.id}',
-                    health_check_func=self._health_check,
                     recovery_func=self._recover_connection,
                     component_name=f'WildosNode-{self.id}'
                 )
@@ -1828,68 +1951,60 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
             raise structured_error
 
     async def _periodic_health_check(self):
-        """Periodic health checks with CONNECTION_HEALTH_CHECK_INTERVAL and auto-reconnect"""
+        """Scheduled every CONNECTION_HEALTH_CHECK_INTERVAL, reconnects on failure"""
         monitoring = _get_monitoring_system()
         recovery_manager = _get_recovery_manager()
         
-        monitoring.logger.info(
-            f"Starting periodic health checks for node {self.id}",
-            node_id=self.id,
-            check_interval_seconds=CONNECTION_HEALTH_CHECK_INTERVAL
-        )
+        if getattr(self._connection_pool, '_shutdown', True):
+            return
         
-        while not getattr(self._connection_pool, '_shutdown', True):
-            try:
-                await asyncio.sleep(CONNECTION_HEALTH_CHECK_INTERVAL)
-                
-                # Perform health check
-                health_check_start = time.time()
-                is_healthy = await self._health_check()
-                health_check_duration = time.time() - health_check_start
+        try:
+            # Perform health check
+            health_check_start = time.time()
+            is_healthy = await self._health_check()
+            health_check_duration = time.time() - health_check_start
+            
+            self._last_health_check = health_check_start
+            recovery_manager.record_health(f'node_{self.id}', is_healthy)
+            
+            if is_healthy:
+                self._consecutive_health_failures = 0
                 
-                self._last_health_check = health_check_start
+                # Update metrics for successful health check
+                monitoring.metrics.increment(
+                    "node_health_check_success_total",
+                    tags={'node_id': str(self.id)}
+                )
+                monitoring.metrics.histogram(
+                    "node_health_check_duration_seconds",
+                    health_check_duration,
+                    tags={'node_id': str(self.id), 'result': 'success'}
+                )
                 
-                if is_healthy:
-                    self._consecutive_health_failures = 0
-                    
-                    # Update metrics for successful health check
-                    monitoring.metrics.increment(
-                        "node_health_check_success_total",
-                        tags={'node_id': str(self.id)}
-                    )
-                    monitoring.metrics.histogram(
-                        "node_health_check_duration_seconds",
-                        health_check_duration,
-                        tags={'node_id': str(self.id), 'result': 'success'}
-                    )
-                    
-                    monitoring.logger.debug(
-                        f"Health check passed for node {self.id}",
-                        node_id=self.id,
-                        health_check_duration_seconds=health_check_duration
-                    )
-                    
-                else:
-                    await self._handle_health_failure(health_check_duration)
-                    
-            except asyncio.CancelledError:
-                monitoring.logger.info(f"Health check task cancelled for node {self.id}")
-                break
-            except Exception as e:
-                structured_error = create_error_with_context(
-                    ServiceError,
-                    f"Error in periodic health check for node {self.id}: {e}",
+                monitoring.logger.debug(
+                    f"Health check passed for node {self.id}",
                     node_id=self.id,
-                    operation="periodic_health_check"
+                    health_check_duration_seconds=health_check_duration
                 )
                 
-                monitoring.logger.error(
-                    f"Error in periodic health check for node {self.id}",
-                    error=structured_error,
-                    node_id=self.id
-                )
+            else:
+                await self._handle_health_failure(health_check_duration)
                 
-                await self._handle_health_failure(0.0, error=structured_error)
+        except Exception as e:
+            structured_error = create_error_with_context(
+                ServiceError,
+                f"Error in periodic health check for node {self.id}: {e}",
+                node_id=self.id,
+                operation="periodic_health_check"
+            )
+            
+            monitoring.logger.error(
+                f"Error in periodic health check for node {self.id}",
+                error=structured_error,
+                node_id=self.id
+            )
+            
+            await self._handle_health_failure(0.0, error=structured_error)
     
     async def _health_check(self) -> bool:
         """Comprehensive health check for the node with detailed validation"""
@@ -2031,11 +2146,17 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
             if self._connection_pool:
                 await self._connection_pool.stop()
             
-            # Recreate SSL context in case of certificate issues
-            self._ssl_context = self._create_strict_ssl_context()
+            # Recreate SSL context in case of certificate issues, unless it
+            # holds the TLS session the new connections should resume
+            if not NODE_TLS_SESSION_RESUMPTION:
+                self._ssl_context = self._create_strict_ssl_context()
+                self._transport = self._create_transport()
             
             # Recreate connection pool
-            self._connection_pool = ConnectionPool(self.id, self._address, self._port, self._ssl_context)
+            self._connection_pool = ConnectionPool(
+                self.id, self._address, self._port, self._ssl_context,
+                transport=self._transport, auth_metadata=self._get_auth_metadata,
+            )
             
             # Restart connection pool
             await self._connection_pool.start()
@@ -2093,10 +2214,22 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
             
             raise structured_error
 
+    def _create_transport(self) -> NodeTransport:
+        """Transport selected by the node's connection backend"""
+        return create_transport(
+            self._connection_backend,
+            self._ssl_context,
+            ca_cert_pem=self._ca_cert_pem,
+            client_cert_pem=self._client_cert_pem,
+            client_key_pem=self._client_key_pem,
+        )
+
     def _create_strict_ssl_context(self) -> ssl.SSLContext:
         """Create strict SSL context with enhanced security and certificate pinning"""
         # Create strict SSL context with maximum security
-        context = ssl.create_default_context(cafile=self._ca_cert_file.name)
+        # a client context that can resume the TLS session of the previous connection
+        context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT, resume=NODE_TLS_SESSION_RESUMPTION)
+        context.load_verify_locations(cafile=self._ca_cert_file.name)
         
         # Enhanced TLS security settings
         context.verify_mode = ssl.CERT_REQUIRED
@@ -2160,7 +2293,8 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
                 return ok
             
             # Note: Python's ssl module doesn't support custom verify callbacks in the same way as OpenSSL
-            # We'll implement pinning verification during connection establishment instead
+            # so the callback is never installed and the pin isn't checked on any
+            # transport, nodes serve their own certificate, not the pinned one
             logger.info(f"Certificate pinning configured for node {self.id}")
         
         # Additional security options
@@ -2214,18 +2348,13 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
         shutdown_start_time = time.time()
         
         try:
-            # Cancel health check task first
-            if self._health_check_task and not self._health_check_task.done():
-                self._health_check_task.cancel()
-                try:
-                    await asyncio.wait_for(self._health_check_task, timeout=5.0)
-                except (asyncio.CancelledError, asyncio.TimeoutError):
-                    monitoring.logger.debug(f"Health check task cancelled for node {self.id}")
+            # Take the health check and monitoring jobs off the scheduler first
+            scheduler = get_maintenance_scheduler()
+            scheduler.cancel(self._health_check_job)
+            scheduler.cancel(self._monitor_job)
             
-            # Cancel background monitoring tasks
+            # Cancel background streaming task
             tasks_to_cancel = []
-            if self._monitor_task and not self._monitor_task.done():
-                tasks_to_cancel.append(('monitor', self._monitor_task))
             if self._streaming_task and not self._streaming_task.done():
                 tasks_to_cancel.append(('streaming', self._streaming_task))
             
@@ -2264,18 +2393,6 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
             except Exception as e:
                 monitoring.logger.warning(f"Failed to update node {self.id} status during shutdown: {e}")
             
-            # Cleanup temporary certificate files
-            try:
-                if hasattr(self, '_client_cert_file') and self._client_cert_file:
-                    self._client_cert_file.close()
-                if hasattr(self, '_client_key_file') and self._client_key_file:
-                    self._client_key_file.close()
-                if hasattr(self, '_ca_cert_file') and self._ca_cert_file:
-                    self._ca_cert_file.close()
-                monitoring.logger.debug(f"Cleaned up certificate files for node {self.id}")
-            except Exception as e:
-                monitoring.logger.warning(f"Failed to cleanup certificate files for node {self.id}: {e}")
-            
             # Unregister from recovery manager if present
             try:
                 recovery_manager.unregister_component(f'node_{self.id}')
@@ -2329,7 +2446,7 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
 
     async def _monitor_pool(self):
         """Monitor connection pool health and manage node synchronization"""
-        while not self._connection_pool._shutdown:
+        if not self._connection_pool._shutdown:
             try:
                 # Check if pool is healthy and has connections
                 pool_metrics = self._connection_pool.get_metrics()
@@ -2377,8 +2494,6 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
                 logger.error(f"Error in pool monitoring for node {self.id}: {e}")
                 self.set_status(_get_node_status().unhealthy, f"monitoring error: {e}")
                 self.synced = False
-                
-            await asyncio.sleep(10)
 
     async def _stream_user_updates(self):
         """Stream user updates using connection from the pool"""
@@ -2431,11 +2546,22 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
 
     @circuit_breaker_protected("user_stats")
     @retry_with_exponential_backoff(max_retries=2, base_delay=0.5)
-    async def fetch_users_stats(self) -> None:
-        """Fetch user statistics using connection from the pool"""
+    async def fetch_users_stats(self):
+        """Fetch user statistics using connection from the pool
+
+        The node collects usages from its backends concurrently, so the
+        result may be partial; failed backends are reported in `backends_status`.
+        Returns the whole `UsersStats` so `online_ips` comes along with the usages.
+        """
         async with ConnectionContext(self._connection_pool) as (channel, stub):
             response = await stub.FetchUsersStats(Empty(), timeout=GRPC_FAST_TIMEOUT, metadata=self._get_auth_metadata())
-            return None
+            for status in response.backends_status:
+                if not status.ok:
+                    logger.warning(
+                        "node %i returned partial usages, backend `%s` failed: %s",
+                        self.id, status.name, status.error,
+                    )
+            return response
 
     @circuit_breaker_protected("backend_operations")
     @retry_with_exponential_backoff(max_retries=3, base_delay=1.0)
@@ -2452,8 +2578,15 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
         await self._repopulate_users(users)
         self.synced = True
 
-    async def get_logs(self, name: str = "xray", include_buffer=True):
-        """Stream backend logs using connection from the pool with circuit breaker protection"""
+    async def get_logs(
+        self,
+        name: str = "xray",
+        include_buffer=True,
+        level: str | None = None,
+        pattern: str | None = None,
+        user: str | None = None,
+    ):
+        """Stream batches of backend logs filtered on the node, using connection from the pool with circuit breaker protection"""
         # Check circuit breaker before starting stream
         if hasattr(self, '_circuit_breakers') and 'logs_streaming' in self._circuit_breakers:
             circuit_breaker = self._circuit_breakers['logs_streaming']
@@ -2465,13 +2598,20 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
                 async with stub.StreamBackendLogs.open(timeout=GRPC_STREAM_TIMEOUT, metadata=self._get_auth_metadata()) as stm:
                     await stm.send_message(
                         BackendLogsRequest(
-                            backend_name=name, include_buffer=include_buffer
+                            backend_name=name,
+                            include_buffer=include_buffer,
+                            level=level,
+                            pattern=pattern,
+                            user=user,
+                            batch=True,
                         )
                     )
                     while True:
                         response = await stm.recv_message()
-                        if response:
-                            yield response.line
+                        if response is None:
+                            break
+                        # nodes without batching still answer with one line per message
+                        yield list(response.lines) or [response.line]
                         # Record success for each yielded log line
                         if hasattr(self, '_circuit_breakers') and 'logs_streaming' in self._circuit_breakers:
                             await self._circuit_breakers['logs_streaming']._on_success()
@@ -2527,12 +2667,12 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
             return None
 
     # Peak Events Monitoring Methods
-    async def stream_peak_events(self):
+    async def stream_peak_events(self, after_seq: int = 0):
         """Stream real-time peak events from node using connection from the pool"""
         try:
             async with ConnectionContext(self._connection_pool) as (channel, stub):
                 async with stub.StreamPeakEvents.open(timeout=GRPC_STREAM_TIMEOUT, metadata=self._get_auth_metadata()) as stream:
-                    await stream.send_message(Empty())
+                    await stream.send_message(PeakStreamRequest(after_seq=after_seq))
                     async for event in stream:
                         yield event
         except (OSError, ConnectionError, GRPCError, StreamTerminatedError) as e:
@@ -2573,6 +2713,19 @@ class WildosNodeGRPCLIB(WildosNodeBase, WildosNodeDB):
             response: HostSystemMetrics = await stub.GetHostSystemMetrics(Empty(), timeout=GRPC_FAST_TIMEOUT, metadata=self._get_auth_metadata())
             return response
 
+    @retry_with_exponential_backoff(max_retries=2, base_delay=0.5)
+    @circuit_breaker_protected("system_monitoring")
+    async def get_host_metrics_history(
+        self, since_ms: int = 0, until_ms: int | None = None, max_points: int = 0
+    ):
+        """Get sampled host metrics history using connection from the pool"""
+        query = HostMetricsQuery(since_ms=since_ms, max_points=max_points)
+        if until_ms is not None:
+            query.until_ms = until_ms
+        async with ConnectionContext(self._connection_pool) as (channel, stub):
+            response: HostMetricsHistory = await stub.GetHostMetricsHistory(query, timeout=GRPC_FAST_TIMEOUT, metadata=self._get_auth_metadata())
+            return response
+
     @retry_with_exponential_backoff(max_retries=1, base_delay=1.0)  # Reduced retries for idempotency
     @circuit_breaker_protected("system_monitoring")
     async def open_host_port(self, port: int, protocol: str = "tcp"):
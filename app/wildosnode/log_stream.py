@@ -0,0 +1,149 @@
+"""shares a single upstream backend logs stream among all viewers with the same filter"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, NamedTuple
+
+from grpclib import GRPCError, Status
+
+from app.config.env import (
+    LOG_STREAM_RECONNECT_DELAY,
+    LOG_STREAM_REPLAY_SIZE,
+    LOG_STREAM_SUBSCRIBER_QUEUE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LogStreamKey(NamedTuple):
+    node_id: int
+    backend: str
+    level: str | None
+    pattern: str | None
+    user: str | None
+
+
+class NodeLogStream:
+    """
+    One StreamBackendLogs call to a node, fanned out to subscriber queues
+    of line batches.
+
+    The upstream task is started by the first subscriber and cancelled when
+    the last one leaves. Recent lines are kept so viewers joining an already
+    running stream still get the backlog they asked for.
+    """
+
+    def __init__(self, key: LogStreamKey):
+        self.key = key
+        self.dropped = 0
+        self._replay: deque[str] = deque(maxlen=LOG_STREAM_REPLAY_SIZE)
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def _dispatch(self, lines: list[str]) -> None:
+        self._replay.extend(lines)
+        for queue in self._subscribers:
+            if queue.full():
+                # slow viewer: drop its oldest batch rather than stall the others
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(lines)
+
+    async def _run(self, include_buffer: bool) -> None:
+        from app import wildosnode
+
+        while self._subscribers:
+            node = wildosnode.nodes.get(self.key.node_id)
+            if node is None:
+                logger.info("node %i removed, closing logs stream", self.key.node_id)
+                break
+            try:
+                async for lines in node.get_logs(
+                    name=self.key.backend,
+                    include_buffer=include_buffer,
+                    level=self.key.level,
+                    pattern=self.key.pattern,
+                    user=self.key.user,
+                ):
+                    self._dispatch(lines)
+                    # the backlog is already in the replay buffer
+                    include_buffer = False
+            except asyncio.CancelledError:
+                raise
+            except GRPCError as e:
+                if e.status == Status.INVALID_ARGUMENT:
+                    logger.info(
+                        "logs filter rejected by node %i: %s", self.key.node_id, e.message
+                    )
+                    break
+                logger.warning(
+                    "logs stream of node %i (%s) interrupted: %s",
+                    self.key.node_id,
+                    self.key.backend,
+                    e,
+                )
+            except Exception as e:
+                logger.warning(
+                    "logs stream of node %i (%s) interrupted: %s",
+                    self.key.node_id,
+                    self.key.backend,
+                    e,
+                )
+            await asyncio.sleep(LOG_STREAM_RECONNECT_DELAY)
+        # wake up viewers so they can close their websockets
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def subscribe(self, include_buffer: bool = True) -> AsyncIterator[list[str]]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_STREAM_SUBSCRIBER_QUEUE_SIZE)
+        if include_buffer and self._replay:
+            queue.put_nowait(list(self._replay))
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(include_buffer))
+        try:
+            while (lines := await queue.get()) is not None:
+                yield lines
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                if self._task and not self._task.done():
+                    self._task.cancel()
+                if _streams.get(self.key) is self:
+                    del _streams[self.key]
+
+
+_streams: dict[LogStreamKey, NodeLogStream] = {}
+
+
+def subscribe(
+    node_id: int,
+    backend: str,
+    include_buffer: bool = True,
+    level: str | None = None,
+    pattern: str | None = None,
+    user: str | None = None,
+) -> AsyncIterator[list[str]]:
+    """subscribe to the shared logs stream of a node backend with the given filter"""
+    key = LogStreamKey(node_id, backend, level, pattern, user)
+    if key not in _streams:
+        _streams[key] = NodeLogStream(key)
+    return _streams[key].subscribe(include_buffer)
+
+
+def get_metrics() -> list[dict]:
+    return [
+        {
+            **stream.key._asdict(),
+            "subscribers": stream.subscribers,
+            "dropped": stream.dropped,
+        }
+        for stream in _streams.values()
+    ]
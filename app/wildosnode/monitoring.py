@@ -25,12 +25,14 @@ from .exceptions import (
     NetworkError, ServiceError, TimeoutError, AuthenticationError, 
     ConfigurationError, ResourceError
 )
+from .scheduler import MaintenanceJob, get_maintenance_scheduler
 
 logger = logging.getLogger(__name__)
 
 # Monitoring Configuration Constants
 METRICS_BUFFER_SIZE = 10000
 METRICS_FLUSH_INTERVAL = 60.0  # 1 minute
+ALERT_CHECK_INTERVAL = 30.0  # 30 seconds
 PERFORMANCE_WINDOW_SIZE = 1000
 PERFORMANCE_PERCENTILES = [50, 90, 95, 99]
 ALERT_COOLDOWN_SECONDS = 300.0  # 5 minutes per alert type
@@ -409,8 +411,8 @@ class MetricsCollector:
         # Metrics aggregation
         self._metric_tags: Dict[str, Dict[str, str]] = {}
         
-        # Background flush task
-        self._flush_task: Optional[asyncio.Task] = None
+        # Flush job on the shared maintenance scheduler
+        self._flush_job: Optional[MaintenanceJob] = None
         self._running = False
     
     async def start(self):
@@ -419,19 +421,15 @@ class MetricsCollector:
             return
         
         self._running = True
-        self._flush_task = asyncio.create_task(self._periodic_flush())
+        self._flush_job = get_maintenance_scheduler().schedule(
+            "metrics_flush", self._flush_metrics, METRICS_FLUSH_INTERVAL
+        )
         logger.info("Metrics collector started")
     
     async def stop(self):
         """Stop metrics collection"""
         self._running = False
-        
-        if self._flush_task:
-            self._flush_task.cancel()
-            try:
-                await self._flush_task
-            except asyncio.CancelledError:
-                pass
+        get_maintenance_scheduler().cancel(self._flush_job)
         
         # Final flush
         await self._flush_metrics()
@@ -558,15 +556,6 @@ class MetricsCollector:
         
         return tags if tags else None
     
-    async def _periodic_flush(self):
-        """Periodic metrics flush"""
-        while self._running:
-            try:
-                await asyncio.sleep(METRICS_FLUSH_INTERVAL)
-                await self._flush_metrics()
-            except Exception as e:
-                logger.error(f"Error in metrics flush: {e}")
-    
     async def _flush_metrics(self):
         """Flush metrics buffer"""
         with self._lock:
@@ -733,7 +722,7 @@ class MonitoringSystem:
         
         # System state
         self._running = False
-        self._check_task: Optional[asyncio.Task] = None
+        self._check_job: Optional[MaintenanceJob] = None
         
         # Default alert rules
         self._setup_default_alert_rules()
@@ -748,21 +737,17 @@ class MonitoringSystem:
         self._running = True
         await self.metrics.start()
         
-        # Start periodic alert checking
-        self._check_task = asyncio.create_task(self._periodic_alert_check())
+        # Schedule periodic alert checking
+        self._check_job = get_maintenance_scheduler().schedule(
+            "alert_check", self._check_alerts, ALERT_CHECK_INTERVAL
+        )
         
         self.logger.info("Monitoring system started")
     
     async def stop(self):
         """Stop monitoring system"""
         self._running = False
-        
-        if self._check_task:
-            self._check_task.cancel()
-            try:
-                await self._check_task
-            except asyncio.CancelledError:
-                pass
+        get_maintenance_scheduler().cancel(self._check_job)
         
         await self.metrics.stop()
         self.logger.info("Monitoring system stopped")
@@ -821,15 +806,12 @@ class MonitoringSystem:
         histogram_stats = self.metrics.get_histogram_stats("operation_duration_ms")
         return histogram_stats.get('mean', 0.0)
     
-    async def _periodic_alert_check(self):
-        """Periodic alert checking"""
-        while self._running:
-            try:
-                self.alerts.check_alerts(self)
-                await asyncio.sleep(30)  # Check every 30 seconds
-            except Exception as e:
-                self.logger.error("Error in periodic alert check", error=e)
-                await asyncio.sleep(30)
+    async def _check_alerts(self):
+        """Alert checking, scheduled every ALERT_CHECK_INTERVAL"""
+        try:
+            self.alerts.check_alerts(self)
+        except Exception as e:
+            self.logger.error("Error in periodic alert check", error=e)
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get overall system health status"""
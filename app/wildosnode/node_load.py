@@ -0,0 +1,187 @@
+"""scores how loaded every node is, for ordering the hosts of subscriptions"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from app.config.env import NODE_LOAD_INTERVAL, NODE_LOAD_LEVELS
+from app.models.node import NodeStatus
+from .fleet_metrics import get_fleet_telemetry
+from .scheduler import MaintenanceJob, get_maintenance_scheduler
+
+logger = logging.getLogger(__name__)
+
+# how much each part counts towards a node's score
+CPU_WEIGHT = 0.4
+BANDWIDTH_WEIGHT = 0.3
+USERS_WEIGHT = 0.3
+
+# how far a score has to leave its level's band before the node changes level
+HYSTERESIS = 0.05
+
+
+@dataclass(frozen=True)
+class NodeLoadSnapshot:
+    """node load levels as of `epoch`, 0 is the least loaded level"""
+
+    epoch: int = 0
+    levels: dict[int, int] = field(default_factory=dict)
+    unavailable: frozenset[int] = frozenset()
+
+    def level(self, node_id: int | None) -> int:
+        # hosts that aren't served by a node, and new nodes, count as idle
+        return self.levels.get(node_id, 0)
+
+
+class NodeLoadTracker:
+    """
+    Scores every node from its CPU usage and from the traffic and online
+    users of its last usage poll, relative to the busiest node, and puts
+    it in one of `levels` levels. Nodes that aren't healthy or connected
+    are unavailable and an ongoing critical peak puts a node in the top
+    level.
+
+    `epoch` moves only when a node changes level or availability, so
+    subscriptions ordered by load stay cached while it fluctuates. The
+    epoch is part of their cache key, entries of older epochs age out of
+    the LRU. Nothing is polled while load-aware host ordering is off.
+    """
+
+    def __init__(
+        self, interval: float = NODE_LOAD_INTERVAL, levels: int = NODE_LOAD_LEVELS
+    ):
+        self.interval = interval
+        self.levels = max(levels, 1)
+        self._usage: dict[int, tuple[float, int]] = {}
+        self._scores: dict[int, float] = {}
+        self._snapshot = NodeLoadSnapshot()
+        self._job: MaintenanceJob | None = None
+
+    def start(self) -> None:
+        if self._job is None:
+            self._job = get_maintenance_scheduler().schedule(
+                "node_load", self.refresh, self.interval
+            )
+
+    def stop(self) -> None:
+        get_maintenance_scheduler().cancel(self._job)
+        self._job = None
+
+    def snapshot(self) -> NodeLoadSnapshot:
+        return self._snapshot
+
+    def record_usage(
+        self, node_id: int, bytes_per_second: float, online_users: int
+    ) -> None:
+        """the traffic and online users of a node's last usage poll"""
+        self._usage[node_id] = (bytes_per_second, online_users)
+
+    def _level(self, node_id: int, score: float) -> int:
+        level = min(int(score * self.levels), self.levels - 1)
+        previous = self._snapshot.levels.get(node_id)
+        if previous is not None and level != previous:
+            low = previous / self.levels - HYSTERESIS
+            high = (previous + 1) / self.levels + HYSTERESIS
+            if low <= score < high:
+                return previous
+        return level
+
+    async def refresh(self) -> None:
+        """score every node, scheduled every `interval` seconds"""
+        from app import wildosnode
+        from app.db import GetDB, crud
+        from app.utils.subscription_settings import subscription_settings
+
+        settings, _ = subscription_settings.current() or await asyncio.to_thread(
+            subscription_settings.get
+        )
+        if not settings.order_hosts_by_load:
+            return
+
+        def nodes_health():
+            with GetDB() as db:
+                return crud.get_nodes_health(db)
+
+        statuses, critical = await asyncio.to_thread(nodes_health)
+        telemetry = await get_fleet_telemetry().get_all(max_age=self.interval)
+        cpu = {
+            t.node_id: t.host.cpu.usage / 100
+            for t in telemetry
+            if t.host is not None and t.host_error is None
+        }
+        # a node answering neither rpc is unreachable
+        failing = {
+            t.node_id
+            for t in telemetry
+            if t.host_error is not None and t.backends_error is not None
+        }
+
+        for node_id in set(self._usage) - set(statuses):
+            del self._usage[node_id]
+        max_bandwidth = max((bw for bw, _ in self._usage.values()), default=0.0)
+        max_users = max((users for _, users in self._usage.values()), default=0)
+
+        levels, unavailable, scores = {}, set(), {}
+        for node_id, status in statuses.items():
+            if (
+                status != NodeStatus.healthy
+                or node_id not in wildosnode.nodes
+                or node_id in failing
+            ):
+                unavailable.add(node_id)
+                continue
+            bandwidth, users = self._usage.get(node_id, (0.0, 0))
+            parts = []
+            if node_id in cpu:
+                parts.append((CPU_WEIGHT, min(cpu[node_id], 1.0)))
+            if max_bandwidth:
+                parts.append((BANDWIDTH_WEIGHT, bandwidth / max_bandwidth))
+            if max_users:
+                parts.append((USERS_WEIGHT, users / max_users))
+            score = (
+                sum(w * v for w, v in parts) / sum(w for w, _ in parts) if parts else 0.0
+            )
+            scores[node_id] = score
+            levels[node_id] = (
+                self.levels - 1 if node_id in critical else self._level(node_id, score)
+            )
+        self._scores = scores
+
+        previous = self._snapshot
+        if levels != previous.levels or unavailable != previous.unavailable:
+            self._snapshot = NodeLoadSnapshot(
+                previous.epoch + 1, levels, frozenset(unavailable)
+            )
+            logger.debug("node load moved to epoch %i", self._snapshot.epoch)
+
+    def get_metrics(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "interval": self.interval,
+            "levels": self.levels,
+            "epoch": snapshot.epoch,
+            "nodes": {
+                node_id: {
+                    "score": self._scores.get(node_id),
+                    "level": snapshot.levels.get(node_id),
+                    "available": node_id not in snapshot.unavailable,
+                    "bytes_per_second": self._usage.get(node_id, (0.0, 0))[0],
+                    "online_users": self._usage.get(node_id, (0.0, 0))[1],
+                }
+                for node_id in sorted({*snapshot.levels, *snapshot.unavailable})
+            },
+        }
+
+
+_tracker: NodeLoadTracker | None = None
+
+
+def get_node_load() -> NodeLoadTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = NodeLoadTracker()
+    return _tracker
+
+
+def get_metrics() -> dict:
+    return get_node_load().get_metrics()
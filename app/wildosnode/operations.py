@@ -375,8 +375,13 @@ async def remove_node(node_id: int):
         raise structured_error
 
 
-async def add_node(db_node, certificate):
-    """Add a node with enhanced error handling, monitoring, and recovery"""
+async def add_node(db_node, certificate, tls_material=None) -> bool:
+    """
+    Add a node with enhanced error handling, monitoring, and recovery
+
+    :param tls_material: the panel's shared node TLS material, reloaded if not given
+    :return: whether the node passed the initial connection test
+    """
     start_time = time.time()
     from .monitoring import get_monitoring, get_error_aggregator, get_status_reporter
     monitoring = get_monitoring()
@@ -438,7 +443,7 @@ async def add_node(db_node, certificate):
             raise config_error
         
         # Ленивый импорт для избежания циклических зависимостей
-        from .grpc_client import WildosNodeGRPCLIB, setup_enhanced_grpc_monitoring
+        from .grpc_client import WildosNodeGRPCLIB, get_node_tls_material, setup_enhanced_grpc_monitoring
         from app.dependencies import get_db
         from app.security.node_auth import NodeAuthManager
         
@@ -456,6 +461,8 @@ async def add_node(db_node, certificate):
             certificate.certificate,
             usage_coefficient=db_node.usage_coefficient,
             auth_token=auth_token,
+            connection_backend=db_node.connection_backend or "grpclib",
+            tls_material=tls_material or get_node_tls_material(reload=True),
         )
         
         # Setup enhanced monitoring for this node
@@ -497,6 +504,7 @@ async def add_node(db_node, certificate):
                     'added_at': time.time()
                 }
             )
+            return True
             
         except Exception as test_error:
             # Connection test failed - log but don't remove node entirely
@@ -534,6 +542,7 @@ async def add_node(db_node, certificate):
             
             # Record test failure in error aggregation
             error_aggregator.add_error(test_enhanced_error, f'node_{node_id}')
+            return False
         
     except WildosNodeBaseError as e:
         # Already a structured error, just log and update status
@@ -0,0 +1,130 @@
+"""shares a single upstream peak events stream per node among all viewers"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator
+
+from app.config.env import (
+    PEAK_STREAM_RECONNECT_DELAY,
+    PEAK_STREAM_SUBSCRIBER_QUEUE_SIZE,
+)
+from app.db.batch_writer import queue_peak_event
+from .service_pb2 import PeakCategory, PeakLevel
+
+logger = logging.getLogger(__name__)
+
+
+class NodePeakStream:
+    """
+    One StreamPeakEvents call to a node, fanned out to subscriber queues.
+
+    The upstream task is started by the first subscriber and cancelled when
+    the last one leaves. Reconnects resume after the last seen `seq` so
+    viewers don't miss events the node still holds in its ring buffer.
+    """
+
+    def __init__(self, node_id: int):
+        self.node_id = node_id
+        self.last_seq = 0
+        self.dropped = 0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def _persist(self, event) -> None:
+        try:
+            context = json.loads(event.context_json) if event.context_json else {}
+        except ValueError:
+            context = {}
+        queue_peak_event(
+            node_id=self.node_id,
+            category=PeakCategory.Name(event.category),
+            metric=event.metric,
+            value=event.value,
+            threshold=event.threshold,
+            level=PeakLevel.Name(event.level),
+            dedupe_key=event.dedupe_key,
+            context_json=context,
+            started_at=datetime.fromtimestamp(event.started_at_ms / 1000),
+            resolved_at=(
+                datetime.fromtimestamp(event.resolved_at_ms / 1000)
+                if event.HasField("resolved_at_ms")
+                else None
+            ),
+            seq=event.seq,
+        )
+
+    def _dispatch(self, event) -> None:
+        if event.seq > self.last_seq:
+            self._persist(event)
+        self.last_seq = max(self.last_seq, event.seq)
+        for queue in self._subscribers:
+            if queue.full():
+                # slow viewer: drop its oldest event rather than stall the others
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    async def _run(self) -> None:
+        from app import wildosnode
+
+        while self._subscribers:
+            node = wildosnode.nodes.get(self.node_id)
+            if node is None:
+                logger.info("node %i removed, closing peak events stream", self.node_id)
+                break
+            try:
+                async for event in node.stream_peak_events(after_seq=self.last_seq):
+                    if event is not None:
+                        self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "peak events stream of node %i interrupted: %s", self.node_id, e
+                )
+            await asyncio.sleep(PEAK_STREAM_RECONNECT_DELAY)
+        # wake up viewers so they can close their websockets
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def subscribe(self) -> AsyncIterator:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=PEAK_STREAM_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._task and not self._task.done():
+                self._task.cancel()
+
+
+_streams: dict[int, NodePeakStream] = {}
+
+
+def subscribe(node_id: int) -> AsyncIterator:
+    """subscribe to the shared peak events stream of a node"""
+    if node_id not in _streams:
+        _streams[node_id] = NodePeakStream(node_id)
+    return _streams[node_id].subscribe()
+
+
+def get_metrics() -> dict[int, dict]:
+    return {
+        node_id: {
+            "subscribers": stream.subscribers,
+            "last_seq": stream.last_seq,
+            "dropped": stream.dropped,
+        }
+        for node_id, stream in _streams.items()
+    }
@@ -26,6 +26,7 @@ from .exceptions import (
     create_error_with_context, ServiceUnavailableError, ConnectionError,
     ContainerRestartError, NetworkUnstableError, CircuitBreakerError
 )
+from .scheduler import MaintenanceJob, get_maintenance_scheduler
 
 # Import with lazy loading to avoid circular dependencies
 from typing import TYPE_CHECKING
@@ -44,6 +45,7 @@ FALLBACK_CACHE_SIZE = 500
 FALLBACK_CACHE_TTL = 300.0   # 5 minutes
 HEALTH_CHECK_INTERVAL = 30.0  # 30 seconds
 HEALTH_CHECK_TIMEOUT = 5.0    # 5 seconds
+RECOVERY_CLEANUP_INTERVAL = 300.0  # 5 minutes
 
 
 class RecoveryMode(Enum):
@@ -553,38 +555,36 @@ class RecoveryManager:
             'degraded_operations': 0
         }
         
-        # Background tasks
-        self._health_check_task: Optional[asyncio.Task] = None
-        self._cleanup_task: Optional[asyncio.Task] = None
+        # Components that reconnect themselves, by component id
+        self._recovery_funcs: Dict[str, Optional[Callable[[], Awaitable[bool]]]] = {}
+        
+        # Maintenance jobs on the shared scheduler
+        self._health_check_job: Optional[MaintenanceJob] = None
+        self._cleanup_job: Optional[MaintenanceJob] = None
         self._running = False
     
     async def start(self):
-        """Start background maintenance tasks"""
+        """Schedule the maintenance jobs"""
         if self._running:
             return
             
         self._running = True
-        self._health_check_task = asyncio.create_task(self._periodic_health_checks())
-        self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+        scheduler = get_maintenance_scheduler()
+        self._health_check_job = scheduler.schedule(
+            "recovery_health_checks", self._run_health_checks, HEALTH_CHECK_INTERVAL
+        )
+        self._cleanup_job = scheduler.schedule(
+            "recovery_cleanup", self._cleanup, RECOVERY_CLEANUP_INTERVAL
+        )
         logger.info("Recovery manager started")
     
     async def stop(self):
-        """Stop background maintenance tasks"""
+        """Cancel the maintenance jobs"""
         self._running = False
         
-        if self._health_check_task:
-            self._health_check_task.cancel()
-            try:
-                await self._health_check_task
-            except asyncio.CancelledError:
-                pass
-        
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
+        scheduler = get_maintenance_scheduler()
+        scheduler.cancel(self._health_check_job)
+        scheduler.cancel(self._cleanup_job)
         
         logger.info("Recovery manager stopped")
     
@@ -598,6 +598,32 @@ class RecoveryManager:
         self._health_checks[component] = check_func
         logger.debug(f"Registered health check for component: {component}")
     
+    def register_component(
+        self,
+        component_id: str,
+        recovery_func: Optional[Callable[[], Awaitable[bool]]] = None,
+        component_name: Optional[str] = None
+    ) -> None:
+        """Track a component that probes its own health and reports it with record_health"""
+        self._recovery_funcs[component_id] = recovery_func
+        if component_id not in self._recovery_states:
+            self._recovery_states[component_id] = RecoveryState(component_name or component_id)
+        logger.debug(f"Registered component: {component_id}")
+    
+    def unregister_component(self, component_id: str) -> None:
+        """Forget a component and its recovery state"""
+        self._recovery_funcs.pop(component_id, None)
+        self._health_checks.pop(component_id, None)
+        self._recovery_states.pop(component_id, None)
+        logger.debug(f"Unregistered component: {component_id}")
+    
+    def record_health(self, component_id: str, is_healthy: bool) -> None:
+        """Record the result of a health probe run outside the recovery manager"""
+        state = self._recovery_states.get(component_id)
+        if state is None:
+            return
+        state.health_status = HealthStatus.HEALTHY if is_healthy else HealthStatus.UNHEALTHY
+    
     async def handle_error(
         self,
         func: Callable[..., Awaitable[T]],
@@ -685,67 +711,52 @@ class RecoveryManager:
             
             logger.debug(f"Updated recovery state for {component_name}: {state.consecutive_successes} consecutive successes")
     
-    async def _periodic_health_checks(self):
-        """Periodic health checks for registered components"""
-        while self._running:
-            try:
-                for component, check_func in self._health_checks.items():
-                    try:
-                        is_healthy = await asyncio.wait_for(check_func(), timeout=HEALTH_CHECK_TIMEOUT)
-                        
-                        async with self._lock:
-                            if component not in self._recovery_states:
-                                self._recovery_states[component] = RecoveryState(component)
-                            
-                            state = self._recovery_states[component]
-                            if is_healthy:
-                                state.health_status = HealthStatus.HEALTHY
-                            else:
-                                state.health_status = HealthStatus.UNHEALTHY
-                                
-                    except asyncio.TimeoutError:
-                        logger.warning(f"Health check timeout for component {component}")
-                        async with self._lock:
-                            if component in self._recovery_states:
-                                self._recovery_states[component].health_status = HealthStatus.UNKNOWN
-                    except Exception as e:
-                        logger.error(f"Health check failed for component {component}: {e}")
-                        async with self._lock:
-                            if component in self._recovery_states:
-                                self._recovery_states[component].health_status = HealthStatus.UNHEALTHY
-                
-                await asyncio.sleep(HEALTH_CHECK_INTERVAL)
-                
-            except Exception as e:
-                logger.error(f"Error in periodic health checks: {e}")
-                await asyncio.sleep(HEALTH_CHECK_INTERVAL)
-    
-    async def _periodic_cleanup(self):
-        """Periodic cleanup of old recovery states and cache"""
-        while self._running:
+    async def _run_health_checks(self):
+        """Run the registered health checks, scheduled every HEALTH_CHECK_INTERVAL"""
+        for component, check_func in list(self._health_checks.items()):
             try:
-                current_time = time.time()
+                is_healthy = await asyncio.wait_for(check_func(), timeout=HEALTH_CHECK_TIMEOUT)
                 
-                # Cleanup old recovery states
                 async with self._lock:
-                    expired_components = [
-                        component for component, state in self._recovery_states.items()
-                        if (current_time - state.last_success_time) > RECOVERY_STATE_TTL
-                        and (not state.last_failure_time or (current_time - state.last_failure_time) > RECOVERY_STATE_TTL)
-                    ]
+                    if component not in self._recovery_states:
+                        self._recovery_states[component] = RecoveryState(component)
                     
-                    for component in expired_components:
-                        del self._recovery_states[component]
-                        logger.debug(f"Cleaned up recovery state for expired component: {component}")
-                
-                # Cleanup cache
-                await self._fallback_cache._cleanup_expired()
-                
-                await asyncio.sleep(300)  # Cleanup every 5 minutes
-                
+                    state = self._recovery_states[component]
+                    if is_healthy:
+                        state.health_status = HealthStatus.HEALTHY
+                    else:
+                        state.health_status = HealthStatus.UNHEALTHY
+                        
+            except asyncio.TimeoutError:
+                logger.warning(f"Health check timeout for component {component}")
+                async with self._lock:
+                    if component in self._recovery_states:
+                        self._recovery_states[component].health_status = HealthStatus.UNKNOWN
             except Exception as e:
-                logger.error(f"Error in periodic cleanup: {e}")
-                await asyncio.sleep(300)
+                logger.error(f"Health check failed for component {component}: {e}")
+                async with self._lock:
+                    if component in self._recovery_states:
+                        self._recovery_states[component].health_status = HealthStatus.UNHEALTHY
+    
+    async def _cleanup(self):
+        """Cleanup of old recovery states and cache, scheduled every RECOVERY_CLEANUP_INTERVAL"""
+        current_time = time.time()
+        
+        # Cleanup old recovery states, registered components stay
+        async with self._lock:
+            expired_components = [
+                component for component, state in self._recovery_states.items()
+                if component not in self._recovery_funcs
+                and (current_time - state.last_success_time) > RECOVERY_STATE_TTL
+                and (not state.last_failure_time or (current_time - state.last_failure_time) > RECOVERY_STATE_TTL)
+            ]
+            
+            for component in expired_components:
+                del self._recovery_states[component]
+                logger.debug(f"Cleaned up recovery state for expired component: {component}")
+        
+        # Cleanup cache
+        await self._fallback_cache._cleanup_expired()
     
     def get_recovery_state(self, component_name: str) -> Optional[RecoveryState]:
         """Get recovery state for a component"""
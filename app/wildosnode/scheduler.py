@@ -0,0 +1,207 @@
+"""runs the periodic maintenance of all node clients from a single task"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+from app.config.env import NODE_MAINTENANCE_CONCURRENCY, NODE_MAINTENANCE_JITTER
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceJob:
+    """
+    A periodic job, e.g. the health probe of one node.
+
+    `skew` is how late a run started after its slot, which grows when the
+    concurrency cap is saturated or the event loop is busy.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        node_id: int | None = None,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.node_id = node_id
+        self.due = 0.0
+        self.cancelled = False
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run = 0.0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.last_skew = 0.0
+        self.max_skew = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "running": self.running,
+            "last_run": self.last_run,
+            "last_latency_ms": self.last_latency * 1000,
+            "avg_latency_ms": self.total_latency / self.runs * 1000 if self.runs else 0.0,
+            "last_skew_ms": self.last_skew * 1000,
+            "max_skew_ms": self.max_skew * 1000,
+        }
+
+
+class MaintenanceScheduler:
+    """
+    One timer for every node's health probes, pool upkeep and cleanup.
+
+    Each job starts in a random slot within its interval and then keeps its
+    cadence with a little jitter, so a fleet of nodes doesn't wake up at the
+    same moment. At most `max_concurrency` jobs run at once and a job is not
+    started again while its previous run is still going.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = NODE_MAINTENANCE_CONCURRENCY,
+        jitter: float = NODE_MAINTENANCE_JITTER,
+    ):
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self._jobs: set[MaintenanceJob] = set()
+        self._queue: list[tuple[float, int, MaintenanceJob]] = []
+        self._order = itertools.count()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._runs: set[asyncio.Task] = set()
+
+    def schedule(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        node_id: int | None = None,
+        delay: float | None = None,
+    ) -> MaintenanceJob:
+        """
+        run `func` every `interval` seconds, first after `delay` seconds
+        or at a random point of the first interval if it's not given
+        """
+        job = MaintenanceJob(name, func, interval, node_id)
+        if delay is None:
+            delay = random.uniform(0, interval)
+        self._jobs.add(job)
+        self._enqueue(job, time.monotonic() + delay)
+        self._ensure_running()
+        return job
+
+    def cancel(self, job: MaintenanceJob | None) -> None:
+        """a running job finishes its current run but isn't rescheduled"""
+        if job is None:
+            return
+        job.cancelled = True
+        self._jobs.discard(job)
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._task, *self._runs) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._runs.clear()
+
+    def _enqueue(self, job: MaintenanceJob, due: float) -> None:
+        job.due = due
+        heapq.heappush(self._queue, (due, next(self._order), job))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            while self._queue and self._queue[0][0] <= now:
+                due, _, job = heapq.heappop(self._queue)
+                if job.cancelled:
+                    continue
+                job.running = True
+                task = asyncio.create_task(self._execute(job, due))
+                self._runs.add(task)
+                task.add_done_callback(self._runs.discard)
+            timeout = self._queue[0][0] - now if self._queue else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: MaintenanceJob, due: float) -> None:
+        try:
+            async with self._semaphore:
+                if job.cancelled:
+                    return
+                started = time.monotonic()
+                job.last_skew = started - due
+                job.max_skew = max(job.max_skew, job.last_skew)
+                job.last_run = time.time()
+                try:
+                    await job.func()
+                except Exception as e:
+                    job.failures += 1
+                    logger.error(
+                        "maintenance job %s of node %s failed: %s", job.name, job.node_id, e
+                    )
+                finally:
+                    job.last_latency = time.monotonic() - started
+                    job.total_latency += job.last_latency
+                    job.runs += 1
+        finally:
+            job.running = False
+        if job.cancelled:
+            return
+        next_due = due + job.interval * (1 + random.uniform(-self.jitter, self.jitter))
+        # skip the slots missed by a slow run instead of running back to back
+        now = time.monotonic()
+        if next_due < now:
+            next_due = now + job.interval * random.uniform(1 - self.jitter, 1)
+        self._enqueue(job, next_due)
+
+    def get_metrics(self) -> dict:
+        nodes: dict[int, dict] = {}
+        shared: dict[str, dict] = {}
+        for job in self._jobs:
+            jobs = shared if job.node_id is None else nodes.setdefault(job.node_id, {})
+            jobs[job.name] = job.snapshot()
+        return {
+            "jobs": len(self._jobs),
+            "running": sum(job.running for job in self._jobs),
+            "max_concurrency": self.max_concurrency,
+            "shared": shared,
+            "nodes": nodes,
+        }
+
+
+_scheduler: MaintenanceScheduler | None = None
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = MaintenanceScheduler()
+    return _scheduler
+
+
+def get_metrics() -> dict:
+    return get_maintenance_scheduler().get_metrics()
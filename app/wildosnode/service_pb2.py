@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rservice.proto\x12\nwildosnode\"\x07\n\x05\x45mpty\"|\n\x07\x42\x61\x63kend\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x11\n\x04type\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x14\n\x07version\x18\x03 \x01(\tH\x01\x88\x01\x01\x12%\n\x08inbounds\x18\x04 \x03(\x0b\x32\x13.wildosnode.InboundB\x07\n\x05_typeB\n\n\x08_version\"9\n\x10\x42\x61\x63kendsResponse\x12%\n\x08\x62\x61\x63kends\x18\x01 \x03(\x0b\x32\x13.wildosnode.Backend\"6\n\x07Inbound\x12\x0b\n\x03tag\x18\x01 \x01(\t\x12\x13\n\x06\x63onfig\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_config\"1\n\x04User\x12\n\n\x02id\x18\x01 \x01(\r\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x0b\n\x03key\x18\x03 \x01(\t\"Q\n\x08UserData\x12\x1e\n\x04user\x18\x01 \x01(\x0b\x32\x10.wildosnode.User\x12%\n\x08inbounds\x18\x02 \x03(\x0b\x32\x13.wildosnode.Inbound\"5\n\tUsersData\x12(\n\nusers_data\x18\x01 \x03(\x0b\x32\x14.wildosnode.UserData\"l\n\nUsersStats\x12\x35\n\x0busers_stats\x18\x01 \x03(\x0b\x32 .wildosnode.UsersStats.UserStats\x1a\'\n\tUserStats\x12\x0b\n\x03uid\x18\x01 \x01(\r\x12\r\n\x05usage\x18\x02 \x01(\x04\"\x17\n\x07LogLine\x12\x0c\n\x04line\x18\x01 \x01(\t\"W\n\rBackendConfig\x12\x15\n\rconfiguration\x18\x01 \x01(\t\x12/\n\rconfig_format\x18\x02 \x01(\x0e\x32\x18.wildosnode.ConfigFormat\"B\n\x12\x42\x61\x63kendLogsRequest\x12\x14\n\x0c\x62\x61\x63kend_name\x18\x01 \x01(\t\x12\x16\n\x0einclude_buffer\x18\x02 \x01(\x08\"h\n\x15RestartBackendRequest\x12\x14\n\x0c\x62\x61\x63kend_name\x18\x01 \x01(\t\x12.\n\x06\x63onfig\x18\x02 \x01(\x0b\x32\x19.wildosnode.BackendConfigH\x00\x88\x01\x01\x42\t\n\x07_config\"\x1f\n\x0c\x42\x61\x63kendStats\x12\x0f\n\x07running\x18\x01 \x01(\x08\"\x98\x02\n\x11HostSystemMetrics\x12\x11\n\tcpu_usage\x18\x01 \x01(\x01\x12\x14\n\x0cmemory_usage\x18\x02 \x01(\x01\x12\x14\n\x0cmemory_total\x18\x03 \x01(\x01\x12\x12\n\ndisk_usage\x18\x04 \x01(\x01\x12\x12\n\ndisk_total\x18\x05 \x01(\x01\x12\x38\n\x12network_interfaces\x18\x06 \x03(\x0b\x32\x1c.wildosnode.NetworkInterface\x12\x16\n\x0euptime_seconds\x18\x07 \x01(\x03\x12\x17\n\x0fload_average_1m\x18\x08 \x01(\x01\x12\x17\n\x0fload_average_5m\x18\t \x01(\x01\x12\x18\n\x10load_average_15m\x18\n \x01(\x01\"|\n\x10NetworkInterface\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x12\n\nbytes_sent\x18\x02 \x01(\x03\x12\x16\n\x0e\x62ytes_received\x18\x03 \x01(\x03\x12\x14\n\x0cpackets_sent\x18\x04 \x01(\x03\x12\x18\n\x10packets_received\x18\x05 \x01(\x03\"3\n\x11PortActionRequest\x12\x0c\n\x04port\x18\x01 \x01(\x05\x12\x10\n\x08protocol\x18\x02 \x01(\t\"6\n\x12PortActionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"$\n\x14\x43ontainerLogsRequest\x12\x0c\n\x04tail\x18\x01 \x01(\x05\"%\n\x15\x43ontainerLogsResponse\x12\x0c\n\x04logs\x18\x01 \x03(\t\"%\n\x15\x43ontainerFilesRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\"=\n\x16\x43ontainerFilesResponse\x12#\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x14.wildosnode.FileInfo\"a\n\x08\x46ileInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04path\x18\x02 \x01(\t\x12\x14\n\x0cis_directory\x18\x03 \x01(\x08\x12\x0c\n\x04size\x18\x04 \x01(\x03\x12\x15\n\rmodified_time\x18\x05 \x01(\x03\"<\n\x18\x43ontainerRestartResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xb8\x01\n\x18\x41llBackendsStatsResponse\x12M\n\rbackend_stats\x18\x01 \x03(\x0b\x32\x36.wildosnode.AllBackendsStatsResponse.BackendStatsEntry\x1aM\n\x11\x42\x61\x63kendStatsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.wildosnode.BackendStats:\x02\x38\x01\"\x9e\x02\n\tPeakEvent\x12\x0f\n\x07node_id\x18\x01 \x01(\r\x12*\n\x08\x63\x61tegory\x18\x02 \x01(\x0e\x32\x18.wildosnode.PeakCategory\x12\x0e\n\x06metric\x18\x03 \x01(\t\x12\r\n\x05value\x18\x04 \x01(\x01\x12\x11\n\tthreshold\x18\x05 \x01(\x01\x12$\n\x05level\x18\x06 \x01(\x0e\x32\x15.wildosnode.PeakLevel\x12\x12\n\ndedupe_key\x18\x07 \x01(\t\x12\x14\n\x0c\x63ontext_json\x18\x08 \x01(\t\x12\x15\n\rstarted_at_ms\x18\t \x01(\x04\x12\x1b\n\x0eresolved_at_ms\x18\n \x01(\x04H\x00\x88\x01\x01\x12\x0b\n\x03seq\x18\x0b \x01(\x04\x42\x11\n\x0f_resolved_at_ms\"\x7f\n\tPeakQuery\x12\x10\n\x08since_ms\x18\x01 \x01(\x04\x12\x15\n\x08until_ms\x18\x02 \x01(\x04H\x00\x88\x01\x01\x12/\n\x08\x63\x61tegory\x18\x03 \x01(\x0e\x32\x18.wildosnode.PeakCategoryH\x01\x88\x01\x01\x42\x0b\n\t_until_msB\x0b\n\t_category*-\n\x0c\x43onfigFormat\x12\t\n\x05PLAIN\x10\x00\x12\x08\n\x04JSON\x10\x01\x12\x08\n\x04YAML\x10\x02*&\n\tPeakLevel\x12\x0b\n\x07WARNING\x10\x00\x12\x0c\n\x08\x43RITICAL\x10\x01*G\n\x0cPeakCategory\x12\x07\n\x03\x43PU\x10\x00\x12\n\n\x06MEMORY\x10\x01\x12\x08\n\x04\x44ISK\x10\x02\x12\x0b\n\x07NETWORK\x10\x03\x12\x0b\n\x07\x42\x41\x43KEND\x10\x04\x32\xde\t\n\rWildosService\x12\x36\n\tSyncUsers\x12\x14.wildosnode.UserData\x1a\x11.wildosnode.Empty(\x01\x12;\n\x0fRepopulateUsers\x12\x15.wildosnode.UsersData\x1a\x11.wildosnode.Empty\x12@\n\rFetchBackends\x12\x11.wildosnode.Empty\x1a\x1c.wildosnode.BackendsResponse\x12<\n\x0f\x46\x65tchUsersStats\x12\x11.wildosnode.Empty\x1a\x16.wildosnode.UsersStats\x12\x44\n\x12\x46\x65tchBackendConfig\x12\x13.wildosnode.Backend\x1a\x19.wildosnode.BackendConfig\x12\x46\n\x0eRestartBackend\x12!.wildosnode.RestartBackendRequest\x1a\x11.wildosnode.Empty\x12J\n\x11StreamBackendLogs\x12\x1e.wildosnode.BackendLogsRequest\x1a\x13.wildosnode.LogLine0\x01\x12@\n\x0fGetBackendStats\x12\x13.wildosnode.Backend\x1a\x18.wildosnode.BackendStats\x12H\n\x14GetHostSystemMetrics\x12\x11.wildosnode.Empty\x1a\x1d.wildosnode.HostSystemMetrics\x12M\n\x0cOpenHostPort\x12\x1d.wildosnode.PortActionRequest\x1a\x1e.wildosnode.PortActionResponse\x12N\n\rCloseHostPort\x12\x1d.wildosnode.PortActionRequest\x1a\x1e.wildosnode.PortActionResponse\x12W\n\x10GetContainerLogs\x12 .wildosnode.ContainerLogsRequest\x1a!.wildosnode.ContainerLogsResponse\x12Z\n\x11GetContainerFiles\x12!.wildosnode.ContainerFilesRequest\x1a\".wildosnode.ContainerFilesResponse\x12K\n\x10RestartContainer\x12\x11.wildosnode.Empty\x1a$.wildosnode.ContainerRestartResponse\x12N\n\x13GetAllBackendsStats\x12\x11.wildosnode.Empty\x1a$.wildosnode.AllBackendsStatsResponse\x12>\n\x10StreamPeakEvents\x12\x11.wildosnode.Empty\x1a\x15.wildosnode.PeakEvent0\x01\x12\x41\n\x0f\x46\x65tchPeakEvents\x12\x15.wildosnode.PeakQuery\x1a\x15.wildosnode.PeakEvent0\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rservice.proto\x12\nwildosnode\"\x07\n\x05\x45mpty\"|\n\x07\x42\x61\x63kend\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x11\n\x04type\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x14\n\x07version\x18\x03 \x01(\tH\x01\x88\x01\x01\x12%\n\x08inbounds\x18\x04 \x03(\x0b\x32\x13.wildosnode.InboundB\x07\n\x05_typeB\n\n\x08_version\"9\n\x10\x42\x61\x63kendsResponse\x12%\n\x08\x62\x61\x63kends\x18\x01 \x03(\x0b\x32\x13.wildosnode.Backend\"6\n\x07Inbound\x12\x0b\n\x03tag\x18\x01 \x01(\t\x12\x13\n\x06\x63onfig\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_config\"1\n\x04User\x12\n\n\x02id\x18\x01 \x01(\r\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x0b\n\x03key\x18\x03 \x01(\t\"Q\n\x08UserData\x12\x1e\n\x04user\x18\x01 \x01(\x0b\x32\x10.wildosnode.User\x12%\n\x08inbounds\x18\x02 \x03(\x0b\x32\x13.wildosnode.Inbound\"5\n\tUsersData\x12(\n\nusers_data\x18\x01 \x03(\x0b\x32\x14.wildosnode.UserData\"\xec\x02\n\nUsersStats\x12\x35\n\x0busers_stats\x18\x01 \x03(\x0b\x32 .wildosnode.UsersStats.UserStats\x12=\n\x0f\x62\x61\x63kends_status\x18\x02 \x03(\x0b\x32$.wildosnode.UsersStats.BackendStatus\x12\x34\n\nonline_ips\x18\x03 \x03(\x0b\x32 .wildosnode.UsersStats.OnlineIPs\x1a\'\n\tUserStats\x12\x0b\n\x03uid\x18\x01 \x01(\r\x12\r\n\x05usage\x18\x02 \x01(\x04\x1a\\\n\rBackendStatus\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02ok\x18\x02 \x01(\x08\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x13\n\x0b\x64uration_ms\x18\x04 \x01(\rB\x08\n\x06_error\x1a+\n\tOnlineIPs\x12\x0b\n\x03uid\x18\x01 \x01(\r\x12\x11\n\tip_hashes\x18\x02 \x03(\x07\"7\n\x07LogLine\x12\x0c\n\x04line\x18\x01 \x01(\t\x12\r\n\x05lines\x18\x02 \x03(\t\x12\x0f\n\x07\x64ropped\x18\x03 \x01(\x04\"W\n\rBackendConfig\x12\x15\n\rconfiguration\x18\x01 \x01(\t\x12/\n\rconfig_format\x18\x02 \x01(\x0e\x32\x18.wildosnode.ConfigFormat\"\xad\x01\n\x12\x42\x61\x63kendLogsRequest\x12\x14\n\x0c\x62\x61\x63kend_name\x18\x01 \x01(\t\x12\x16\n\x0einclude_buffer\x18\x02 \x01(\x08\x12\x12\n\x05level\x18\x03 \x01(\tH\x00\x88\x01\x01\x12\x14\n\x07pattern\x18\x04 \x01(\tH\x01\x88\x01\x01\x12\x11\n\x04user\x18\x05 \x01(\tH\x02\x88\x01\x01\x12\r\n\x05\x62\x61tch\x18\x06 \x01(\x08\x42\x08\n\x06_levelB\n\n\x08_patternB\x07\n\x05_user\"h\n\x15RestartBackendRequest\x12\x14\n\x0c\x62\x61\x63kend_name\x18\x01 \x01(\t\x12.\n\x06\x63onfig\x18\x02 \x01(\x0b\x32\x19.wildosnode.BackendConfigH\x00\x88\x01\x01\x42\t\n\x07_config\"b\n\x13\x42\x61\x63kendRestartStats\x12\x0c\n\x04mode\x18\x01 \x01(\t\x12\x10\n\x08\x64uration\x18\x02 \x01(\x01\x12\x16\n\x0erefused_window\x18\x03 \x01(\x01\x12\x13\n\x0b\x66inished_at\x18\x04 \x01(\x04\"l\n\x0c\x42\x61\x63kendStats\x12\x0f\n\x07running\x18\x01 \x01(\x08\x12:\n\x0clast_restart\x18\x02 \x01(\x0b\x32\x1f.wildosnode.BackendRestartStatsH\x00\x88\x01\x01\x42\x0f\n\r_last_restart\"\x98\x02\n\x11HostSystemMetrics\x12\x11\n\tcpu_usage\x18\x01 \x01(\x01\x12\x14\n\x0cmemory_usage\x18\x02 \x01(\x01\x12\x14\n\x0cmemory_total\x18\x03 \x01(\x01\x12\x12\n\ndisk_usage\x18\x04 \x01(\x01\x12\x12\n\ndisk_total\x18\x05 \x01(\x01\x12\x38\n\x12network_interfaces\x18\x06 \x03(\x0b\x32\x1c.wildosnode.NetworkInterface\x12\x16\n\x0euptime_seconds\x18\x07 \x01(\x03\x12\x17\n\x0fload_average_1m\x18\x08 \x01(\x01\x12\x17\n\x0fload_average_5m\x18\t \x01(\x01\x12\x18\n\x10load_average_15m\x18\n \x01(\x01\"|\n\x10NetworkInterface\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x12\n\nbytes_sent\x18\x02 \x01(\x03\x12\x16\n\x0e\x62ytes_received\x18\x03 \x01(\x03\x12\x14\n\x0cpackets_sent\x18\x04 \x01(\x03\x12\x18\n\x10packets_received\x18\x05 \x01(\x03\"\\\n\x10HostMetricsQuery\x12\x10\n\x08since_ms\x18\x01 \x01(\x04\x12\x15\n\x08until_ms\x18\x02 \x01(\x04H\x00\x88\x01\x01\x12\x12\n\nmax_points\x18\x03 \x01(\rB\x0b\n\t_until_ms\"\xbb\x01\n\x11HostMetricsSample\x12\x14\n\x0ctimestamp_ms\x18\x01 \x01(\x04\x12\x11\n\tcpu_usage\x18\x02 \x01(\x01\x12\x14\n\x0cmemory_usage\x18\x03 \x01(\x01\x12\x12\n\ndisk_usage\x18\x04 \x01(\x01\x12\x17\n\x0fload_average_1m\x18\x05 \x01(\x01\x12\x1a\n\x12network_bytes_sent\x18\x06 \x01(\x04\x12\x1e\n\x16network_bytes_received\x18\x07 \x01(\x04\"`\n\x12HostMetricsHistory\x12.\n\x07samples\x18\x01 \x03(\x0b\x32\x1d.wildosnode.HostMetricsSample\x12\x1a\n\x12sample_interval_ms\x18\x02 \x01(\r\"3\n\x11PortActionRequest\x12\x0c\n\x04port\x18\x01 \x01(\x05\x12\x10\n\x08protocol\x18\x02 \x01(\t\"6\n\x12PortActionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"$\n\x14\x43ontainerLogsRequest\x12\x0c\n\x04tail\x18\x01 \x01(\x05\"%\n\x15\x43ontainerLogsResponse\x12\x0c\n\x04logs\x18\x01 \x03(\t\"%\n\x15\x43ontainerFilesRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\"=\n\x16\x43ontainerFilesResponse\x12#\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x14.wildosnode.FileInfo\"a\n\x08\x46ileInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04path\x18\x02 \x01(\t\x12\x14\n\x0cis_directory\x18\x03 \x01(\x08\x12\x0c\n\x04size\x18\x04 \x01(\x03\x12\x15\n\rmodified_time\x18\x05 \x01(\x03\"<\n\x18\x43ontainerRestartResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xb8\x01\n\x18\x41llBackendsStatsResponse\x12M\n\rbackend_stats\x18\x01 \x03(\x0b\x32\x36.wildosnode.AllBackendsStatsResponse.BackendStatsEntry\x1aM\n\x11\x42\x61\x63kendStatsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.wildosnode.BackendStats:\x02\x38\x01\"\x9e\x02\n\tPeakEvent\x12\x0f\n\x07node_id\x18\x01 \x01(\r\x12*\n\x08\x63\x61tegory\x18\x02 \x01(\x0e\x32\x18.wildosnode.PeakCategory\x12\x0e\n\x06metric\x18\x03 \x01(\t\x12\r\n\x05value\x18\x04 \x01(\x01\x12\x11\n\tthreshold\x18\x05 \x01(\x01\x12$\n\x05level\x18\x06 \x01(\x0e\x32\x15.wildosnode.PeakLevel\x12\x12\n\ndedupe_key\x18\x07 \x01(\t\x12\x14\n\x0c\x63ontext_json\x18\x08 \x01(\t\x12\x15\n\rstarted_at_ms\x18\t \x01(\x04\x12\x1b\n\x0eresolved_at_ms\x18\n \x01(\x04H\x00\x88\x01\x01\x12\x0b\n\x03seq\x18\x0b \x01(\x04\x42\x11\n\x0f_resolved_at_ms\"&\n\x11PeakStreamRequest\x12\x11\n\tafter_seq\x18\x01 \x01(\x04\"\x7f\n\tPeakQuery\x12\x10\n\x08since_ms\x18\x01 \x01(\x04\x12\x15\n\x08until_ms\x18\x02 \x01(\x04H\x00\x88\x01\x01\x12/\n\x08\x63\x61tegory\x18\x03 \x01(\x0e\x32\x18.wildosnode.PeakCategoryH\x01\x88\x01\x01\x42\x0b\n\t_until_msB\x0b\n\t_category*-\n\x0c\x43onfigFormat\x12\t\n\x05PLAIN\x10\x00\x12\x08\n\x04JSON\x10\x01\x12\x08\n\x04YAML\x10\x02*&\n\tPeakLevel\x12\x0b\n\x07WARNING\x10\x00\x12\x0c\n\x08\x43RITICAL\x10\x01*G\n\x0cPeakCategory\x12\x07\n\x03\x43PU\x10\x00\x12\n\n\x06MEMORY\x10\x01\x12\x08\n\x04\x44ISK\x10\x02\x12\x0b\n\x07NETWORK\x10\x03\x12\x0b\n\x07\x42\x41\x43KEND\x10\x04\x32\xc1\n\n\rWildosService\x12\x36\n\tSyncUsers\x12\x14.wildosnode.UserData\x1a\x11.wildosnode.Empty(\x01\x12;\n\x0fRepopulateUsers\x12\x15.wildosnode.UsersData\x1a\x11.wildosnode.Empty\x12@\n\rFetchBackends\x12\x11.wildosnode.Empty\x1a\x1c.wildosnode.BackendsResponse\x12<\n\x0f\x46\x65tchUsersStats\x12\x11.wildosnode.Empty\x1a\x16.wildosnode.UsersStats\x12\x44\n\x12\x46\x65tchBackendConfig\x12\x13.wildosnode.Backend\x1a\x19.wildosnode.BackendConfig\x12\x46\n\x0eRestartBackend\x12!.wildosnode.RestartBackendRequest\x1a\x11.wildosnode.Empty\x12J\n\x11StreamBackendLogs\x12\x1e.wildosnode.BackendLogsRequest\x1a\x13.wildosnode.LogLine0\x01\x12@\n\x0fGetBackendStats\x12\x13.wildosnode.Backend\x1a\x18.wildosnode.BackendStats\x12H\n\x14GetHostSystemMetrics\x12\x11.wildosnode.Empty\x1a\x1d.wildosnode.HostSystemMetrics\x12U\n\x15GetHostMetricsHistory\x12\x1c.wildosnode.HostMetricsQuery\x1a\x1e.wildosnode.HostMetricsHistory\x12M\n\x0cOpenHostPort\x12\x1d.wildosnode.PortActionRequest\x1a\x1e.wildosnode.PortActionResponse\x12N\n\rCloseHostPort\x12\x1d.wildosnode.PortActionRequest\x1a\x1e.wildosnode.PortActionResponse\x12W\n\x10GetContainerLogs\x12 .wildosnode.ContainerLogsRequest\x1a!.wildosnode.ContainerLogsResponse\x12Z\n\x11GetContainerFiles\x12!.wildosnode.ContainerFilesRequest\x1a\".wildosnode.ContainerFilesResponse\x12K\n\x10RestartContainer\x12\x11.wildosnode.Empty\x1a$.wildosnode.ContainerRestartResponse\x12N\n\x13GetAllBackendsStats\x12\x11.wildosnode.Empty\x1a$.wildosnode.AllBackendsStatsResponse\x12J\n\x10StreamPeakEvents\x12\x1d.wildosnode.PeakStreamRequest\x1a\x15.wildosnode.PeakEvent0\x01\x12\x41\n\x0f\x46\x65tchPeakEvents\x12\x15.wildosnode.PeakQuery\x1a\x15.wildosnode.PeakEvent0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -33,12 +33,12 @@ if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_ALLBACKENDSSTATSRESPONSE_BACKENDSTATSENTRY']._loaded_options = None
   _globals['_ALLBACKENDSSTATSRESPONSE_BACKENDSTATSENTRY']._serialized_options = b'8\001'
-  _globals['_CONFIGFORMAT']._serialized_start=2362
-  _globals['_CONFIGFORMAT']._serialized_end=2407
-  _globals['_PEAKLEVEL']._serialized_start=2409
-  _globals['_PEAKLEVEL']._serialized_end=2447
-  _globals['_PEAKCATEGORY']._serialized_start=2449
-  _globals['_PEAKCATEGORY']._serialized_end=2520
+  _globals['_CONFIGFORMAT']._serialized_start=3358
+  _globals['_CONFIGFORMAT']._serialized_end=3403
+  _globals['_PEAKLEVEL']._serialized_start=3405
+  _globals['_PEAKLEVEL']._serialized_end=3443
+  _globals['_PEAKCATEGORY']._serialized_start=3445
+  _globals['_PEAKCATEGORY']._serialized_end=3516
   _globals['_EMPTY']._serialized_start=29
   _globals['_EMPTY']._serialized_end=36
   _globals['_BACKEND']._serialized_start=38
@@ -53,48 +53,62 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_USERDATA']._serialized_end=411
   _globals['_USERSDATA']._serialized_start=413
   _globals['_USERSDATA']._serialized_end=466
-  _globals['_USERSSTATS']._serialized_start=468
-  _globals['_USERSSTATS']._serialized_end=576
-  _globals['_USERSSTATS_USERSTATS']._serialized_start=537
-  _globals['_USERSSTATS_USERSTATS']._serialized_end=576
-  _globals['_LOGLINE']._serialized_start=578
-  _globals['_LOGLINE']._serialized_end=601
-  _globals['_BACKENDCONFIG']._serialized_start=603
-  _globals['_BACKENDCONFIG']._serialized_end=690
-  _globals['_BACKENDLOGSREQUEST']._serialized_start=692
-  _globals['_BACKENDLOGSREQUEST']._serialized_end=758
-  _globals['_RESTARTBACKENDREQUEST']._serialized_start=760
-  _globals['_RESTARTBACKENDREQUEST']._serialized_end=864
-  _globals['_BACKENDSTATS']._serialized_start=866
-  _globals['_BACKENDSTATS']._serialized_end=897
-  _globals['_HOSTSYSTEMMETRICS']._serialized_start=900
-  _globals['_HOSTSYSTEMMETRICS']._serialized_end=1180
-  _globals['_NETWORKINTERFACE']._serialized_start=1182
-  _globals['_NETWORKINTERFACE']._serialized_end=1306
-  _globals['_PORTACTIONREQUEST']._serialized_start=1308
-  _globals['_PORTACTIONREQUEST']._serialized_end=1359
-  _globals['_PORTACTIONRESPONSE']._serialized_start=1361
-  _globals['_PORTACTIONRESPONSE']._serialized_end=1415
-  _globals['_CONTAINERLOGSREQUEST']._serialized_start=1417
-  _globals['_CONTAINERLOGSREQUEST']._serialized_end=1453
-  _globals['_CONTAINERLOGSRESPONSE']._serialized_start=1455
-  _globals['_CONTAINERLOGSRESPONSE']._serialized_end=1492
-  _globals['_CONTAINERFILESREQUEST']._serialized_start=1494
-  _globals['_CONTAINERFILESREQUEST']._serialized_end=1531
-  _globals['_CONTAINERFILESRESPONSE']._serialized_start=1533
-  _globals['_CONTAINERFILESRESPONSE']._serialized_end=1594
-  _globals['_FILEINFO']._serialized_start=1596
-  _globals['_FILEINFO']._serialized_end=1693
-  _globals['_CONTAINERRESTARTRESPONSE']._serialized_start=1695
-  _globals['_CONTAINERRESTARTRESPONSE']._serialized_end=1755
-  _globals['_ALLBACKENDSSTATSRESPONSE']._serialized_start=1758
-  _globals['_ALLBACKENDSSTATSRESPONSE']._serialized_end=1942
-  _globals['_ALLBACKENDSSTATSRESPONSE_BACKENDSTATSENTRY']._serialized_start=1865
-  _globals['_ALLBACKENDSSTATSRESPONSE_BACKENDSTATSENTRY']._serialized_end=1942
-  _globals['_PEAKEVENT']._serialized_start=1945
-  _globals['_PEAKEVENT']._serialized_end=2231
-  _globals['_PEAKQUERY']._serialized_start=2233
-  _globals['_PEAKQUERY']._serialized_end=2360
-  _globals['_WILDOSSERVICE']._serialized_start=2523
-  _globals['_WILDOSSERVICE']._serialized_end=3769
+  _globals['_USERSSTATS']._serialized_start=469
+  _globals['_USERSSTATS']._serialized_end=833
+  _globals['_USERSSTATS_USERSTATS']._serialized_start=655
+  _globals['_USERSSTATS_USERSTATS']._serialized_end=694
+  _globals['_USERSSTATS_BACKENDSTATUS']._serialized_start=696
+  _globals['_USERSSTATS_BACKENDSTATUS']._serialized_end=788
+  _globals['_USERSSTATS_ONLINEIPS']._serialized_start=790
+  _globals['_USERSSTATS_ONLINEIPS']._serialized_end=833
+  _globals['_LOGLINE']._serialized_start=835
+  _globals['_LOGLINE']._serialized_end=890
+  _globals['_BACKENDCONFIG']._serialized_start=892
+  _globals['_BACKENDCONFIG']._serialized_end=979
+  _globals['_BACKENDLOGSREQUEST']._serialized_start=982
+  _globals['_BACKENDLOGSREQUEST']._serialized_end=1155
+  _globals['_RESTARTBACKENDREQUEST']._serialized_start=1157
+  _globals['_RESTARTBACKENDREQUEST']._serialized_end=1261
+  _globals['_BACKENDRESTARTSTATS']._serialized_start=1263
+  _globals['_BACKENDRESTARTSTATS']._serialized_end=1361
+  _globals['_BACKENDSTATS']._serialized_start=1363
+  _globals['_BACKENDSTATS']._serialized_end=1471
+  _globals['_HOSTSYSTEMMETRICS']._serialized_start=1474
+  _globals['_HOSTSYSTEMMETRICS']._serialized_end=1754
+  _globals['_NETWORKINTERFACE']._serialized_start=1756
+  _globals['_NETWORKINTERFACE']._serialized_end=1880
+  _globals['_HOSTMETRICSQUERY']._serialized_start=1882
+  _globals['_HOSTMETRICSQUERY']._serialized_end=1974
+  _globals['_HOSTMETRICSSAMPLE']._serialized_start=1977
+  _globals['_HOSTMETRICSSAMPLE']._serialized_end=2164
+  _globals['_HOSTMETRICSHISTORY']._serialized_start=2166
+  _globals['_HOSTMETRICSHISTORY']._serialized_end=2262
+  _globals['_PORTACTIONREQUEST']._serialized_start=2264
+  _globals['_PORTACTIONREQUEST']._serialized_end=2315
+  _globals['_PORTACTIONRESPONSE']._serialized_start=2317
+  _globals['_PORTACTIONRESPONSE']._serialized_end=2371
+  _globals['_CONTAINERLOGSREQUEST']._serialized_start=2373
+  _globals['_CONTAINERLOGSREQUEST']._serialized_end=2409
+  _globals['_CONTAINERLOGSRESPONSE']._serialized_start=2411
+  _globals['_CONTAINERLOGSRESPONSE']._serialized_end=2448
+  _globals['_CONTAINERFILESREQUEST']._serialized_start=2450
+  _globals['_CONTAINERFILESREQUEST']._serialized_end=2487
+  _globals['_CONTAINERFILESRESPONSE']._serialized_start=2489
+  _globals['_CONTAINERFILESRESPONSE']._serialized_end=2550
+  _globals['_FILEINFO']._serialized_start=2552
+  _globals['_FILEINFO']._serialized_end=2649
+  _globals['_CONTAINERRESTARTRESPONSE']._serialized_start=2651
+  _globals['_CONTAINERRESTARTRESPONSE']._serialized_end=2711
+  _globals['_ALLBACKENDSSTATSRESPONSE']._serialized_start=2714
+  _globals['_ALLBACKENDSSTATSRESPONSE']._serialized_end=2898
+  _globals['_ALLBACKENDSSTATSRESPONSE_BACKENDSTATSENTRY']._serialized_start=2821
+  _globals['_ALLBACKENDSSTATSRESPONSE_BACKENDSTATSENTRY']._serialized_end=2898
+  _globals['_PEAKEVENT']._serialized_start=2901
+  _globals['_PEAKEVENT']._serialized_end=3187
+  _globals['_PEAKSTREAMREQUEST']._serialized_start=3189
+  _globals['_PEAKSTREAMREQUEST']._serialized_end=3227
+  _globals['_PEAKQUERY']._serialized_start=3229
+  _globals['_PEAKQUERY']._serialized_end=3356
+  _globals['_WILDOSSERVICE']._serialized_start=3519
+  _globals['_WILDOSSERVICE']._serialized_end=4864
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,284 @@
+"""channels and stubs for the panel<->node connection, over grpclib or grpcio"""
+
+import asyncio
+import logging
+import ssl
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any
+
+import grpc
+from grpc.experimental.session_cache import ssl_session_cache_lru
+from grpclib import GRPCError, Status
+from grpclib.client import Channel
+
+from . import service_pb2
+from .service_grpc import WildosServiceStub
+
+logger = logging.getLogger(__name__)
+
+_SERVICE = service_pb2.DESCRIPTOR.services_by_name["WildosService"]
+
+# keep the connection warm between the panel's polling rounds, like grpclib does
+GRPCIO_CHANNEL_OPTIONS = (
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+    ("grpc.max_send_message_length", 64 * 1024 * 1024),
+)
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    A client context offering the TLS session of its previous connection to
+    the next one, so reconnects to a node resume instead of doing a full
+    mTLS handshake. asyncio has no way to pass a session to
+    `create_connection`, but it builds every connection with `wrap_bio`.
+    """
+
+    def __init__(self, protocol=ssl.PROTOCOL_TLS_CLIENT, resume: bool = True):
+        self.resume = resume
+        self._session: ssl.SSLSession | None = None
+        self._last_ssl_object: ssl.SSLObject | None = None
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        previous = self._last_ssl_object
+        # tls 1.3 tickets arrive after the handshake, pick them up lazily
+        if previous is not None and previous.session is not None:
+            self._session = previous.session
+        if session is None and self.resume and not server_side:
+            session = self._session
+        ssl_object = super().wrap_bio(
+            incoming, outgoing, server_side, server_hostname, session
+        )
+        self._last_ssl_object = ssl_object
+        return ssl_object
+
+
+class NodeTransport(ABC):
+    """creates the channels a `ConnectionPool` hands out"""
+
+    name: str
+
+    @abstractmethod
+    def create_channel(self, address: str, port: int) -> tuple[Any, Any]:
+        """a new (channel, stub) pair, the stub has the grpclib stub interface"""
+
+    @abstractmethod
+    async def connect(self, channel) -> bool | None:
+        """
+        wait until the channel is connected, returns whether its TLS session
+        was resumed, None if unknown
+        """
+
+    async def close(self, channel) -> None:
+        result = channel.close()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+class GrpclibTransport(NodeTransport):
+    """pure python HTTP/2 and TLS"""
+
+    name = "grpclib"
+
+    def __init__(self, ssl_context: ssl.SSLContext | None):
+        self._ssl_context = ssl_context
+
+    def create_channel(self, address: str, port: int) -> tuple[Channel, WildosServiceStub]:
+        channel = Channel(address, port, ssl=self._ssl_context)
+        return channel, WildosServiceStub(channel)
+
+    async def connect(self, channel: Channel) -> bool | None:
+        protocol = await channel.__connect__()
+        # this connection's own ssl object, other connects share the context
+        transport = getattr(protocol.connection, "_transport", None)
+        ssl_object = transport.get_extra_info("ssl_object") if transport else None
+        if ssl_object is None:
+            return None
+        return ssl_object.session_reused
+
+
+class GrpcioTransport(NodeTransport):
+    """HTTP/2 framing and TLS done by the grpc C-core"""
+
+    name = "grpcio"
+
+    def __init__(
+        self,
+        root_certificates: bytes | None = None,
+        private_key: bytes | None = None,
+        certificate_chain: bytes | None = None,
+        secure: bool = True,
+        session_resumption: bool = False,
+    ):
+        self._options = GRPCIO_CHANNEL_OPTIONS
+        if session_resumption:
+            # the C-core resumes from this cache, it outlives the channels
+            self._options += (("grpc.ssl_session_cache", ssl_session_cache_lru(4)),)
+        self._credentials = (
+            grpc.ssl_channel_credentials(
+                root_certificates=root_certificates,
+                private_key=private_key,
+                certificate_chain=certificate_chain,
+            )
+            if secure
+            else None
+        )
+
+    def create_channel(self, address: str, port: int) -> tuple[Any, "GrpcioStub"]:
+        target = f"{address}:{port}"
+        if self._credentials is None:
+            channel = grpc.aio.insecure_channel(target, options=self._options)
+        else:
+            channel = grpc.aio.secure_channel(
+                target, self._credentials, options=self._options
+            )
+        return channel, GrpcioStub(channel)
+
+    async def connect(self, channel) -> bool | None:
+        # the C-core doesn't tell whether it resumed
+        await channel.channel_ready()
+        return None
+
+
+def create_transport(
+    name: str,
+    ssl_context: ssl.SSLContext | None,
+    ca_cert_pem: str | None = None,
+    client_cert_pem: str | None = None,
+    client_key_pem: str | None = None,
+) -> NodeTransport:
+    """the transport a node's `connection_backend` selects"""
+    if name == GrpcioTransport.name:
+        return GrpcioTransport(
+            root_certificates=ca_cert_pem.encode() if ca_cert_pem else None,
+            private_key=client_key_pem.encode() if client_key_pem else None,
+            certificate_chain=client_cert_pem.encode() if client_cert_pem else None,
+            secure=ssl_context is not None,
+            session_resumption=getattr(ssl_context, "resume", False),
+        )
+    if name != GrpclibTransport.name:
+        logger.warning("unknown connection backend `%s`, using grpclib", name)
+    return GrpclibTransport(ssl_context)
+
+
+@contextmanager
+def _grpclib_errors():
+    """raise grpcio failures as the GRPCError callers already handle"""
+    try:
+        yield
+    except grpc.aio.AioRpcError as e:
+        raise GRPCError(Status(e.code().value[0]), e.details()) from e
+
+
+class _UnaryMethod:
+    def __init__(self, multicallable):
+        self._multicallable = multicallable
+
+    async def __call__(self, request, *, timeout=None, metadata=None):
+        with _grpclib_errors():
+            return await self._multicallable(request, timeout=timeout, metadata=metadata)
+
+
+class _GrpcioStream:
+    """the part of grpclib's client `Stream` the node client uses"""
+
+    def __init__(self, multicallable, client_streaming: bool, server_streaming: bool, timeout, metadata):
+        self._multicallable = multicallable
+        self._client_streaming = client_streaming
+        self._server_streaming = server_streaming
+        self._timeout = timeout
+        self._metadata = metadata
+        self._call = None
+        self._replied = False
+
+    async def __aenter__(self) -> "_GrpcioStream":
+        if self._client_streaming:
+            self._call = self._multicallable(timeout=self._timeout, metadata=self._metadata)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._call is not None and not self._call.done():
+            self._call.cancel()
+
+    async def send_message(self, message, *, end: bool = False) -> None:
+        if not self._client_streaming:
+            # the request of a unary-request call goes out with the call itself
+            self._call = self._multicallable(message, timeout=self._timeout, metadata=self._metadata)
+            return
+        with _grpclib_errors():
+            await self._call.write(message)
+            if end:
+                await self._call.done_writing()
+
+    async def end(self) -> None:
+        if self._client_streaming:
+            with _grpclib_errors():
+                await self._call.done_writing()
+
+    async def recv_message(self):
+        with _grpclib_errors():
+            if not self._server_streaming:
+                if self._replied:
+                    return None
+                self._replied = True
+                return await self._call
+            message = await self._call.read()
+        return None if message is grpc.aio.EOF else message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.recv_message()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+class _StreamMethod:
+    def __init__(self, multicallable, client_streaming: bool, server_streaming: bool):
+        self._multicallable = multicallable
+        self._client_streaming = client_streaming
+        self._server_streaming = server_streaming
+
+    def open(self, *, timeout=None, metadata=None) -> _GrpcioStream:
+        return _GrpcioStream(
+            self._multicallable,
+            self._client_streaming,
+            self._server_streaming,
+            timeout,
+            metadata,
+        )
+
+
+class GrpcioStub:
+    """
+    a grpcio.aio stub with the call interface of the grpclib `WildosServiceStub`,
+    built from the service descriptor so it always matches service.proto
+    """
+
+    def __init__(self, channel):
+        for method in _SERVICE.methods:
+            path = f"/{_SERVICE.full_name}/{method.name}"
+            request_type = getattr(service_pb2, method.input_type.name)
+            reply_type = getattr(service_pb2, method.output_type.name)
+            kind = {
+                (False, False): channel.unary_unary,
+                (False, True): channel.unary_stream,
+                (True, False): channel.stream_unary,
+                (True, True): channel.stream_stream,
+            }[(method.client_streaming, method.server_streaming)]
+            multicallable = kind(
+                path,
+                request_serializer=request_type.SerializeToString,
+                response_deserializer=reply_type.FromString,
+            )
+            if method.client_streaming or method.server_streaming:
+                attr = _StreamMethod(multicallable, method.client_streaming, method.server_streaming)
+            else:
+                attr = _UnaryMethod(multicallable)
+            setattr(self, method.name, attr)
@@ -37,6 +37,12 @@ from app.middleware import (
     RateLimitingMiddleware, 
     ProxyHeadersMiddleware
 )
+from app.db.batch_writer import peak_events_writer, sub_updates_writer
+from app.tasks.subscription_prewarm import subscription_prewarmer
+from app.utils.subscription_render import render_pool
+from app.wildosnode.fleet_metrics import get_fleet_telemetry
+from app.wildosnode.node_load import get_node_load
+from app.wildosnode.scheduler import get_maintenance_scheduler
 from app.routes.system_health import router as system_health_router
 from app.templates import render_template
 from . import __version__, setup_system_monitoring
@@ -58,8 +64,21 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Initialize system monitoring
     setup_system_monitoring()
     
-    # Start node connections
-    await nodes_startup()
+    # Bring the nodes up in the background, /ready reports the progress
+    nodes_startup_task = asyncio.create_task(nodes_startup())
+    
+    # Poll node telemetry for the dashboard on one schedule
+    get_fleet_telemetry().start()
+
+    # Score node load for load-aware subscription host ordering
+    get_node_load().start()
+
+    # Start batched writers
+    peak_events_writer.start()
+    sub_updates_writer.start()
+
+    # Render subscriptions again ahead of clients after host or settings changes
+    subscription_prewarmer.start()
     
     # Start rate limiting cleanup task  
     try:
@@ -73,7 +92,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     yield
     
     logger.info("Application shutting down")
+    nodes_startup_task.cancel()
+    get_fleet_telemetry().stop()
+    get_node_load().stop()
+    subscription_prewarmer.stop()
+    await get_maintenance_scheduler().stop()
     scheduler.shutdown()
+    await peak_events_writer.stop()
+    await sub_updates_writer.stop()
+    render_pool.shutdown()
 
 
 app = FastAPI(
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Compare the grpclib and grpcio panel<->node transports.
+
+A node service with a synthetic backend is started in a separate process
+for each transport, then the panel side of the connection times
+RepopulateUsers and FetchUsersStats against it. The client CPU time is
+what a panel polling many nodes pays per call.
+
+    python benchmarks/grpc_transport.py --users 10000 --rounds 30 --tls
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [
+    ROOT,
+    os.path.join(ROOT, "wildosnode"),
+    os.path.join(ROOT, "wildosnode", "wildosnode", "service"),
+]
+
+TOKEN = "b" * 43
+TAG = "bench"
+
+
+def _write_certificate(directory: str) -> tuple[str, str]:
+    """a self-signed certificate for `localhost`"""
+    import datetime
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.TraditionalOpenSSL,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+def _run_node(transport: str, port: int, users: int, cert: str | None, key: str | None):
+    from grpclib.server import Server
+
+    from wildosnode.backends.abstract_backend import VPNBackend
+    from wildosnode.models import Inbound
+    from wildosnode.service import WildosService
+    from wildosnode.service.grpcio_server import serve, server_credentials
+    from wildosnode.storage import MemoryStorage
+    from wildosnode.utils.ssl import create_secure_context
+
+    class BenchBackend(VPNBackend):
+        backend_type = "bench"
+        config_format = 1
+        version = "0"
+        running = True
+
+        def contains_tag(self, tag):
+            return tag == TAG
+
+        async def start(self, backend_config=None):
+            pass
+
+        async def restart(self, backend_config):
+            pass
+
+        async def add_user(self, user, inbound):
+            pass
+
+        async def remove_user(self, user, inbound):
+            pass
+
+        def get_logs(self, include_buffer=True, log_filter=None):
+            raise NotImplementedError
+
+        async def get_usages(self, reset=True):
+            return {uid: uid * 1024 for uid in range(1, users + 1)}
+
+        def list_inbounds(self):
+            return []
+
+        def get_config(self):
+            return ""
+
+    async def main():
+        storage = MemoryStorage()
+        storage.register_inbound(Inbound(tag=TAG, protocol="vless", config={}))
+        service = WildosService(storage, {"bench": BenchBackend()})
+        if transport == "grpcio":
+            credentials = server_credentials(cert, key) if cert else None
+            await serve([service], "127.0.0.1", port, credentials)
+        else:
+            ssl_context = create_secure_context(cert, key) if cert else None
+            server = Server([service])
+            await server.start("127.0.0.1", port, ssl=ssl_context)
+            await server.wait_closed()
+
+    asyncio.run(main())
+
+
+async def _measure(transport: str, port: int, users: int, rounds: int, cert: str | None):
+    import ssl
+
+    from app.wildosnode.service_pb2 import Empty, Inbound, User, UserData, UsersData
+    from app.wildosnode.transport import create_transport
+
+    ssl_context = None
+    ca_pem = None
+    if cert:
+        ssl_context = ssl.create_default_context(cafile=cert)
+        ssl_context.set_alpn_protocols(["h2"])
+        with open(cert) as f:
+            ca_pem = f.read()
+    node_transport = create_transport(transport, ssl_context, ca_cert_pem=ca_pem)
+    address = "localhost" if cert else "127.0.0.1"
+    metadata = [("authorization", f"Bearer {TOKEN}")]
+
+    for _ in range(100):
+        channel, stub = node_transport.create_channel(address, port)
+        try:
+            await asyncio.wait_for(node_transport.connect(channel), 1)
+            break
+        except (OSError, asyncio.TimeoutError):
+            await node_transport.close(channel)
+            await asyncio.sleep(0.1)
+    else:
+        raise RuntimeError(f"{transport} node did not come up")
+
+    request = UsersData(
+        users_data=[
+            UserData(
+                user=User(id=uid, username=f"user{uid}", key=f"{uid:032x}"),
+                inbounds=[Inbound(tag=TAG)],
+            )
+            for uid in range(1, users + 1)
+        ]
+    )
+    calls = {
+        "RepopulateUsers": lambda: stub.RepopulateUsers(request, timeout=60, metadata=metadata),
+        "FetchUsersStats": lambda: stub.FetchUsersStats(Empty(), timeout=60, metadata=metadata),
+    }
+    results = {}
+    for name, call in calls.items():
+        await call()  # warm up
+        wall = []
+        cpu = time.process_time()
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await call()
+            wall.append(time.perf_counter() - started)
+        results[name] = (wall, (time.process_time() - cpu) / rounds)
+    await node_transport.close(channel)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--tls", action="store_true")
+    parser.add_argument("--port", type=int, default=62150)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = _write_certificate(directory) if args.tls else (None, None)
+        print(f"{args.users} users, {args.rounds} rounds, TLS: {'on' if args.tls else 'off'}")
+        print(f"{'transport':<10} {'call':<16} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'client cpu ms':>14}")
+        context = multiprocessing.get_context("spawn")
+        for offset, transport in enumerate(("grpclib", "grpcio")):
+            port = args.port + offset
+            node = context.Process(
+                target=_run_node, args=(transport, port, args.users, cert, key), daemon=True
+            )
+            node.start()
+            try:
+                results = asyncio.run(_measure(transport, port, args.users, args.rounds, cert))
+            finally:
+                node.terminate()
+                node.join()
+            for name, (wall, cpu) in results.items():
+                wall.sort()
+                print(
+                    f"{transport:<10} {name:<16} {statistics.mean(wall) * 1000:>9.2f} "
+                    f"{wall[len(wall) // 2] * 1000:>9.2f} {wall[int(len(wall) * 0.95)] * 1000:>9.2f} "
+                    f"{cpu * 1000:>14.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
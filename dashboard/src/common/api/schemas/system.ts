@@ -29,6 +29,7 @@ export const SubscriptionSettingsSchema = z.object({
   support_link: z.string().default('t.me/support'),
   update_interval: z.number().default(12),
   shuffle_configs: z.boolean().default(false),
+  order_hosts_by_load: z.boolean().default(false),
   placeholder_if_disabled: z.boolean().default(true),
   placeholder_remark: z.string().default('disabled'),
   rules: z.array(SubscriptionRuleSchema).default([]),
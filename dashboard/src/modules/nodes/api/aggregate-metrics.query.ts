@@ -1,4 +1,4 @@
-import { useQueries } from "@tanstack/react-query";
+import { useQueries, useQuery } from "@tanstack/react-query";
 import { fetch } from "@wildosvpn/common/utils";
 import { useApiErrorHandler, QUERY_INTERVALS } from "@wildosvpn/common/hooks";
 import type { NodeType } from "@wildosvpn/modules/nodes";
@@ -46,28 +46,44 @@ export const useAllNodesQuery = () => {
     });
 };
 
+export interface FleetNodeMetrics {
+    node_id: number;
+    updated_at: number | null;
+    stale: boolean;
+    error: string | null;
+    host: HostSystemMetrics | null;
+}
+
+export interface FleetMetrics {
+    nodes: FleetNodeMetrics[];
+    timestamp: string;
+}
+
+// Host metrics of all nodes in one request, served from the panel's cache
+export const useFleetMetricsQuery = () => {
+    const { handleError } = useApiErrorHandler({ showToast: false });
+
+    return useQuery({
+        queryKey: ["nodes", "metrics"],
+        queryFn: async (): Promise<FleetMetrics | null> => {
+            try {
+                return await fetch(`/nodes/metrics`);
+            } catch (error) {
+                handleError(error, "Fleet host metrics");
+                return null;
+            }
+        },
+        refetchInterval: QUERY_INTERVALS.FREQUENT, // 15 seconds
+        initialData: null,
+    });
+};
+
 // Aggregate Host System Metrics across all nodes
 export const useAggregateHostSystemMetricsQuery = () => {
     const { data: nodesData } = useAllNodesQuery();
     const nodes = nodesData?.entities || [];
-    const { handleError } = useApiErrorHandler({ showToast: false });
-    
-    // Fetch host metrics for all nodes
-    const hostMetricsQueries = useQueries({
-        queries: nodes.map((node: NodeType) => ({
-            queryKey: ["nodes", node.id, "host", "metrics"],
-            queryFn: async (): Promise<HostSystemMetrics | null> => {
-                try {
-                    return await fetch(`/nodes/${node.id}/host/metrics`);
-                } catch (error) {
-                    handleError(error, `Host metrics for node ${node.name || node.id}`);
-                    return null;
-                }
-            },
-            refetchInterval: QUERY_INTERVALS.FREQUENT, // 15 seconds
-            initialData: null,
-        })),
-    });
+    const fleetQuery = useFleetMetricsQuery();
+    const hostMetrics = (fleetQuery.data?.nodes || []).map(node => node.host);
 
     const aggregateData: AggregateHostSystemMetrics = {
         totalNodes: nodes.length,
@@ -81,9 +97,8 @@ export const useAggregateHostSystemMetricsQuery = () => {
         healthyNodes: 0,
     };
 
-    if (hostMetricsQueries.length > 0) {
-        const validMetrics = hostMetricsQueries
-            .map(query => query.data)
+    if (hostMetrics.length > 0) {
+        const validMetrics = hostMetrics
             .filter((data): data is HostSystemMetrics => data !== null);
 
         if (validMetrics.length > 0) {
@@ -136,8 +151,8 @@ export const useAggregateHostSystemMetricsQuery = () => {
 
     return {
         data: aggregateData,
-        isLoading: hostMetricsQueries.some(query => query.isLoading),
-        error: hostMetricsQueries.find(query => query.error)?.error || null
+        isLoading: fleetQuery.isLoading,
+        error: fleetQuery.error || null
     };
 };
 
@@ -24,7 +24,7 @@ const NodeTypeSchema = z.object({
     port: z.number(),
     status: z.enum(["healthy", "unhealthy", "none", "disabled"]),
     usage_coefficient: z.number().default(1.0),
-    connection_backend: z.enum(["grpclib"]).default("grpclib"),
+    connection_backend: z.enum(["grpclib", "grpcio"]).default("grpclib"),
     backends: z.array(NodeBackendSchema).default([]),
     xray_version: z.string().optional(),
     last_status_change: z.string().optional(),
@@ -134,6 +134,7 @@ export const MutationDialog: React.FC<MutationDialogProps<NodeType>> = ({
                                             </FormControl>
                                             <SelectContent>
                                                 <SelectItem value="grpclib">grpclib</SelectItem>
+                                                <SelectItem value="grpcio">grpcio</SelectItem>
                                             </SelectContent>
                                         </Select>
                                         <FormDescription>
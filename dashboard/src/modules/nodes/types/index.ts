@@ -39,7 +39,7 @@ export const NodeSchema = z.object({
         .number()
         .default(1.0)
         .or(z.string().transform((v) => Number.parseFloat(v))),
-    connection_backend: z.enum(["grpclib"]).default("grpclib"),
+    connection_backend: z.enum(["grpclib", "grpcio"]).default("grpclib"),
 });
 
 export type NodeBackendType = {
@@ -93,6 +93,10 @@ export function SubscriptionRulesForm() {
                         name="shuffle_configs"
                         label={t("page.settings.subscription-settings.shuffle-configs")}
                     />
+                    <CheckboxField
+                        name="order_hosts_by_load"
+                        label={t("page.settings.subscription-settings.order-hosts-by-load")}
+                    />
                 </div>
                 <Separator className="my-4 sm:my-6" />
                 <div className="space-y-2 sm:space-y-3">
@@ -10,6 +10,7 @@ export const schema = z.object({
     ),
     // url_prefix: z.string().default(""),
     shuffle_configs: z.boolean(),
+    order_hosts_by_load: z.boolean().default(false),
     placeholder_if_disabled: z.boolean(),
     placeholder_remark: z.string(),
     template_on_acceptance: z.boolean().default(false),
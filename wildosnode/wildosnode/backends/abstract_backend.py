@@ -1,15 +1,17 @@
 """What a vpn server should do"""
 
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator
 from typing import Any
 
+from wildosnode.backends.log_broker import LogFilter, LogSubscription
 from wildosnode.models import User, Inbound
 
 
 class VPNBackend(ABC):
     backend_type: str
     config_format: int
+    # mode, duration and refused connection window of the last full restart
+    last_restart: dict | None = None
 
     @property
     @abstractmethod
@@ -42,7 +44,9 @@ class VPNBackend(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_logs(self, include_buffer: bool) -> AsyncIterator:
+    def get_logs(
+        self, include_buffer: bool, log_filter: LogFilter | None = None
+    ) -> LogSubscription:
         raise NotImplementedError
 
     @abstractmethod
@@ -0,0 +1,160 @@
+"""track the source IPs users connect from by parsing backend access logs"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from zlib import crc32
+
+from wildosnode.backends.log_broker import LogBroker
+from wildosnode.config import (
+    ACCESS_LOG_BATCH_LINES,
+    ACCESS_LOG_QUEUE_SIZE,
+    ONLINE_IPS_MAX_PER_USER,
+    ONLINE_IPS_MAX_USERS,
+    ONLINE_IPS_WINDOW,
+)
+from wildosnode.utils.usage import identifier_uid
+
+logger = logging.getLogger(__name__)
+
+AccessParser = Callable[[str], Optional[tuple[int, str]]]
+
+# 2024/01/01 00:00:00 from tcp:1.2.3.4:5678 accepted tcp:example.com:443 [in >> out] email: 12.alice
+_xray_access_re = re.compile(
+    r" from (?:tcp:|udp:)?\[?([0-9A-Fa-f.:]+?)\]?:\d+ accepted .* email: (\d+\.\S*)"
+)
+# INFO [3318441234 0ms] inbound/vless[in]: inbound connection from 1.2.3.4:5678
+_singbox_from_re = re.compile(
+    r"\[(\d+) [^\]]*\] inbound/[^:]+: inbound (?:packet )?connection from \[?([0-9A-Fa-f.:]+?)\]?:\d+"
+)
+# INFO [3318441234 0ms] inbound/vless[in]: [12.alice] inbound connection to example.com:443
+_singbox_user_re = re.compile(
+    r"\[(\d+) [^\]]*\] inbound/[^:]+: \[(\d+\.[^\]]*)\] inbound (?:packet )?connection to "
+)
+
+
+def parse_xray_access(line: str) -> tuple[int, str] | None:
+    """(uid, source ip) of an xray access log line"""
+    if "email: " not in line:
+        return None
+    match = _xray_access_re.search(line)
+    if match is None:
+        return None
+    return identifier_uid(match.group(2)), match.group(1)
+
+
+class SingBoxAccessParser:
+    """
+    sing-box logs the source address and the user of a connection on
+    separate lines, they are joined by the connection id
+    """
+
+    def __init__(self, max_pending: int = 4096):
+        self._max_pending = max_pending
+        self._sources: OrderedDict[str, str] = OrderedDict()
+
+    def __call__(self, line: str) -> tuple[int, str] | None:
+        if "inbound" not in line:
+            return None
+        if (match := _singbox_from_re.search(line)) is not None:
+            self._sources[match.group(1)] = match.group(2)
+            if len(self._sources) > self._max_pending:
+                self._sources.popitem(last=False)
+            return None
+        if (match := _singbox_user_re.search(line)) is not None:
+            ip = self._sources.pop(match.group(1), None)
+            if ip is not None:
+                return identifier_uid(match.group(2)), ip
+        return None
+
+
+class OnlineIPTracker:
+    """
+    a sliding window of the source IPs seen per user.
+    IPs are kept as 32-bit fingerprints, at most `max_per_user` per user
+    (the most recent ones), and the least recently active users are evicted
+    past `max_users`, so memory stays bounded whatever the log rate is.
+    Fingerprints are stable across nodes, so the panel can count distinct
+    IPs of a user over all of them.
+    """
+
+    def __init__(
+        self,
+        window: float = ONLINE_IPS_WINDOW,
+        max_users: int = ONLINE_IPS_MAX_USERS,
+        max_per_user: int = ONLINE_IPS_MAX_PER_USER,
+    ):
+        self.window = window
+        self.max_users = max_users
+        self.max_per_user = max_per_user
+        self.parsed_lines = 0
+        self._users: OrderedDict[int, dict[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def ingest(self, lines: list[str], parser: AccessParser) -> None:
+        """parse a batch of log lines, meant to be run off the event loop"""
+        hits = [hit for line in lines if (hit := parser(line)) is not None]
+        now = time.monotonic()
+        with self._lock:
+            self.parsed_lines += len(lines)
+            for uid, ip in hits:
+                ips = self._users.get(uid)
+                if ips is None:
+                    ips = self._users[uid] = {}
+                    if len(self._users) > self.max_users:
+                        self._users.popitem(last=False)
+                else:
+                    self._users.move_to_end(uid)
+                fingerprint = crc32(ip.encode())
+                # keep the dict ordered from the least to the most recently seen ip
+                ips.pop(fingerprint, None)
+                ips[fingerprint] = now
+                if len(ips) > self.max_per_user:
+                    del ips[next(iter(ips))]
+
+    def snapshot(self) -> list[tuple[int, list[int]]]:
+        """(uid, ip fingerprints) of the users seen within the window"""
+        deadline = time.monotonic() - self.window
+        result = []
+        with self._lock:
+            for uid in list(self._users):
+                ips = self._users[uid]
+                while ips and next(iter(ips.values())) < deadline:
+                    del ips[next(iter(ips))]
+                if not ips:
+                    del self._users[uid]
+                    continue
+                result.append((uid, list(ips)))
+        return result
+
+    async def _consume(self, broker: LogBroker, parser: AccessParser) -> None:
+        subscription = broker.subscribe(
+            include_buffer=False,
+            max_size=ACCESS_LOG_QUEUE_SIZE,
+            max_lines=ACCESS_LOG_BATCH_LINES,
+        )
+        with subscription:
+            async for lines in subscription:
+                await asyncio.to_thread(self.ingest, lines, parser)
+
+    def attach(self, broker: LogBroker, parser: AccessParser) -> None:
+        """start feeding the access logs published to a broker into the tracker"""
+        task = self._tasks.get(id(broker))
+        if task is not None and not task.done():
+            return
+        self._tasks[id(broker)] = asyncio.create_task(self._consume(broker, parser))
+
+
+_tracker: OnlineIPTracker | None = None
+
+
+def get_online_ip_tracker() -> OnlineIPTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = OnlineIPTracker()
+    return _tracker
@@ -1,19 +1,26 @@
 import asyncio
 import json
 import logging
+import time
 from secrets import token_hex
-from typing import AsyncIterator
 
 import aiohttp
 from aiohttp import web, ClientConnectorError
 
 from wildosnode.backends.abstract_backend import VPNBackend
+from wildosnode.backends.log_broker import LogFilter, LogSubscription
 from wildosnode.backends.hysteria2._config import HysteriaConfig
 from wildosnode.backends.hysteria2._runner import Hysteria
+from wildosnode.config import (
+    BACKEND_STATS_TIMEOUT,
+    HYSTERIA_KICK_INTERVAL,
+    HYSTERIA_STATS_CONNECTIONS,
+)
 from wildosnode.models import User, Inbound
 from wildosnode.storage import BaseStorage
 from wildosnode.utils.key_gen import generate_password
 from wildosnode.utils.network import find_free_port
+from wildosnode.utils.usage import identifier_uid
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +42,11 @@ class HysteriaBackend(VPNBackend):
         self._stats_port = None
         self._config_path = config_path
         self._restart_lock = asyncio.Lock()
+        self._session = None
+        self._pending_kicks = set()
+        self._kick_event = asyncio.Event()
+        self._kick_task: asyncio.Task | None = None
+        self.startup_timings: dict[str, float] = {}
 
     @property
     def running(self) -> bool:
@@ -58,7 +70,49 @@ class HysteriaBackend(VPNBackend):
         with open(self._config_path, "w") as f:
             f.write(config)
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """returns the keep-alive session used for the traffic stats api"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=HYSTERIA_STATS_CONNECTIONS),
+                timeout=aiohttp.ClientTimeout(total=BACKEND_STATS_TIMEOUT),
+            )
+        return self._session
+
+    def _stats_url(self, path: str) -> str:
+        return "http://127.0.0.1:" + str(self._stats_port) + path
+
+    async def _kick_handler(self):
+        while True:
+            await self._kick_event.wait()
+            await asyncio.sleep(HYSTERIA_KICK_INTERVAL)
+            self._kick_event.clear()
+            identifiers, self._pending_kicks = self._pending_kicks, set()
+            if not identifiers or not self.running:
+                continue
+            logger.debug("kicking %i hysteria2 users", len(identifiers))
+            headers = {"Authorization": self._stats_secret}
+            try:
+                async with self._get_session().post(
+                    self._stats_url("/kick"),
+                    data=json.dumps(list(identifiers)),
+                    headers=headers,
+                ) as response:
+                    if response.ok:
+                        continue
+                    error = f"status {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            logger.warning(
+                "failed to kick %i hysteria2 users, retrying: %s", len(identifiers), error
+            )
+            # users added back in the meantime stay connected
+            active = {str(u.id) + "." + u.username for u in self._users.values()}
+            self._pending_kicks |= identifiers - active
+            self._kick_event.set()
+
     async def start(self, config: str | None = None) -> None:
+        started = time.perf_counter()
         if config is None:
             with open(self._config_path) as f:
                 config = f.read()
@@ -80,12 +134,36 @@ class HysteriaBackend(VPNBackend):
         cfg = HysteriaConfig(config, api_port, self._stats_port, self._stats_secret)
         cfg.register_inbounds(self._storage)
         self._inbounds = [cfg.get_inbound()]
+        config_ready = time.perf_counter()
         await self._runner.start(cfg.render())
+        if self._kick_task is None or self._kick_task.done():
+            self._kick_task = asyncio.create_task(self._kick_handler())
+        self.startup_timings = {
+            "config": config_ready - started,
+            "process": time.perf_counter() - config_ready,
+        }
+        logger.info(
+            "hysteria2 started in %.3fs (config %.3fs, process %.3fs)",
+            sum(self.startup_timings.values()),
+            self.startup_timings["config"],
+            self.startup_timings["process"],
+        )
 
     async def stop(self):
+        if self._kick_task is not None:
+            self._kick_task.cancel()
+            try:
+                await self._kick_task
+            except asyncio.CancelledError:
+                pass
+            self._kick_task = None
+        self._pending_kicks.clear()
         await self._auth_site.stop()
         self._storage.remove_inbound("hysteria2")
         self._runner.stop()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def restart(self, backend_config: str | None) -> None:
         await self._restart_lock.acquire()
@@ -103,37 +181,26 @@ class HysteriaBackend(VPNBackend):
         if not self._users.get(password := generate_password(user.key)):
             return
         self._users.pop(password)
-        url = "http://127.0.0.1:" + str(self._stats_port) + "/kick"
-        headers = {"Authorization": self._stats_secret}
-
-        payload = json.dumps([str(user.id) + "." + user.username])
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=payload, headers=headers):
-                pass
+        self._pending_kicks.add(str(user.id) + "." + user.username)
+        self._kick_event.set()
 
-    async def get_logs(self, include_buffer: bool) -> AsyncIterator:
-        if include_buffer:
-            buffer = self._runner.get_buffer()
-            for line in buffer:
-                yield line
-        log_stm = self._runner.get_logs_stm()
-        async with log_stm:
-            async for line in log_stm:
-                yield line
+    def get_logs(
+        self, include_buffer: bool = True, log_filter: LogFilter | None = None
+    ) -> LogSubscription:
+        return self._runner.log_broker.subscribe(include_buffer, log_filter)
 
     async def get_usages(self):
-        url = "http://127.0.0.1:" + str(self._stats_port) + "/traffic?clear=1"
+        url = self._stats_url("/traffic?clear=1")
         headers = {"Authorization": self._stats_secret}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    data = await response.json()
+            async with self._get_session().get(url, headers=headers) as response:
+                data = await response.json()
         except ClientConnectorError:
             data = {}
         usages = {}
         for user_identifier, usage in data.items():
-            uid = int(user_identifier.split(".")[0])
+            uid = identifier_uid(user_identifier)
             usages[uid] = usage["tx"] + usage["rx"]
         return usages
 
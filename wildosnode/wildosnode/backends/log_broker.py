@@ -0,0 +1,214 @@
+"""fan out captured backend logs to filtered, batched subscribers"""
+
+import asyncio
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from wildosnode.config import (
+    LOG_BROKER_RING_SIZE,
+    LOG_SUBSCRIBER_QUEUE_SIZE,
+    LOG_DROP_POLICY,
+    LOG_BATCH_MAX_LINES,
+    LOG_BATCH_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+LEVELS = {
+    "trace": 0,
+    "debug": 0,
+    "info": 1,
+    "warn": 2,
+    "warning": 2,
+    "error": 3,
+    "fatal": 3,
+    "panic": 3,
+}
+
+# xray writes `[Warning]`, sing-box and hysteria write `WARN`
+_level_re = re.compile(
+    r"\[(Debug|Info|Warning|Error)\]|\b(TRACE|DEBUG|INFO|WARN|ERROR|FATAL|PANIC)\b"
+)
+
+
+def line_level(line: str) -> int:
+    """
+    the severity rank of a log line, lines without a level
+    (such as xray access logs) count as info
+    """
+    match = _level_re.search(line)
+    if match is None:
+        return LEVELS["info"]
+    return LEVELS[(match.group(1) or match.group(2)).lower()]
+
+
+@dataclass(frozen=True)
+class LogFilter:
+    """
+    filters lines by minimum level, a regex and/or a user identifier;
+    equal filters are evaluated once per line for all of their subscribers
+    """
+
+    level: Optional[str] = None
+    pattern: Optional[str] = None
+    user: Optional[str] = None
+    _min_level: int = field(default=0, init=False, compare=False, repr=False)
+    _regexes: tuple = field(default=(), init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.level is not None:
+            if self.level.lower() not in LEVELS:
+                raise ValueError(f"unknown log level `{self.level}`")
+            object.__setattr__(self, "_min_level", LEVELS[self.level.lower()])
+        regexes = []
+        if self.pattern:
+            regexes.append(re.compile(self.pattern))
+        if self.user:
+            regexes.append(re.compile(rf"(?<![\w.]){re.escape(self.user)}(?![\w.])"))
+        object.__setattr__(self, "_regexes", tuple(regexes))
+
+    @property
+    def is_empty(self) -> bool:
+        return self.level is None and not self._regexes
+
+    def matches(self, line: str, level: int) -> bool:
+        if level < self._min_level:
+            return False
+        return all(regex.search(line) for regex in self._regexes)
+
+
+class LogSubscription:
+    """
+    a bounded queue of lines for one consumer, iterated in batches of up to
+    `max_lines` lines gathered for at most `interval` seconds;
+    use it as a context manager so it's detached from the broker when done
+    """
+
+    def __init__(
+        self,
+        broker: "LogBroker",
+        log_filter: LogFilter,
+        max_size: int = LOG_SUBSCRIBER_QUEUE_SIZE,
+        drop_policy: str = LOG_DROP_POLICY,
+        max_lines: int = LOG_BATCH_MAX_LINES,
+        interval: float = LOG_BATCH_INTERVAL,
+    ):
+        self.log_filter = log_filter
+        self.max_lines = max_lines
+        self.interval = interval
+        self.dropped = 0
+        self._broker = broker
+        self._max_size = max_size
+        self._drop_oldest = drop_policy != DROP_NEWEST
+        self._lines: deque[str] = deque()
+        self._event = asyncio.Event()
+        self._closed = False
+
+    def push(self, line: str) -> None:
+        if len(self._lines) >= self._max_size:
+            self.dropped += 1
+            self._broker.dropped += 1
+            if not self._drop_oldest:
+                return
+            self._lines.popleft()
+        self._lines.append(line)
+        self._event.set()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._broker.unsubscribe(self)
+        self._event.set()
+
+    def __enter__(self) -> "LogSubscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __aiter__(self) -> "LogSubscription":
+        return self
+
+    async def __anext__(self) -> list[str]:
+        while not self._lines:
+            if self._closed:
+                raise StopAsyncIteration
+            self._event.clear()
+            await self._event.wait()
+        if len(self._lines) < self.max_lines and self.interval > 0:
+            # let a burst accumulate into one batch
+            await asyncio.sleep(self.interval)
+        count = min(self.max_lines, len(self._lines))
+        return [self._lines.popleft() for _ in range(count)]
+
+
+class LogBroker:
+    """
+    keeps the last `ring_size` lines of a backend and fans new ones out to
+    subscribers; publishing never blocks on a slow subscriber, its lines
+    are dropped according to the drop policy instead
+    """
+
+    def __init__(self, ring_size: int = LOG_BROKER_RING_SIZE):
+        self._ring: deque[str] = deque(maxlen=ring_size)
+        self._groups: dict[LogFilter, set[LogSubscription]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(group) for group in self._groups.values())
+
+    def publish(self, line: bytes) -> None:
+        if not line:
+            return
+        text = line.decode(errors="replace")
+        self._ring.append(text)
+        self.published += 1
+        level = None
+        for log_filter, group in self._groups.items():
+            if not log_filter.is_empty:
+                if level is None:
+                    level = line_level(text)
+                if not log_filter.matches(text, level):
+                    continue
+            for subscription in group:
+                subscription.push(text)
+
+    def subscribe(
+        self,
+        include_buffer: bool = True,
+        log_filter: LogFilter | None = None,
+        **kwargs,
+    ) -> LogSubscription:
+        """
+        :param kwargs: overrides of the queue size, drop policy and
+            batching settings passed to `LogSubscription`
+        """
+        log_filter = log_filter or LogFilter()
+        subscription = LogSubscription(self, log_filter, **kwargs)
+        if include_buffer:
+            for text in self._ring:
+                if log_filter.is_empty or log_filter.matches(text, line_level(text)):
+                    subscription.push(text)
+        self._groups.setdefault(log_filter, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        group = self._groups.get(subscription.log_filter)
+        if group is None:
+            return
+        group.discard(subscription)
+        if not group:
+            del self._groups[subscription.log_filter]
+
+    def get_buffer(self) -> list[str]:
+        """a copy of the ring, it's never cleared in case logs from a crash are useful"""
+        return list(self._ring)
@@ -1,12 +1,11 @@
 import json
 
-import commentjson
-
 from wildosnode.backends.singbox._accounts import accounts_map
 from wildosnode.backends.xray._utils import get_x25519
 from wildosnode.config import XRAY_EXECUTABLE_PATH
 from wildosnode.models import User, Inbound
 from wildosnode.storage import BaseStorage
+from wildosnode.utils import config_json
 
 
 class SingBoxConfig(dict):
@@ -18,11 +17,11 @@ class SingBoxConfig(dict):
     ):
         try:
             # considering string as json
-            config = commentjson.loads(config)
+            config = config_json.loads(config)
         except (json.JSONDecodeError, ValueError):
             # considering string as file path
             with open(config) as file:
-                config = commentjson.loads(file.read())
+                config = config_json.loads(file.read())
 
         self.api_host = api_host
         self.api_port = api_port
@@ -4,12 +4,9 @@ import asyncio
 import atexit
 import logging
 import signal
-from collections import deque
-
-from anyio import create_memory_object_stream, ClosedResourceError, BrokenResourceError
-from anyio.streams.memory import MemoryObjectReceiveStream
 
 from ._utils import get_version
+from ..log_broker import LogBroker
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +21,7 @@ class SingBoxRunner:
         self._process = None
         self.restarting = False
 
-        self._snd_streams = []
-        self._logs_buffer = deque(maxlen=100)
+        self.log_broker = LogBroker()
         self.stop_event = asyncio.Event()
 
         self._logs_task = None
@@ -75,22 +71,13 @@ class SingBoxRunner:
             pass
 
     async def __capture_process_logs(self):
-        """capture the logs, push it into the stream, and store it in the deck
-        note that the stream blocks sending if it's full, so a deck is necessary"""
+        """capture the logs and publish them to the broker which keeps
+        the ring buffer and never blocks on slow subscribers"""
 
         async def capture_stream(stream):
             while True:
                 output = await stream.readline()
-                for stm in self._snd_streams:
-                    try:
-                        await stm.send(output)
-                    except (ClosedResourceError, BrokenResourceError):
-                        try:
-                            self._snd_streams.remove(stm)
-                        except ValueError:
-                            pass
-                        continue
-                self._logs_buffer.append(output)
+                self.log_broker.publish(output)
                 if output == b"":
                     """break in case of eof"""
                     return
@@ -102,16 +89,6 @@ class SingBoxRunner:
         self.stop_event.set()
         self.stop_event.clear()
 
-    def get_logs_stm(self) -> MemoryObjectReceiveStream:
-        new_snd_stm, new_rcv_stm = create_memory_object_stream()
-        self._snd_streams.append(new_snd_stm)
-        return new_rcv_stm
-
-    def get_buffer(self):
-        """makes a copy of the buffer, so it could be read multiple times
-        the buffer is never cleared in case logs from xray's exit are useful"""
-        return self._logs_buffer.copy()
-
     @property
     def running(self):
         return self._process and self._process.returncode is None
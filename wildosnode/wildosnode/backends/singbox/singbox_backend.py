@@ -3,9 +3,12 @@
 import asyncio
 import json
 import logging
+import time
 from collections import defaultdict
 
+from wildosnode.backends.access_log import get_online_ip_tracker, SingBoxAccessParser
 from wildosnode.backends.abstract_backend import VPNBackend
+from wildosnode.backends.log_broker import LogFilter, LogSubscription
 from wildosnode.backends.singbox._config import SingBoxConfig
 from wildosnode.backends.singbox._runner import SingBoxRunner
 from wildosnode.backends.singbox._stats import SingBoxAPI
@@ -17,6 +20,7 @@ from wildosnode.config import (
 from wildosnode.models import User, Inbound
 from wildosnode.storage import BaseStorage
 from wildosnode.utils.network import find_free_port
+from wildosnode.utils.usage import identifier_uid
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +46,7 @@ class SingBoxBackend(VPNBackend):
         self._full_config_path = self._config_path + ".full"
         self._restart_lock = asyncio.Lock()
         self._config_modification_lock = asyncio.Lock()
+        self.startup_timings: dict[str, float] = {}
         asyncio.create_task(self._restart_on_failure())
         asyncio.create_task(self._user_update_handler())
 
@@ -97,20 +102,36 @@ class SingBoxBackend(VPNBackend):
                     await self.start()
 
     async def start(self, backend_config: str | None = None):
+        started = time.perf_counter()
         if backend_config is None:
             with open(self._config_path) as f:
                 backend_config = f.read()
         else:
             self._save_config(json.dumps(json.loads(backend_config), indent=2))
         api_port = find_free_port()
-        self._config = SingBoxConfig(backend_config, api_port=api_port)
+        # parsing and deriving reality keys may spawn xray, keep it off the loop
+        self._config = await asyncio.to_thread(
+            SingBoxConfig, backend_config, api_port=api_port
+        )
         self._config.register_inbounds(self._storage)
         self._inbound_tags = {i["tag"] for i in self._config.inbounds}
         self._inbounds = list(self._config.list_inbounds())
         await self.add_storage_users()
         self._save_config(self._config.to_json(), full=True)
+        config_ready = time.perf_counter()
         self._api = SingBoxAPI("127.0.0.1", api_port)
+        get_online_ip_tracker().attach(self._runner.log_broker, SingBoxAccessParser())
         await self._runner.start(self._full_config_path)
+        self.startup_timings = {
+            "config": config_ready - started,
+            "process": time.perf_counter() - config_ready,
+        }
+        logger.info(
+            "sing-box started in %.3fs (config %.3fs, process %.3fs)",
+            sum(self.startup_timings.values()),
+            self.startup_timings["config"],
+            self.startup_timings["process"],
+        )
 
     async def stop(self):
         await self._runner.stop()
@@ -138,23 +159,17 @@ class SingBoxBackend(VPNBackend):
 
     async def get_usages(self, reset: bool = True) -> dict[int, int]:
         try:
-            api_stats = await asyncio.wait_for(
-                self._api.get_users_stats(reset=reset), 3
-            )
+            api_stats = await self._api.get_users_stats(reset=reset)
         except OSError:
             api_stats = []
         stats = defaultdict(int)
         for stat in api_stats:
-            uid = int(stat.name.split(".")[0])
+            uid = identifier_uid(stat.name)
             stats[uid] += stat.value
 
         return stats
 
-    async def get_logs(self, include_buffer: bool = True):
-        if include_buffer:
-            for line in self._runner.get_buffer():
-                yield line
-        log_stm = self._runner.get_logs_stm()
-        async with log_stm:
-            async for line in log_stm:
-                yield line
+    def get_logs(
+        self, include_buffer: bool = True, log_filter: LogFilter | None = None
+    ) -> LogSubscription:
+        return self._runner.log_broker.subscribe(include_buffer, log_filter)
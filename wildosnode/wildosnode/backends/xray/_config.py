@@ -1,10 +1,9 @@
 import json
 from collections import defaultdict
 
-import commentjson
-
 from wildosnode.config import XRAY_EXECUTABLE_PATH, XRAY_VLESS_REALITY_FLOW, DEBUG
 from ._utils import get_x25519
+from ...utils import config_json
 from ...models import Inbound
 from ...storage import BaseStorage
 
@@ -55,11 +54,11 @@ class XrayConfig(dict):
     ):
         try:
             # considering string as json
-            config = commentjson.loads(config)
+            config = config_json.loads(config)
         except (json.JSONDecodeError, ValueError):
             # considering string as file path
             with open(config) as file:
-                config = commentjson.loads(file.read())
+                config = config_json.loads(file.read())
 
         self.api_host = api_host
         self.api_port = api_port
@@ -195,6 +194,14 @@ class XrayConfig(dict):
             self.inbounds.append(settings)
             self.inbounds_by_tag[inbound["tag"]] = settings
 
+    def add_clients(self, tag: str, clients: list[dict]) -> None:
+        """writes users into an inbound so xray starts with them"""
+        for inbound in self["inbounds"]:
+            if inbound.get("tag") == tag:
+                settings = inbound.setdefault("settings", {})
+                settings.setdefault("clients", []).extend(clients)
+                return
+
     def register_inbounds(self, storage: BaseStorage):
         for inbound in self.list_inbounds():
             storage.register_inbound(inbound)
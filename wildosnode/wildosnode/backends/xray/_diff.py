@@ -0,0 +1,49 @@
+"""compare xray configs to find changes that can be applied to a running xray"""
+
+from dataclasses import dataclass, field
+
+from ._config import XrayConfig
+
+
+@dataclass
+class XrayConfigDiff:
+    added: list[dict] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[dict] = field(default_factory=list)
+    # set when something outside of tagged inbounds changed
+    restart_reason: str | None = None
+
+    @property
+    def requires_restart(self) -> bool:
+        return self.restart_reason is not None
+
+
+def diff_configs(old: XrayConfig, new: XrayConfig) -> XrayConfigDiff:
+    """
+    finds the inbounds added, removed and changed between two configs.
+    anything else (routing, outbounds, dns, ...) can't be changed through
+    the api, so such changes are reported as requiring a restart
+    """
+    diff = XrayConfigDiff()
+    for key in old.keys() | new.keys():
+        if key != "inbounds" and old.get(key) != new.get(key):
+            diff.restart_reason = f"`{key}` changed"
+            return diff
+
+    old_inbounds = old.get("inbounds", [])
+    new_inbounds = new.get("inbounds", [])
+    if [i for i in old_inbounds if not i.get("tag")] != [
+        i for i in new_inbounds if not i.get("tag")
+    ]:
+        diff.restart_reason = "an inbound without a tag changed"
+        return diff
+
+    old_by_tag = {i["tag"]: i for i in old_inbounds if i.get("tag")}
+    new_by_tag = {i["tag"]: i for i in new_inbounds if i.get("tag")}
+    diff.removed = [tag for tag in old_by_tag if tag not in new_by_tag]
+    for tag, inbound in new_by_tag.items():
+        if tag not in old_by_tag:
+            diff.added.append(inbound)
+        elif old_by_tag[tag] != inbound:
+            diff.changed.append(inbound)
+    return diff
@@ -1,32 +1,46 @@
 """run xray and capture the logs"""
 
 import asyncio
+import json
 import logging
-import re
-from collections import deque
-
-from anyio import create_memory_object_stream, ClosedResourceError, BrokenResourceError
-from anyio.streams.memory import MemoryObjectReceiveStream
+import tempfile
 
 from ._config import XrayConfig
 from ._utils import get_version
+from ..log_broker import LogBroker, LogFilter
+from ...config import XRAY_BLUE_GREEN_RESTART
 
 logger = logging.getLogger(__name__)
 
+# SOL_SOCKET / SO_REUSEPORT on linux
+_REUSEPORT_SOCKOPT = {
+    "system": "linux",
+    "type": "int",
+    "level": "1",
+    "opt": "15",
+    "value": "1",
+}
+
 
 class XrayCore:
     """runs and captures xray logs"""
 
-    def __init__(self, executable_path: str, assets_path: str):
+    def __init__(
+        self,
+        executable_path: str,
+        assets_path: str,
+        log_broker: LogBroker | None = None,
+        version: str | None = None,
+    ):
         self.executable_path = executable_path
         self.assets_path = assets_path
 
-        self.version = get_version(executable_path)
+        self.version = version or get_version(executable_path)
         self._process = None
         self.restarting = False
 
-        self._snd_streams = []
-        self._logs_buffer = deque(maxlen=100)
+        # a blue/green restart hands the broker over so log viewers stay attached
+        self.log_broker = log_broker or LogBroker()
         self._env = {"XRAY_LOCATION_ASSET": assets_path}
         self.stop_event = asyncio.Event()
 
@@ -36,8 +50,7 @@ class XrayCore:
         if self.running is True:
             raise RuntimeError("Xray is started already")
 
-        if config.get("log", {}).get("loglevel") in ("none", "error"):
-            config["log"]["loglevel"] = "warning"
+        self.prepare_config(config)
 
         cmd = [self.executable_path, "run", "-config", "stdin:"]
         self._process = await asyncio.create_subprocess_shell(
@@ -53,21 +66,38 @@ class XrayCore:
         await self._process.stdin.wait_closed()
         logger.info("Xray core %s started", self.version)
 
-        logs_stm = self.get_logs_stm()
-        asyncio.create_task(self.__capture_process_logs())
-
-        async def reach_startup_result(stream):
-            async for line in stream:
-                if line == b"" or re.match(
-                    r".*\[Warning] core: Xray \d+\.\d+\.\d+ started", line.decode()
-                ):  # either start or die
-                    logs_stm.close()
-                    return
-
-        try:
-            await asyncio.wait_for(reach_startup_result(logs_stm), timeout=4)
-        except asyncio.TimeoutError:
-            pass
+        started = self.log_broker.subscribe(
+            include_buffer=False,
+            log_filter=LogFilter(pattern=r"\[Warning] core: Xray \d+\.\d+\.\d+ started"),
+        )
+        capture_task = asyncio.create_task(self.__capture_process_logs())
+
+        with started:
+            # either start or die
+            started_task = asyncio.ensure_future(anext(started))
+            await asyncio.wait(
+                {started_task, capture_task},
+                timeout=4,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            started_task.cancel()
+
+    @staticmethod
+    def prepare_config(config: XrayConfig) -> None:
+        """the startup message is logged as a warning, it must not be filtered out.
+        for blue/green restarts every listener gets SO_REUSEPORT so the
+        next process can bind the same ports while this one still serves"""
+        if config.get("log", {}).get("loglevel") in ("none", "error"):
+            config["log"]["loglevel"] = "warning"
+        if not XRAY_BLUE_GREEN_RESTART:
+            return
+        for inbound in config.get("inbounds", []):
+            if inbound.get("tag") == "API_INBOUND":
+                continue
+            sockopt = inbound.setdefault("streamSettings", {}).setdefault("sockopt", {})
+            custom = sockopt.setdefault("customSockopt", [])
+            if _REUSEPORT_SOCKOPT not in custom:
+                custom.append(dict(_REUSEPORT_SOCKOPT))
 
     async def stop(self):
         """stops xray if it is started"""
@@ -100,23 +130,34 @@ class XrayCore:
         finally:
             self.restarting = False
 
+    async def add_inbounds(self, api_host: str, api_port: int, inbounds: list[dict]):
+        """adds inbounds to the running xray through `xray api adi`, which
+        converts the json config the same way xray does on startup"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump({"inbounds": inbounds}, f)
+            f.flush()
+            process = await asyncio.create_subprocess_exec(
+                self.executable_path,
+                "api",
+                "adi",
+                f"--server={api_host}:{api_port}",
+                f.name,
+                env=self._env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            output, _ = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(output.decode(errors="replace").strip())
+
     async def __capture_process_logs(self):
-        """capture the logs, push it into the stream, and store it in the deck
-        note that the stream blocks sending if it's full, so a deck is necessary"""
+        """capture the logs and publish them to the broker which keeps
+        the ring buffer and never blocks on slow subscribers"""
 
         async def capture_stream(stream):
             while True:
                 output = await stream.readline()
-                for stm in self._snd_streams:
-                    try:
-                        await stm.send(output)
-                    except (ClosedResourceError, BrokenResourceError):
-                        try:
-                            self._snd_streams.remove(stm)
-                        except ValueError:
-                            pass
-                        continue
-                self._logs_buffer.append(output)
+                self.log_broker.publish(output)
                 if output == b"":
                     """break in case of eof"""
                     return
@@ -129,16 +170,6 @@ class XrayCore:
         logger.warning("Xray stopped/died")
         self.stop_event.set()
 
-    def get_logs_stm(self) -> MemoryObjectReceiveStream:
-        new_snd_stm, new_rcv_stm = create_memory_object_stream()
-        self._snd_streams.append(new_snd_stm)
-        return new_rcv_stm
-
-    def get_buffer(self):
-        """makes a copy of the buffer, so it could be read multiple times
-        the buffer is never cleared in case logs from xray's exit are useful"""
-        return self._logs_buffer.copy()
-
     @property
     def running(self):
         return self._process and self._process.returncode is None
@@ -1,9 +1,13 @@
 """xray utilities"""
 
+import hashlib
 import re
 import subprocess
 from typing import Dict
 
+# sha256 of a reality private key -> its public key
+_x25519_public_keys: Dict[str, str] = {}
+
 
 def get_version(xray_path: str) -> str | None:
     """
@@ -21,11 +25,25 @@ def get_version(xray_path: str) -> str | None:
 
 def get_x25519(xray_path: str, private_key: str = None) -> Dict[str, str] | None:
     """
-    get x25519 public key using the private key
+    get x25519 public key using the private key,
+    public keys of known private keys are served from a cache keyed by the key hash
     :param xray_path:
     :param private_key:
     :return: x25519 publickey
     """
+    if not private_key:
+        return _run_x25519(xray_path)
+    digest = hashlib.sha256(private_key.encode()).hexdigest()
+    public_key = _x25519_public_keys.get(digest)
+    if public_key is not None:
+        return {"private_key": private_key, "public_key": public_key}
+    keys = _run_x25519(xray_path, private_key)
+    if keys:
+        _x25519_public_keys[digest] = keys["public_key"]
+    return keys
+
+
+def _run_x25519(xray_path: str, private_key: str = None) -> Dict[str, str] | None:
     cmd = [xray_path, "x25519"]
     if private_key:
         cmd.extend(["-i", private_key])
@@ -49,4 +49,13 @@ class Proxyman(XrayAPIBase):
             tag=tag, operation=Message(command_pb2.RemoveUserOperation(email=email))
         )
 
-    # TODO: implement add/remove inbound/outbound if necessary
+    async def remove_inbound(self, tag: str) -> None:
+        """Removes an inbound, closing its listener and connections"""
+        stub = command_grpc.HandlerServiceStub(self._channel)
+        try:
+            await stub.RemoveInbound(command_pb2.RemoveInboundRequest(tag=tag))
+        except grpclib.exceptions.GRPCError as error:
+            raise RelatedError(error) from error
+
+    # inbounds are added through `xray api adi` (see XrayCore.add_inbounds),
+    # since building InboundHandlerConfig needs xray's own json conversion
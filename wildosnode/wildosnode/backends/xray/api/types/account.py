@@ -30,6 +30,11 @@ class Account(BaseModel, ABC):
     def message(self) -> TypedMessage:
         pass
 
+    @property
+    @abstractmethod
+    def client(self) -> dict:
+        """the account as a client entry of an inbound in the json config"""
+
     @field_validator("id", "password", check_fields=False)
     @classmethod
     def generate_creds(cls, v: str, info: ValidationInfo):
@@ -54,6 +59,10 @@ class VMessAccount(Account):
     def message(self):
         return Message(VMessAccountPb2(id=str(self.id)))
 
+    @property
+    def client(self) -> dict:
+        return {"id": str(self.id), "email": self.email, "level": self.level}
+
 
 class XTLSFlows(str, Enum):
     NONE = ""
@@ -68,6 +77,15 @@ class VLESSAccount(Account):
     def message(self):
         return Message(VLESSAccountPb2(id=str(self.id), flow=self.flow.value))
 
+    @property
+    def client(self) -> dict:
+        return {
+            "id": str(self.id),
+            "flow": self.flow.value,
+            "email": self.email,
+            "level": self.level,
+        }
+
 
 class TrojanAccount(Account):
     password: Optional[str] = Field(None, validate_default=True)
@@ -76,6 +94,10 @@ class TrojanAccount(Account):
     def message(self):
         return Message(TrojanAccountPb2(password=self.password))
 
+    @property
+    def client(self) -> dict:
+        return {"password": self.password, "email": self.email, "level": self.level}
+
 
 class ShadowsocksMethods(str, Enum):
     AES_128_GCM = "aes-128-gcm"
@@ -97,6 +119,15 @@ class ShadowsocksAccount(Account):
             ShadowsocksAccountPb2(password=self.password, cipher_type=self.cipher_type)
         )
 
+    @property
+    def client(self) -> dict:
+        return {
+            "password": self.password,
+            "method": self.method.value,
+            "email": self.email,
+            "level": self.level,
+        }
+
 
 accounts_map = {
     "shadowsocks": ShadowsocksAccount,
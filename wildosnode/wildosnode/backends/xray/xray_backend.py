@@ -1,12 +1,17 @@
 """What a vpn server should do"""
 
 import asyncio
+import ipaddress
 import json
 import logging
+import time
 from collections import defaultdict
 
+from wildosnode.backends.access_log import get_online_ip_tracker, parse_xray_access
 from wildosnode.backends.abstract_backend import VPNBackend
+from wildosnode.backends.log_broker import LogFilter, LogSubscription
 from wildosnode.backends.xray._config import XrayConfig
+from wildosnode.backends.xray._diff import diff_configs
 from wildosnode.backends.xray._runner import XrayCore
 from wildosnode.backends.xray.api import XrayAPI
 from wildosnode.backends.xray.api.exceptions import (
@@ -15,13 +20,69 @@ from wildosnode.backends.xray.api.exceptions import (
     TagNotFoundError,
 )
 from wildosnode.backends.xray.api.types.account import accounts_map
-from wildosnode.config import XRAY_RESTART_ON_FAILURE, XRAY_RESTART_ON_FAILURE_INTERVAL
+from wildosnode.config import (
+    XRAY_BLUE_GREEN_HEALTH_TIMEOUT,
+    XRAY_BLUE_GREEN_RESTART,
+    XRAY_RESTART_ON_FAILURE,
+    XRAY_RESTART_ON_FAILURE_INTERVAL,
+)
 from wildosnode.models import User, Inbound
 from wildosnode.storage import BaseStorage
 from wildosnode.utils.network import find_free_port
+from wildosnode.utils.usage import identifier_uid
 
 logger = logging.getLogger(__name__)
 
+# how often the refusal probe connects to each port during a restart
+REFUSAL_PROBE_INTERVAL = 0.02
+
+
+class RefusalProbe:
+    """
+    connects to the tcp inbounds over and over while a restart runs and
+    measures the longest time any of them refused connections
+    """
+
+    def __init__(self, addresses: set[tuple[str, int]]):
+        self._addresses = addresses
+        self._refused_since: dict[tuple[str, int], float] = {}
+        self._tasks: list[asyncio.Task] = []
+        self.window = 0.0
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._probe(address)) for address in self._addresses
+        ]
+
+    async def _probe(self, address: tuple[str, int]) -> None:
+        while True:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(*address), 0.5
+                )
+            except (OSError, asyncio.TimeoutError):
+                self._refused_since.setdefault(address, time.perf_counter())
+            else:
+                writer.close()
+                since = self._refused_since.pop(address, None)
+                if since is not None:
+                    self.window = max(self.window, time.perf_counter() - since)
+            await asyncio.sleep(REFUSAL_PROBE_INTERVAL)
+
+    async def stop(self, addresses: set[tuple[str, int]]) -> float:
+        """
+        :param addresses: the ports still served, refusals of dropped ones don't count
+        :return: the longest refused window
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        now = time.perf_counter()
+        for address, since in self._refused_since.items():
+            if address in addresses:
+                self.window = max(self.window, now - since)
+        return self.window
+
 
 class XrayBackend(VPNBackend):
     backend_type = "xray"
@@ -42,6 +103,7 @@ class XrayBackend(VPNBackend):
         self._storage = storage
         self._config_path = config_path
         self._restart_lock = asyncio.Lock()
+        self.startup_timings: dict[str, float] = {}
         asyncio.create_task(self._restart_on_failure())
 
     @property
@@ -73,9 +135,12 @@ class XrayBackend(VPNBackend):
 
     async def _restart_on_failure(self):
         while True:
-            await self._runner.stop_event.wait()
-            self._runner.stop_event.clear()
-            if self._restart_lock.locked():
+            runner = self._runner
+            await runner.stop_event.wait()
+            runner.stop_event.clear()
+            if runner is not self._runner:
+                logger.debug("Xray process retired by a blue/green restart stopped")
+            elif self._restart_lock.locked():
                 logger.debug("Xray restarting as planned")
             else:
                 logger.debug("Xray stopped unexpectedly")
@@ -85,18 +150,34 @@ class XrayBackend(VPNBackend):
                     await self.add_storage_users()
 
     async def start(self, backend_config: str | None = None):
+        started = time.perf_counter()
         if backend_config is None:
             with open(self._config_path) as f:
                 backend_config = f.read()
         else:
             self.save_config(json.dumps(json.loads(backend_config), indent=2))
         xray_api_port = find_free_port()
-        self._config = XrayConfig(backend_config, api_port=xray_api_port)
+        # parsing and deriving reality keys may spawn xray, keep it off the loop
+        self._config = await asyncio.to_thread(
+            XrayConfig, backend_config, api_port=xray_api_port
+        )
+        config_ready = time.perf_counter()
         self._config.register_inbounds(self._storage)
         self._inbound_tags = {i["tag"] for i in self._config.inbounds}
         self._inbounds = list(self._config.list_inbounds())
         self._api = XrayAPI("127.0.0.1", xray_api_port)
+        get_online_ip_tracker().attach(self._runner.log_broker, parse_xray_access)
         await self._runner.start(self._config)
+        self.startup_timings = {
+            "config": config_ready - started,
+            "process": time.perf_counter() - config_ready,
+        }
+        logger.info(
+            "xray started in %.3fs (config %.3fs, process %.3fs)",
+            sum(self.startup_timings.values()),
+            self.startup_timings["config"],
+            self.startup_timings["process"],
+        )
 
     async def stop(self):
         await self._runner.stop()
@@ -111,25 +192,232 @@ class XrayBackend(VPNBackend):
         try:
             if not backend_config:
                 return await self._runner.restart(self._config)
-            await self.stop()
-            await self.start(backend_config)
+            if self.running and await self._reconfigure(backend_config):
+                return
+            started = time.perf_counter()
+            probe = RefusalProbe(self._probe_addresses())
+            probe.start()
+            mode = "stop_start"
+            try:
+                if self.running and XRAY_BLUE_GREEN_RESTART:
+                    try:
+                        await self._blue_green_restart(backend_config)
+                    except Exception as e:
+                        # e.g. xray didn't apply SO_REUSEPORT and the ports were taken
+                        logger.warning(
+                            "blue/green restart failed, stopping and starting xray: %s",
+                            e,
+                        )
+                    else:
+                        mode = "blue_green"
+                if mode == "stop_start":
+                    await self.stop()
+                    await self.start(backend_config)
+                await self._wait_for_listeners()
+            finally:
+                refused_window = await probe.stop(self._probe_addresses())
+            if mode == "blue_green" and refused_window > 0:
+                logger.warning(
+                    "ports refused connections during a blue/green restart, "
+                    "check that xray applies SO_REUSEPORT to the inbounds"
+                )
+            self._record_restart(mode, started, refused_window)
         finally:
             self._restart_lock.release()
 
+    async def _blue_green_restart(self, backend_config: str) -> None:
+        """
+        starts a second xray with the new config next to the running one,
+        the listeners share their ports through SO_REUSEPORT. the users are
+        written into the new config, so the new process never accepts
+        connections without them. once it answers on its api it takes over
+        and the old one is stopped.
+        """
+        api_port = find_free_port()
+        new_config = await asyncio.to_thread(
+            XrayConfig, backend_config, api_port=api_port
+        )
+        new_inbounds = list(new_config.list_inbounds())
+        inbound_users = {}
+        for inbound in new_inbounds:
+            users = await self._storage.list_inbound_users(inbound.tag)
+            inbound_users[inbound.tag] = users
+            new_config.add_clients(
+                inbound.tag, [self._account(user, inbound).client for user in users]
+            )
+        green = XrayCore(
+            self._runner.executable_path,
+            self._runner.assets_path,
+            log_broker=self._runner.log_broker,
+            version=self._runner.version,
+        )
+        await green.start(new_config)
+        green_api = XrayAPI("127.0.0.1", api_port)
+        try:
+            if not green.running:
+                raise RuntimeError("the new xray process exited on startup")
+            await asyncio.wait_for(
+                green_api.get_sys_stats(), XRAY_BLUE_GREEN_HEALTH_TIMEOUT
+            )
+        except BaseException:
+            await green.stop()
+            raise
+
+        # storage follows the new config only once it serves
+        blue = self._runner
+        self._runner, self._api, self._config = green, green_api, new_config
+        new_tags = {i["tag"] for i in new_config.inbounds}
+        for tag in self._inbound_tags - new_tags:
+            self._storage.remove_inbound(tag)
+        new_config.register_inbounds(self._storage)
+        for inbound in new_inbounds:
+            for user in inbound_users[inbound.tag]:
+                await self._storage.update_user_inbounds(
+                    user,
+                    [inbound if i.tag == inbound.tag else i for i in user.inbounds],
+                )
+        self._inbound_tags = new_tags
+        self._inbounds = new_inbounds
+        self.save_config(json.dumps(json.loads(backend_config), indent=2))
+        await blue.stop()
+
+    def _probe_addresses(self) -> set[tuple[str, int]]:
+        """
+        where to check the tcp inbounds accept connections: their listen
+        address, or loopback for a wildcard one. unix sockets aren't probed
+        """
+        addresses = set()
+        for inbound in self._config.get("inbounds", []):
+            port = inbound.get("port")
+            settings = self._config.inbounds_by_tag.get(inbound.get("tag"))
+            if (
+                settings is None
+                or not isinstance(port, int)
+                or settings["network"] in ("kcp", "quic")
+            ):
+                continue
+            listen = inbound.get("listen") or "0.0.0.0"
+            try:
+                address = ipaddress.ip_address(listen)
+            except ValueError:
+                continue
+            if address.is_unspecified:
+                loopback = "::1" if address.version == 6 else "127.0.0.1"
+                address = ipaddress.ip_address(loopback)
+            addresses.add((str(address), port))
+        return addresses
+
+    async def _wait_for_listeners(self) -> float:
+        """
+        waits until every tcp inbound accepts connections
+        :return: the seconds it took
+        """
+        addresses = self._probe_addresses()
+        started = time.perf_counter()
+        deadline = started + XRAY_BLUE_GREEN_HEALTH_TIMEOUT
+        while addresses and time.perf_counter() < deadline:
+            for host, port in list(addresses):
+                try:
+                    _, writer = await asyncio.wait_for(
+                        asyncio.open_connection(host, port), 0.5
+                    )
+                except (OSError, asyncio.TimeoutError):
+                    continue
+                writer.close()
+                addresses.discard((host, port))
+            if addresses:
+                await asyncio.sleep(0.05)
+        return time.perf_counter() - started
+
+    def _record_restart(self, mode: str, started: float, refused_window: float):
+        self.last_restart = {
+            "mode": mode,
+            "duration": time.perf_counter() - started,
+            "refused_window": refused_window,
+            "finished_at": int(time.time()),
+        }
+        logger.info(
+            "xray restarted (%s) in %.3fs, ports refused connections for %.3fs",
+            mode,
+            self.last_restart["duration"],
+            refused_window,
+        )
+
+    async def _reconfigure(self, backend_config: str) -> bool:
+        """
+        applies inbound-only changes to the running xray through its api,
+        so connections on untouched inbounds survive and only the users of
+        changed inbounds are provisioned again
+        :return: False if the change needs a full restart
+        """
+        new_config = await asyncio.to_thread(
+            XrayConfig, backend_config, api_port=self._config.api_port
+        )
+        XrayCore.prepare_config(new_config)
+        diff = diff_configs(self._config, new_config)
+        if diff.requires_restart:
+            logger.info("xray config change needs a restart: %s", diff.restart_reason)
+            return False
+
+        try:
+            for tag in diff.removed + [i["tag"] for i in diff.changed]:
+                await self._api.remove_inbound(tag)
+            if diff.added or diff.changed:
+                await self._runner.add_inbounds(
+                    self._config.api_host,
+                    self._config.api_port,
+                    diff.added + diff.changed,
+                )
+        except Exception as e:
+            logger.warning("failed to reconfigure xray inbounds live: %s", e)
+            return False
+
+        self.save_config(json.dumps(json.loads(backend_config), indent=2))
+        for tag in diff.removed:
+            self._storage.remove_inbound(tag)
+        self._config = new_config
+        self._config.register_inbounds(self._storage)
+        self._inbound_tags = {i["tag"] for i in self._config.inbounds}
+        self._inbounds = list(self._config.list_inbounds())
+
+        for inbound in diff.changed:
+            tag = inbound["tag"]
+            if tag not in self._config.inbounds_by_tag:
+                continue
+            new_inbound = await self._storage.list_inbounds(tag=tag)
+            for user in await self._storage.list_inbound_users(tag):
+                await self._storage.update_user_inbounds(
+                    user,
+                    [new_inbound if i.tag == tag else i for i in user.inbounds],
+                )
+                await self.add_user(user, new_inbound)
+        logger.info(
+            "xray reconfigured live: %i inbounds added, %i removed, %i changed",
+            len(diff.added),
+            len(diff.removed),
+            len(diff.changed),
+        )
+        return True
+
     async def add_user(self, user: User, inbound: Inbound):
-        email = f"{user.id}.{user.username}"
+        await self._add_user(self._api, user, inbound)
 
+    @staticmethod
+    def _account(user: User, inbound: Inbound):
         account_class = accounts_map[inbound.protocol]
         flow = inbound.config["flow"] or ""
         logger.debug(flow)
-        user_account = account_class(
-            email=email,
+        return account_class(
+            email=f"{user.id}.{user.username}",
             seed=user.key,
             flow=flow,
         )
 
+    async def _add_user(self, api: XrayAPI, user: User, inbound: Inbound):
+        user_account = self._account(user, inbound)
+
         try:
-            await self._api.add_inbound_user(inbound.tag, user_account)
+            await api.add_inbound_user(inbound.tag, user_account)
         except (EmailExistsError, TagNotFoundError):
             raise
         except OSError:
@@ -151,15 +439,11 @@ class XrayBackend(VPNBackend):
             api_stats = []
         stats = defaultdict(int)
         for stat in api_stats:
-            uid = int(stat.name.split(".")[0])
+            uid = identifier_uid(stat.name)
             stats[uid] += stat.value
         return stats
 
-    async def get_logs(self, include_buffer: bool = True):
-        if include_buffer:
-            for line in self._runner.get_buffer():
-                yield line
-        log_stm = self._runner.get_logs_stm()
-        async with log_stm:
-            async for line in log_stm:
-                yield line
+    def get_logs(
+        self, include_buffer: bool = True, log_filter: LogFilter | None = None
+    ) -> LogSubscription:
+        return self._runner.log_broker.subscribe(include_buffer, log_filter)
@@ -11,6 +11,8 @@ load_dotenv()
 SERVICE_ADDRESS: str = cast(str, _config("SERVICE_ADDRESS", default="0.0.0.0", cast=str))
 SERVICE_PORT: int = cast(int, _config("SERVICE_PORT", cast=int, default=_config("NODE_GRPC_PORT", cast=int, default=62050)))
 INSECURE: bool = cast(bool, _config("INSECURE", cast=bool, default=False))
+# grpclib (pure python) or grpcio (C-core), must match the node's connection backend on the panel
+SERVICE_TRANSPORT: str = cast(str, _config("SERVICE_TRANSPORT", default="grpclib", cast=str))
 
 XRAY_ENABLED: bool = cast(bool, _config("XRAY_ENABLED", cast=bool, default=True))
 XRAY_EXECUTABLE_PATH: str = cast(str, _config("XRAY_EXECUTABLE_PATH", default="/usr/bin/xray", cast=str))
@@ -21,6 +23,12 @@ XRAY_RESTART_ON_FAILURE: bool = cast(bool, _config("XRAY_RESTART_ON_FAILURE", ca
 XRAY_RESTART_ON_FAILURE_INTERVAL: int = cast(int, _config(
     "XRAY_RESTART_ON_FAILURE_INTERVAL", cast=int, default=0
 ))
+XRAY_BLUE_GREEN_RESTART: bool = cast(bool, _config(
+    "XRAY_BLUE_GREEN_RESTART", cast=bool, default=False
+))
+XRAY_BLUE_GREEN_HEALTH_TIMEOUT: float = cast(float, _config(
+    "XRAY_BLUE_GREEN_HEALTH_TIMEOUT", cast=float, default=5.0
+))
 
 HYSTERIA_ENABLED: bool = cast(bool, _config("HYSTERIA_ENABLED", cast=bool, default=False))
 HYSTERIA_EXECUTABLE_PATH: str = cast(str, _config(
@@ -29,6 +37,12 @@ HYSTERIA_EXECUTABLE_PATH: str = cast(str, _config(
 HYSTERIA_CONFIG_PATH: str = cast(str, _config(
     "HYSTERIA_CONFIG_PATH", default="/etc/hysteria/config.yaml", cast=str
 ))
+HYSTERIA_KICK_INTERVAL: float = cast(float, _config(
+    "HYSTERIA_KICK_INTERVAL", cast=float, default=0.5
+))
+HYSTERIA_STATS_CONNECTIONS: int = cast(int, _config(
+    "HYSTERIA_STATS_CONNECTIONS", cast=int, default=4
+))
 
 SING_BOX_ENABLED: bool = cast(bool, _config("SING_BOX_ENABLED", cast=bool, default=False))
 SING_BOX_EXECUTABLE_PATH: str = cast(str, _config(
@@ -47,6 +61,56 @@ SING_BOX_USER_MODIFICATION_INTERVAL: int = cast(int, _config(
     "SING_BOX_USER_MODIFICATION_INTERVAL", cast=int, default=30
 ))
 
+BACKEND_STATS_TIMEOUT: float = cast(float, _config(
+    "BACKEND_STATS_TIMEOUT", cast=float, default=5.0
+))
+
+HOST_METRICS_INTERVAL: float = cast(float, _config(
+    "HOST_METRICS_INTERVAL", cast=float, default=2.0
+))
+HOST_METRICS_HISTORY_SIZE: int = cast(int, _config(
+    "HOST_METRICS_HISTORY_SIZE", cast=int, default=1800
+))
+
+PEAK_EVENTS_BUFFER_SIZE: int = cast(int, _config(
+    "PEAK_EVENTS_BUFFER_SIZE", cast=int, default=1000
+))
+PEAK_SEQ_BLOCK_SIZE: int = cast(int, _config(
+    "PEAK_SEQ_BLOCK_SIZE", cast=int, default=100
+))
+
+LOG_BROKER_RING_SIZE: int = cast(int, _config(
+    "LOG_BROKER_RING_SIZE", cast=int, default=1000
+))
+LOG_SUBSCRIBER_QUEUE_SIZE: int = cast(int, _config(
+    "LOG_SUBSCRIBER_QUEUE_SIZE", cast=int, default=2000
+))
+LOG_DROP_POLICY: str = cast(str, _config(
+    "LOG_DROP_POLICY", cast=str, default="drop_oldest"
+))
+LOG_BATCH_MAX_LINES: int = cast(int, _config(
+    "LOG_BATCH_MAX_LINES", cast=int, default=200
+))
+LOG_BATCH_INTERVAL: float = cast(float, _config(
+    "LOG_BATCH_INTERVAL", cast=float, default=0.2
+))
+
+ONLINE_IPS_WINDOW: float = cast(float, _config(
+    "ONLINE_IPS_WINDOW", cast=float, default=60.0
+))
+ONLINE_IPS_MAX_USERS: int = cast(int, _config(
+    "ONLINE_IPS_MAX_USERS", cast=int, default=100000
+))
+ONLINE_IPS_MAX_PER_USER: int = cast(int, _config(
+    "ONLINE_IPS_MAX_PER_USER", cast=int, default=32
+))
+ACCESS_LOG_QUEUE_SIZE: int = cast(int, _config(
+    "ACCESS_LOG_QUEUE_SIZE", cast=int, default=50000
+))
+ACCESS_LOG_BATCH_LINES: int = cast(int, _config(
+    "ACCESS_LOG_BATCH_LINES", cast=int, default=5000
+))
+
 
 SSL_CERT_FILE: str = cast(str, _config("SSL_CERT_FILE", default="./ssl_cert.pem", cast=str))
 SSL_KEY_FILE: str = cast(str, _config("SSL_KEY_FILE", default="./ssl_key.pem", cast=str))
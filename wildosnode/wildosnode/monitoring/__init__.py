@@ -2,10 +2,16 @@
 Monitoring module for WildosVPN node - handles peak detection and system metrics.
 """
 
+from .host_sampler import HostMetricsSampler, HostSnapshot, get_host_sampler
+from .peak_hub import PeakEventHub
 from .peak_monitor import InContainerPeakMonitor, get_peak_monitor
 from .peak_seq_manager import PeakSequenceManager, get_sequence_manager
 
 __all__ = [
+    "HostMetricsSampler",
+    "HostSnapshot",
+    "get_host_sampler",
+    "PeakEventHub",
     "InContainerPeakMonitor", 
     "get_peak_monitor",
     "PeakSequenceManager", 
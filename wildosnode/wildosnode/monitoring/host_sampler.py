@@ -0,0 +1,183 @@
+"""
+Фоновый сэмплер системных метрик хоста.
+Один поток собирает CPU, память, диск, сетевые счетчики и load average
+в кольцевой буфер снимков; RPC и агент пиков читают готовый снимок за O(1).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from ..config import HOST_METRICS_INTERVAL, HOST_METRICS_HISTORY_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class NicCounters:
+    """Счетчики сетевого интерфейса"""
+    bytes_sent: int
+    bytes_recv: int
+    packets_sent: int
+    packets_recv: int
+
+
+@dataclass(frozen=True, slots=True)
+class HostSnapshot:
+    """Неизменяемый снимок метрик хоста"""
+    timestamp: float
+    cpu_percent: float
+    load_avg: Tuple[float, float, float]
+    memory_percent: float
+    memory_used: int
+    memory_total: int
+    disk_percent: float
+    disk_used: int
+    disk_total: int
+    network: Dict[str, NicCounters]
+    boot_time: float
+
+    @property
+    def network_bytes_sent(self) -> int:
+        return sum(nic.bytes_sent for nic in self.network.values())
+
+    @property
+    def network_bytes_recv(self) -> int:
+        return sum(nic.bytes_recv for nic in self.network.values())
+
+
+class HostMetricsSampler:
+    """
+    Сэмплер метрик в отдельном daemon-потоке.
+    cpu_percent вызывается без interval и считает загрузку между
+    соседними сэмплами, поэтому event loop никогда не блокируется.
+    """
+
+    def __init__(self, interval: float = HOST_METRICS_INTERVAL,
+                 history_size: int = HOST_METRICS_HISTORY_SIZE):
+        self.interval = interval
+        self._history: deque = deque(maxlen=history_size)
+        self._latest: Optional[HostSnapshot] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return psutil is not None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _sample(self) -> HostSnapshot:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        try:
+            load_avg = tuple(psutil.getloadavg())
+        except (AttributeError, OSError):
+            load_avg = (0.0, 0.0, 0.0)
+        network = {
+            name: NicCounters(
+                bytes_sent=stats.bytes_sent,
+                bytes_recv=stats.bytes_recv,
+                packets_sent=stats.packets_sent,
+                packets_recv=stats.packets_recv,
+            )
+            for name, stats in psutil.net_io_counters(pernic=True).items()
+        }
+        return HostSnapshot(
+            timestamp=time.time(),
+            cpu_percent=psutil.cpu_percent(interval=None),
+            load_avg=load_avg,
+            memory_percent=memory.percent,
+            memory_used=memory.used,
+            memory_total=memory.total,
+            disk_percent=disk.percent,
+            disk_used=disk.used,
+            disk_total=disk.total,
+            network=network,
+            boot_time=psutil.boot_time(),
+        )
+
+    def _run(self):
+        # Первый вызов cpu_percent(None) только задает точку отсчета
+        psutil.cpu_percent(interval=None)
+        while not self._stop_event.wait(self.interval):
+            try:
+                snapshot = self._sample()
+            except Exception as e:
+                logger.error(f"Error sampling host metrics: {e}")
+                continue
+            self._history.append(snapshot)
+            self._latest = snapshot
+
+    def start(self):
+        """Запустить поток сэмплера (идемпотентно)"""
+        with self._lock:
+            if self.is_running:
+                return
+            if not self.available:
+                logger.error("psutil not available - host metrics sampler disabled")
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="host-metrics-sampler", daemon=True
+            )
+            self._thread.start()
+            logger.info(f"Host metrics sampler started (interval: {self.interval}s)")
+
+    def stop(self):
+        """Остановить поток сэмплера"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def latest(self) -> Optional[HostSnapshot]:
+        """
+        Последний снимок. До первого сэмпла снимается неблокирующий
+        снимок на месте; None, если psutil недоступен.
+        """
+        if self._latest is None and self.available:
+            self._latest = self._sample()
+        return self._latest
+
+    def history(self, since: float = 0.0, until: Optional[float] = None,
+                max_points: int = 0) -> List[HostSnapshot]:
+        """
+        Снимки в диапазоне [since, until], прореженные до max_points.
+        Прореживание берет каждый n-й снимок, последний снимок сохраняется всегда.
+        """
+        snapshots = [
+            s for s in list(self._history)
+            if s.timestamp >= since and (until is None or s.timestamp <= until)
+        ]
+        if max_points <= 0 or len(snapshots) <= max_points:
+            return snapshots
+        step = -(-len(snapshots) // max_points)
+        sampled = snapshots[::step]
+        if sampled[-1] is not snapshots[-1]:
+            sampled[-1] = snapshots[-1]
+        return sampled
+
+
+# Глобальный экземпляр сэмплера
+_sampler_instance: Optional[HostMetricsSampler] = None
+
+
+def get_host_sampler() -> HostMetricsSampler:
+    """Получить глобальный запущенный экземпляр сэмплера"""
+    global _sampler_instance
+    if _sampler_instance is None:
+        _sampler_instance = HostMetricsSampler()
+    _sampler_instance.start()
+    return _sampler_instance
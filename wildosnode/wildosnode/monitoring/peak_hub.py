@@ -0,0 +1,67 @@
+"""
+Широковещательный хаб событий пиков.
+Кольцевой буфер событий с курсором на каждого подписчика: все подписчики
+получают все события, отключившийся подписчик ничего не удерживает,
+а переподключение продолжается с последнего полученного seq.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator
+
+from ..config import PEAK_EVENTS_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class PeakEventHub:
+    """Хаб событий пиков с возобновлением по seq"""
+
+    def __init__(self, size: int = PEAK_EVENTS_BUFFER_SIZE):
+        self._events: deque = deque(maxlen=size)
+        self._condition = asyncio.Condition()
+        self.subscribers = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._events[-1].seq if self._events else 0
+
+    @property
+    def first_seq(self) -> int:
+        return self._events[0].seq if self._events else 0
+
+    async def publish(self, event) -> None:
+        """Добавить событие в буфер и разбудить подписчиков"""
+        async with self._condition:
+            self._events.append(event)
+            self._condition.notify_all()
+
+    async def subscribe(self, after_seq: int = 0) -> AsyncIterator:
+        """
+        Подписка на события с seq > after_seq.
+        after_seq=0 означает только новые события; если нужная часть
+        истории уже вытеснена из буфера, выдача начинается с самого старого события.
+        """
+        cursor = after_seq or self.last_seq
+        if after_seq and self._events and after_seq < self.first_seq - 1:
+            logger.warning(
+                f"Peak subscriber resumed from seq {after_seq}, "
+                f"buffer starts at {self.first_seq}; events were lost"
+            )
+        self.subscribers += 1
+        try:
+            while True:
+                async with self._condition:
+                    await self._condition.wait_for(
+                        lambda: self._events and self.last_seq != cursor
+                    )
+                    if self.last_seq < cursor:
+                        # Счетчик seq начат заново (потерян файл seq) - отдаем буфер целиком
+                        cursor = 0
+                    pending = [e for e in self._events if e.seq > cursor]
+                for event in pending:
+                    cursor = event.seq
+                    yield event
+        finally:
+            self.subscribers -= 1
@@ -13,6 +13,8 @@ from enum import Enum
 from typing import Dict, Optional, Any
 from datetime import datetime, timezone
 
+from .host_sampler import get_host_sampler
+from .peak_hub import PeakEventHub
 from .peak_seq_manager import get_sequence_manager
 
 # Импорты protobuf классов из node service
@@ -67,48 +69,33 @@ class InContainerPeakMonitor:
         self.is_running = False
         self.metrics_buffer = []
         
-        # Очередь событий для стриминга
-        self.peak_events_queue = asyncio.Queue()
+        # Широковещательный хаб событий для стриминга
+        self.events_hub = PeakEventHub()
         
     def _get_system_metrics(self) -> Optional[Dict[str, float]]:
         """
-        Получить текущие системные метрики.
+        Получить текущие системные метрики из фонового сэмплера.
         Возвращает None если psutil недоступен (отключает мониторинг).
         """
         try:
-            import psutil
-            
-            # CPU метрики
-            cpu_percent = psutil.cpu_percent(interval=1)
-            load_avg = psutil.getloadavg()
-            
-            # Memory метрики  
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            
-            # Disk метрики для корневого раздела
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
-            
-            # Network метрики (упрощенно)
-            net_io = psutil.net_io_counters()
+            snapshot = get_host_sampler().latest()
+            if snapshot is None:
+                logger.error("psutil not available - peak monitoring disabled")
+                return None
             
             return {
-                'cpu_usage': cpu_percent,
-                'load_1min': load_avg[0] if load_avg else 0,
-                'memory_percent': memory_percent,
-                'memory_used': memory.used,
-                'memory_total': memory.total,
-                'disk_percent': disk_percent,
-                'disk_used': disk.used,
-                'disk_total': disk.total,
-                'network_rx_bytes': net_io.bytes_recv,
-                'network_tx_bytes': net_io.bytes_sent,
-                'timestamp': time.time()
+                'cpu_usage': snapshot.cpu_percent,
+                'load_1min': snapshot.load_avg[0],
+                'memory_percent': snapshot.memory_percent,
+                'memory_used': snapshot.memory_used,
+                'memory_total': snapshot.memory_total,
+                'disk_percent': (snapshot.disk_used / snapshot.disk_total) * 100,
+                'disk_used': snapshot.disk_used,
+                'disk_total': snapshot.disk_total,
+                'network_rx_bytes': snapshot.network_bytes_recv,
+                'network_tx_bytes': snapshot.network_bytes_sent,
+                'timestamp': snapshot.timestamp
             }
-        except ImportError:
-            logger.error("psutil not available - peak monitoring disabled")
-            return None
         except Exception as e:
             logger.error(f"Error getting system metrics: {e}")
             return None
@@ -314,7 +301,7 @@ class InContainerPeakMonitor:
                         'metrics_snapshot': metrics
                     })
                     if event:
-                        await self.peak_events_queue.put(event)
+                        await self.events_hub.publish(event)
                 
                 # Обработка завершений пиков для метрик без нарушений
                 monitored_metrics = [
@@ -328,7 +315,7 @@ class InContainerPeakMonitor:
                     if (category, metric) not in active_violations:
                         event = self._process_no_violation(category, metric, value)
                         if event:
-                            await self.peak_events_queue.put(event)
+                            await self.events_hub.publish(event)
                 
                 # Пауза между проверками
                 await asyncio.sleep(5)  # 5 секунд между проверками
@@ -337,19 +324,10 @@ class InContainerPeakMonitor:
                 logger.error(f"Error in monitoring loop: {e}")
                 await asyncio.sleep(10)  # Увеличенная пауза при ошибке
     
-    async def get_peak_events_stream(self):
-        """Генератор для стриминга protobuf событий пиков"""
-        while True:
-            try:
-                event = await asyncio.wait_for(
-                    self.peak_events_queue.get(), 
-                    timeout=30  # Heartbeat каждые 30 секунд
-                )
-                yield event
-            except asyncio.TimeoutError:
-                # Timeout - цикл продолжается без отправки событий
-                # gRPC keepalive обрабатывает поддержание соединения
-                continue
+    async def get_peak_events_stream(self, after_seq: int = 0):
+        """Генератор для стриминга protobuf событий пиков с возобновлением по seq"""
+        async for event in self.events_hub.subscribe(after_seq):
+            yield event
     
     def start(self):
         """Запустить агент мониторинга"""
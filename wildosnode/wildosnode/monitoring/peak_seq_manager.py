@@ -8,20 +8,29 @@ import logging
 import threading
 from typing import Optional
 
+from ..config import PEAK_SEQ_BLOCK_SIZE
+
 logger = logging.getLogger(__name__)
 
 class PeakSequenceManager:
     """
     Менеджер для сохранения монотонной последовательности событий пиков
     между перезапусками контейнера узла.
+    В файл пишется не каждый seq, а верхняя граница зарезервированного блока:
+    запись на диск происходит раз в block_size событий, а после перезапуска
+    счет продолжается с границы блока (с пропуском, но монотонно).
     """
     
-    def __init__(self, node_id: int, seq_file_path: str = "/tmp/peak_seq.txt"):
+    def __init__(self, node_id: int, seq_file_path: str = "/tmp/peak_seq.txt",
+                 block_size: int = PEAK_SEQ_BLOCK_SIZE):
         self.node_id = node_id
         self.seq_file_path = seq_file_path
+        self.block_size = max(1, block_size)
         self._current_seq = 0
+        self._reserved_seq = 0
         self._lock = threading.Lock()
         self._load_sequence()
+        self._reserved_seq = self._current_seq
     
     def _load_sequence(self):
         """Загрузить последнюю последовательность из файла"""
@@ -42,13 +51,13 @@ class PeakSequenceManager:
             self._current_seq = 0
     
     def _save_sequence(self):
-        """Сохранить текущую последовательность в файл"""
+        """Сохранить верхнюю границу зарезервированного блока в файл"""
         try:
             # Создаем директорию если не существует
             os.makedirs(os.path.dirname(self.seq_file_path), exist_ok=True)
             
             with open(self.seq_file_path, 'w') as f:
-                f.write(str(self._current_seq))
+                f.write(str(self._reserved_seq))
                 f.flush()
                 os.fsync(f.fileno())  # Принудительная запись на диск
         except Exception as e:
@@ -58,7 +67,9 @@ class PeakSequenceManager:
         """Получить следующий номер последовательности"""
         with self._lock:
             self._current_seq += 1
-            self._save_sequence()
+            if self._current_seq > self._reserved_seq:
+                self._reserved_seq = self._current_seq + self.block_size - 1
+                self._save_sequence()
             return self._current_seq
     
     def get_current_sequence(self) -> int:
@@ -32,7 +32,9 @@ class NodeTokenValidator:
         if not metadata:
             return None
             
-        for key, value in metadata:
+        # grpclib hands over a MultiDict, iterating it yields only the keys
+        pairs = metadata.items() if hasattr(metadata, 'items') else metadata
+        for key, value in pairs:
             if key.lower() == 'authorization':
                 if value.startswith('Bearer '):
                     return value[7:]  # Remove 'Bearer ' prefix
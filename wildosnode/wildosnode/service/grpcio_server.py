@@ -0,0 +1,143 @@
+"""serve the grpclib service handlers over grpcio (C-core) HTTP/2 and TLS"""
+
+import asyncio
+import logging
+import signal
+from typing import Iterable
+
+import grpc
+from grpclib import GRPCError
+from grpclib.const import Handler
+from multidict import MultiDict
+
+logger = logging.getLogger(__name__)
+
+
+class _ServerStream:
+    """the part of grpclib's server `Stream` the service handlers use"""
+
+    def __init__(self, context: grpc.aio.ServicerContext, handler: Handler, request=None):
+        self.metadata = MultiDict(context.invocation_metadata() or ())
+        self.peer = context.peer()
+        self.reply = None
+        self._context = context
+        self._client_streaming = handler.cardinality.value.client_streaming
+        self._server_streaming = handler.cardinality.value.server_streaming
+        self._request = request
+
+    async def recv_message(self):
+        if self._client_streaming:
+            message = await self._context.read()
+            return None if message is grpc.aio.EOF else message
+        request, self._request = self._request, None
+        return request
+
+    async def send_message(self, message) -> None:
+        if self._server_streaming:
+            await self._context.write(message)
+        else:
+            self.reply = message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.recv_message()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+def _rpc_method_handler(handler: Handler) -> grpc.RpcMethodHandler:
+    cardinality = handler.cardinality.value
+
+    async def behavior(request, context: grpc.aio.ServicerContext):
+        stream = _ServerStream(
+            context, handler, None if cardinality.client_streaming else request
+        )
+        try:
+            await handler.func(stream)
+        except GRPCError as e:
+            await context.abort(grpc.StatusCode[e.status.name], e.message or "")
+        if not cardinality.server_streaming:
+            # grpcio needs a reply even from handlers that don't send one
+            return stream.reply if stream.reply is not None else handler.reply_type()
+
+    factory = {
+        (False, False): grpc.unary_unary_rpc_method_handler,
+        (False, True): grpc.unary_stream_rpc_method_handler,
+        (True, False): grpc.stream_unary_rpc_method_handler,
+        (True, True): grpc.stream_stream_rpc_method_handler,
+    }[(cardinality.client_streaming, cardinality.server_streaming)]
+    return factory(
+        behavior,
+        request_deserializer=handler.request_type.FromString,
+        response_serializer=handler.reply_type.SerializeToString,
+    )
+
+
+def create_server(services: Iterable) -> grpc.aio.Server:
+    """a grpcio server dispatching to the `__mapping__` of grpclib services"""
+    handlers: dict[str, dict[str, grpc.RpcMethodHandler]] = {}
+    for service in services:
+        for path, handler in service.__mapping__().items():
+            service_name, method = path.lstrip("/").rsplit("/", 1)
+            handlers.setdefault(service_name, {})[method] = _rpc_method_handler(handler)
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers(
+        [
+            grpc.method_handlers_generic_handler(name, methods)
+            for name, methods in handlers.items()
+        ]
+    )
+    return server
+
+
+def server_credentials(
+    cert_file: str, key_file: str, trusted_file: str | None = None
+) -> grpc.ServerCredentials:
+    """the grpcio counterpart of `create_secure_context`"""
+    with open(cert_file, "rb") as f:
+        cert = f.read()
+    with open(key_file, "rb") as f:
+        key = f.read()
+    trusted = None
+    if trusted_file:
+        with open(trusted_file, "rb") as f:
+            trusted = f.read()
+    return grpc.ssl_server_credentials(
+        [(key, cert)],
+        root_certificates=trusted,
+        require_client_auth=trusted is not None,
+    )
+
+
+async def serve(
+    services: Iterable,
+    host: str,
+    port: int,
+    credentials: grpc.ServerCredentials | None = None,
+    grace: float = 5.0,
+) -> None:
+    """run until SIGINT/SIGTERM, like grpclib's `graceful_exit`"""
+    server = create_server(services)
+    address = f"{host}:{port}"
+    if credentials is None:
+        server.add_insecure_port(address)
+    else:
+        server.add_secure_port(address, credentials)
+    await server.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    logger.info(
+        "Node service running on %s (grpcio, SSL: %s)",
+        address,
+        "enabled" if credentials else "disabled",
+    )
+    try:
+        await stop.wait()
+    finally:
+        await server.stop(grace)
@@ -3,9 +3,10 @@ The grpc Service to add/update/delete users
 Right now it only supports Xray but that is subject to change
 """
 
+import asyncio
 import json
 import logging
-from collections import defaultdict
+import re
 from typing import Coroutine, Any
 
 from grpclib import GRPCError, Status
@@ -15,6 +16,9 @@ from grpclib.server import Stream
 from .auth_middleware import secure_method
 
 from wildosnode.backends.abstract_backend import VPNBackend
+from wildosnode.backends.access_log import get_online_ip_tracker
+from wildosnode.backends.log_broker import LogFilter
+from wildosnode.config import BACKEND_STATS_TIMEOUT
 from wildosnode.storage import BaseStorage
 # Import service_grpc from local service directory  
 from wildosnode.service.service_grpc import WildosServiceBase
@@ -25,8 +29,12 @@ from wildosnode.service.service_pb2 import (
     BackendLogsRequest,
     RestartBackendRequest,
     BackendStats,
+    BackendRestartStats,
     # Host system monitoring
     HostSystemMetrics,
+    HostMetricsQuery,
+    HostMetricsSample,
+    HostMetricsHistory,
     NetworkInterface,
     PortActionRequest,
     PortActionResponse,
@@ -42,6 +50,7 @@ from wildosnode.service.service_pb2 import (
     # Peak monitoring
     PeakEvent,
     PeakQuery,
+    PeakStreamRequest,
     UserData,
     UsersData,
     Empty,
@@ -51,8 +60,8 @@ from wildosnode.service.service_pb2 import (
     LogLine,
 )
 from ..models import User as UserModel, Inbound as InboundModel
-from ..monitoring import get_peak_monitor
-import psutil
+from ..monitoring import get_host_sampler, get_peak_monitor
+from ..utils.usage import merge_usages
 import os
 import subprocess
 import socket
@@ -62,12 +71,22 @@ from pathlib import Path
 logger = logging.getLogger(__name__)
 
 
+def _backend_stats(backend: VPNBackend) -> BackendStats:
+    stats = BackendStats(running=backend.running)
+    if backend.last_restart:
+        stats.last_restart.CopyFrom(BackendRestartStats(**backend.last_restart))
+    return stats
+
+
 class WildosService(WildosServiceBase):
     """Add/Update/Delete users based on calls from the client"""
 
     def __init__(self, storage: BaseStorage, backends: dict[str, VPNBackend]):
         self._backends = backends
         self._storage = storage
+        # usage queries reset the counters, so one that outlives its deadline
+        # is left to finish and reported by the next fetch
+        self._usage_queries: dict[str, asyncio.Task] = {}
 
     def _resolve_tag(self, inbound_tag: str) -> VPNBackend:
         for backend in self._backends.values():
@@ -185,23 +204,62 @@ class WildosService(WildosServiceBase):
             logger.error("Expected list of users from storage, got: %s", type(all_users))
         await stream.send_message(Empty())
 
+    async def _collect_usages(
+        self, name: str, backend: VPNBackend
+    ) -> tuple[dict[int, int], UsersStats.BackendStatus]:
+        started = time.monotonic()
+        error = None
+        query = self._usage_queries.get(name)
+        if query is None:
+            query = asyncio.ensure_future(backend.get_usages())
+            self._usage_queries[name] = query
+        try:
+            usages = await asyncio.wait_for(
+                asyncio.shield(query), BACKEND_STATS_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            usages, error = {}, (
+                f"timed out after {BACKEND_STATS_TIMEOUT}s,"
+                " usages follow with the next fetch"
+            )
+        except Exception as e:
+            usages, error = {}, str(e) or type(e).__name__
+        if query.done():
+            self._usage_queries.pop(name, None)
+        duration_ms = int((time.monotonic() - started) * 1000)
+        if error:
+            logger.warning("failed to fetch usages of backend `%s`: %s", name, error)
+        status = UsersStats.BackendStatus(
+            name=name, ok=error is None, error=error, duration_ms=duration_ms
+        )
+        return usages, status
+
     @secure_method(allow_health_check=False)
     async def FetchUsersStats(self, stream: Stream[Empty, UsersStats]) -> None:
         await stream.recv_message()
-        all_stats = defaultdict(int)
-
-        for backend in self._backends.values():
-            stats = await backend.get_usages()
-
-            for user, usage in stats.items():
-                all_stats[user] += usage
+        results = await asyncio.gather(
+            *[
+                self._collect_usages(name, backend)
+                for name, backend in self._backends.items()
+            ]
+        )
 
+        all_stats = merge_usages(usages for usages, _ in results)
         logger.debug(all_stats)
         user_stats = [
-            UsersStats.UserStats(uid=uid, usage=usage)
-            for uid, usage in all_stats.items()
+            UsersStats.UserStats(uid=uid, usage=usage) for uid, usage in all_stats
+        ]
+        online_ips = [
+            UsersStats.OnlineIPs(uid=uid, ip_hashes=ip_hashes)
+            for uid, ip_hashes in get_online_ip_tracker().snapshot()
         ]
-        await stream.send_message(UsersStats(users_stats=user_stats))
+        await stream.send_message(
+            UsersStats(
+                users_stats=user_stats,
+                backends_status=[status for _, status in results],
+                online_ips=online_ips,
+            )
+        )
 
     @secure_method(allow_health_check=False)
     async def StreamBackendLogs(
@@ -210,8 +268,25 @@ class WildosService(WildosServiceBase):
         req = await stream.recv_message()
         if not req or not hasattr(req, 'backend_name') or req.backend_name not in self._backends:
             raise GRPCError(Status.NOT_FOUND, "Backend not found")
-        async for line in self._backends[req.backend_name].get_logs(req.include_buffer):
-            await stream.send_message(LogLine(line=line))
+        try:
+            log_filter = LogFilter(
+                level=req.level if req.HasField("level") else None,
+                pattern=req.pattern if req.HasField("pattern") else None,
+                user=req.user if req.HasField("user") else None,
+            )
+        except (ValueError, re.error) as e:
+            raise GRPCError(Status.INVALID_ARGUMENT, f"Invalid log filter: {e}")
+        backend = self._backends[req.backend_name]
+        with backend.get_logs(req.include_buffer, log_filter) as subscription:
+            async for lines in subscription:
+                if req.batch:
+                    await stream.send_message(
+                        LogLine(lines=lines, dropped=subscription.dropped)
+                    )
+                    continue
+                # clients without batching get the old one message per line
+                for line in lines:
+                    await stream.send_message(LogLine(line=line))
 
     @secure_method(allow_health_check=False)
     async def FetchBackendConfig(
@@ -258,13 +333,13 @@ class WildosService(WildosServiceBase):
                 Status.NOT_FOUND,
                 "Backend doesn't exist",
             )
-        running = self._backends[backend.name].running
-        await stream.send_message(BackendStats(running=running))
+        await stream.send_message(_backend_stats(self._backends[backend.name]))
 
     @secure_method(allow_health_check=False)
-    async def StreamPeakEvents(self, stream: Stream[Empty, PeakEvent]) -> None:
-        """Stream real-time peak events to panel"""
-        await stream.recv_message()  # Receive Empty message
+    async def StreamPeakEvents(self, stream: Stream[PeakStreamRequest, PeakEvent]) -> None:
+        """Stream real-time peak events to panel, resuming after `after_seq`"""
+        request = await stream.recv_message()
+        after_seq = request.after_seq if request else 0
         
         # Get peak monitor instance (with lazy initialization)
         peak_monitor = get_peak_monitor(node_id=1)  # TODO: Get actual node_id
@@ -274,8 +349,8 @@ class WildosService(WildosServiceBase):
             if not peak_monitor.is_running:
                 monitoring_task = peak_monitor.start()
                 
-            # Stream events to client
-            async for event in peak_monitor.get_peak_events_stream():
+            # Stream events to client; every stream gets its own cursor on the hub
+            async for event in peak_monitor.get_peak_events_stream(after_seq):
                 await stream.send_message(event)
                 
         except Exception as e:
@@ -312,58 +387,72 @@ class WildosService(WildosServiceBase):
         await stream.recv_message()  # Receive Empty message
         
         try:
-            # CPU metrics
-            cpu_usage = psutil.cpu_percent(interval=1)
-            
-            # Memory metrics
-            memory = psutil.virtual_memory()
-            memory_usage = memory.percent
-            memory_total = memory.total / (1024**3)  # GB
-            
-            # Disk metrics
-            disk = psutil.disk_usage('/')
-            disk_usage = disk.percent
-            disk_total = disk.total / (1024**3)  # GB
-            
-            # Load average
-            load_avg = psutil.getloadavg()
-            
-            # Network interfaces
-            net_io = psutil.net_io_counters(pernic=True)
-            network_interfaces = []
-            for name, stats in net_io.items():
-                network_interfaces.append(NetworkInterface(
+            snapshot = get_host_sampler().latest()
+            if snapshot is None:
+                raise GRPCError(Status.UNAVAILABLE, "Host metrics sampler unavailable")
+
+            network_interfaces = [
+                NetworkInterface(
                     name=name,
-                    bytes_sent=stats.bytes_sent,
-                    bytes_received=stats.bytes_recv,
-                    packets_sent=stats.packets_sent,
-                    packets_received=stats.packets_recv
-                ))
-            
-            # Uptime
-            boot_time = int(psutil.boot_time())
-            current_time = int(time.time())
-            uptime_seconds = current_time - boot_time
-            
+                    bytes_sent=nic.bytes_sent,
+                    bytes_received=nic.bytes_recv,
+                    packets_sent=nic.packets_sent,
+                    packets_received=nic.packets_recv
+                )
+                for name, nic in snapshot.network.items()
+            ]
+
             metrics = HostSystemMetrics(
-                cpu_usage=cpu_usage,
-                memory_usage=memory_usage,
-                memory_total=memory_total,
-                disk_usage=disk_usage,
-                disk_total=disk_total,
+                cpu_usage=snapshot.cpu_percent,
+                memory_usage=snapshot.memory_percent,
+                memory_total=snapshot.memory_total / (1024**3),  # GB
+                disk_usage=snapshot.disk_percent,
+                disk_total=snapshot.disk_total / (1024**3),  # GB
                 network_interfaces=network_interfaces,
-                uptime_seconds=uptime_seconds,
-                load_average_1m=load_avg[0],
-                load_average_5m=load_avg[1],
-                load_average_15m=load_avg[2]
+                uptime_seconds=int(time.time() - snapshot.boot_time),
+                load_average_1m=snapshot.load_avg[0],
+                load_average_5m=snapshot.load_avg[1],
+                load_average_15m=snapshot.load_avg[2]
             )
             
             await stream.send_message(metrics)
             
+        except GRPCError:
+            raise
         except Exception as e:
             logger.error(f"Error getting host system metrics: {e}")
             raise GRPCError(Status.INTERNAL, f"Host metrics error: {e}")
 
+    @secure_method(allow_health_check=False)
+    async def GetHostMetricsHistory(
+        self, stream: Stream[HostMetricsQuery, HostMetricsHistory]
+    ) -> None:
+        """Return sampled host metrics history, downsampled to max_points"""
+        query = await stream.recv_message()
+        sampler = get_host_sampler()
+        since = query.since_ms / 1000 if query else 0.0
+        until = query.until_ms / 1000 if query and query.HasField("until_ms") else None
+        max_points = query.max_points if query else 0
+
+        samples = [
+            HostMetricsSample(
+                timestamp_ms=int(snapshot.timestamp * 1000),
+                cpu_usage=snapshot.cpu_percent,
+                memory_usage=snapshot.memory_percent,
+                disk_usage=snapshot.disk_percent,
+                load_average_1m=snapshot.load_avg[0],
+                network_bytes_sent=snapshot.network_bytes_sent,
+                network_bytes_received=snapshot.network_bytes_recv,
+            )
+            for snapshot in sampler.history(since, until, max_points)
+        ]
+        await stream.send_message(
+            HostMetricsHistory(
+                samples=samples,
+                sample_interval_ms=int(sampler.interval * 1000),
+            )
+        )
+
     @secure_method(allow_health_check=False)
     async def OpenHostPort(self, stream: Stream[PortActionRequest, PortActionResponse]) -> None:
         """Open a port on host system firewall"""
@@ -496,7 +585,7 @@ class WildosService(WildosServiceBase):
             backend_stats = {}
             
             for name, backend in self._backends.items():
-                backend_stats[name] = BackendStats(running=backend.running)
+                backend_stats[name] = _backend_stats(backend)
             
             await stream.send_message(AllBackendsStatsResponse(backend_stats=backend_stats))
             
@@ -50,6 +50,10 @@ class WildosServiceBase(abc.ABC):
     async def GetHostSystemMetrics(self, stream: 'grpclib.server.Stream[service_pb2.Empty, service_pb2.HostSystemMetrics]') -> None:
         pass
 
+    @abc.abstractmethod
+    async def GetHostMetricsHistory(self, stream: 'grpclib.server.Stream[service_pb2.HostMetricsQuery, service_pb2.HostMetricsHistory]') -> None:
+        pass
+
     @abc.abstractmethod
     async def OpenHostPort(self, stream: 'grpclib.server.Stream[service_pb2.PortActionRequest, service_pb2.PortActionResponse]') -> None:
         pass
@@ -75,7 +79,7 @@ class WildosServiceBase(abc.ABC):
         pass
 
     @abc.abstractmethod
-    async def StreamPeakEvents(self, stream: 'grpclib.server.Stream[service_pb2.Empty, service_pb2.PeakEvent]') -> None:
+    async def StreamPeakEvents(self, stream: 'grpclib.server.Stream[service_pb2.PeakStreamRequest, service_pb2.PeakEvent]') -> None:
         pass
 
     @abc.abstractmethod
@@ -138,6 +142,12 @@ class WildosServiceBase(abc.ABC):
                 service_pb2.Empty,
                 service_pb2.HostSystemMetrics,
             ),
+            '/wildosnode.WildosService/GetHostMetricsHistory': grpclib.const.Handler(
+                self.GetHostMetricsHistory,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                service_pb2.HostMetricsQuery,
+                service_pb2.HostMetricsHistory,
+            ),
             '/wildosnode.WildosService/OpenHostPort': grpclib.const.Handler(
                 self.OpenHostPort,
                 grpclib.const.Cardinality.UNARY_UNARY,
@@ -177,7 +187,7 @@ class WildosServiceBase(abc.ABC):
             '/wildosnode.WildosService/StreamPeakEvents': grpclib.const.Handler(
                 self.StreamPeakEvents,
                 grpclib.const.Cardinality.UNARY_STREAM,
-                service_pb2.Empty,
+                service_pb2.PeakStreamRequest,
                 service_pb2.PeakEvent,
             ),
             '/wildosnode.WildosService/FetchPeakEvents': grpclib.const.Handler(
@@ -246,6 +256,12 @@ class WildosServiceStub:
             service_pb2.Empty,
             service_pb2.HostSystemMetrics,
         )
+        self.GetHostMetricsHistory = grpclib.client.UnaryUnaryMethod(
+            channel,
+            '/wildosnode.WildosService/GetHostMetricsHistory',
+            service_pb2.HostMetricsQuery,
+            service_pb2.HostMetricsHistory,
+        )
         self.OpenHostPort = grpclib.client.UnaryUnaryMethod(
             channel,
             '/wildosnode.WildosService/OpenHostPort',
@@ -285,7 +301,7 @@ class WildosServiceStub:
         self.StreamPeakEvents = grpclib.client.UnaryStreamMethod(
             channel,
             '/wildosnode.WildosService/StreamPeakEvents',
-            service_pb2.Empty,
+            service_pb2.PeakStreamRequest,
             service_pb2.PeakEvent,
         )
         self.FetchPeakEvents = grpclib.client.UnaryStreamMethod(
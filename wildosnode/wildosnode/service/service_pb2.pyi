@@ -91,7 +91,7 @@ class UsersData(_message.Message):
     def __init__(self, users_data: _Optional[_Iterable[_Union[UserData, _Mapping]]] = ...) -> None: ...
 
 class UsersStats(_message.Message):
-    __slots__ = ("users_stats",)
+    __slots__ = ("users_stats", "backends_status", "online_ips")
     class UserStats(_message.Message):
         __slots__ = ("uid", "usage")
         UID_FIELD_NUMBER: _ClassVar[int]
@@ -99,15 +99,41 @@ class UsersStats(_message.Message):
         uid: int
         usage: int
         def __init__(self, uid: _Optional[int] = ..., usage: _Optional[int] = ...) -> None: ...
+    class BackendStatus(_message.Message):
+        __slots__ = ("name", "ok", "error", "duration_ms")
+        NAME_FIELD_NUMBER: _ClassVar[int]
+        OK_FIELD_NUMBER: _ClassVar[int]
+        ERROR_FIELD_NUMBER: _ClassVar[int]
+        DURATION_MS_FIELD_NUMBER: _ClassVar[int]
+        name: str
+        ok: bool
+        error: str
+        duration_ms: int
+        def __init__(self, name: _Optional[str] = ..., ok: bool = ..., error: _Optional[str] = ..., duration_ms: _Optional[int] = ...) -> None: ...
+    class OnlineIPs(_message.Message):
+        __slots__ = ("uid", "ip_hashes")
+        UID_FIELD_NUMBER: _ClassVar[int]
+        IP_HASHES_FIELD_NUMBER: _ClassVar[int]
+        uid: int
+        ip_hashes: _containers.RepeatedScalarFieldContainer[int]
+        def __init__(self, uid: _Optional[int] = ..., ip_hashes: _Optional[_Iterable[int]] = ...) -> None: ...
     USERS_STATS_FIELD_NUMBER: _ClassVar[int]
+    BACKENDS_STATUS_FIELD_NUMBER: _ClassVar[int]
+    ONLINE_IPS_FIELD_NUMBER: _ClassVar[int]
     users_stats: _containers.RepeatedCompositeFieldContainer[UsersStats.UserStats]
-    def __init__(self, users_stats: _Optional[_Iterable[_Union[UsersStats.UserStats, _Mapping]]] = ...) -> None: ...
+    backends_status: _containers.RepeatedCompositeFieldContainer[UsersStats.BackendStatus]
+    online_ips: _containers.RepeatedCompositeFieldContainer[UsersStats.OnlineIPs]
+    def __init__(self, users_stats: _Optional[_Iterable[_Union[UsersStats.UserStats, _Mapping]]] = ..., backends_status: _Optional[_Iterable[_Union[UsersStats.BackendStatus, _Mapping]]] = ..., online_ips: _Optional[_Iterable[_Union[UsersStats.OnlineIPs, _Mapping]]] = ...) -> None: ...
 
 class LogLine(_message.Message):
-    __slots__ = ("line",)
+    __slots__ = ("line", "lines", "dropped")
     LINE_FIELD_NUMBER: _ClassVar[int]
+    LINES_FIELD_NUMBER: _ClassVar[int]
+    DROPPED_FIELD_NUMBER: _ClassVar[int]
     line: str
-    def __init__(self, line: _Optional[str] = ...) -> None: ...
+    lines: _containers.RepeatedScalarFieldContainer[str]
+    dropped: int
+    def __init__(self, line: _Optional[str] = ..., lines: _Optional[_Iterable[str]] = ..., dropped: _Optional[int] = ...) -> None: ...
 
 class BackendConfig(_message.Message):
     __slots__ = ("configuration", "config_format")
@@ -118,12 +144,20 @@ class BackendConfig(_message.Message):
     def __init__(self, configuration: _Optional[str] = ..., config_format: _Optional[_Union[ConfigFormat, str]] = ...) -> None: ...
 
 class BackendLogsRequest(_message.Message):
-    __slots__ = ("backend_name", "include_buffer")
+    __slots__ = ("backend_name", "include_buffer", "level", "pattern", "user", "batch")
     BACKEND_NAME_FIELD_NUMBER: _ClassVar[int]
     INCLUDE_BUFFER_FIELD_NUMBER: _ClassVar[int]
+    LEVEL_FIELD_NUMBER: _ClassVar[int]
+    PATTERN_FIELD_NUMBER: _ClassVar[int]
+    USER_FIELD_NUMBER: _ClassVar[int]
+    BATCH_FIELD_NUMBER: _ClassVar[int]
     backend_name: str
     include_buffer: bool
-    def __init__(self, backend_name: _Optional[str] = ..., include_buffer: bool = ...) -> None: ...
+    level: str
+    pattern: str
+    user: str
+    batch: bool
+    def __init__(self, backend_name: _Optional[str] = ..., include_buffer: bool = ..., level: _Optional[str] = ..., pattern: _Optional[str] = ..., user: _Optional[str] = ..., batch: bool = ...) -> None: ...
 
 class RestartBackendRequest(_message.Message):
     __slots__ = ("backend_name", "config")
@@ -133,11 +167,25 @@ class RestartBackendRequest(_message.Message):
     config: BackendConfig
     def __init__(self, backend_name: _Optional[str] = ..., config: _Optional[_Union[BackendConfig, _Mapping]] = ...) -> None: ...
 
+class BackendRestartStats(_message.Message):
+    __slots__ = ("mode", "duration", "refused_window", "finished_at")
+    MODE_FIELD_NUMBER: _ClassVar[int]
+    DURATION_FIELD_NUMBER: _ClassVar[int]
+    REFUSED_WINDOW_FIELD_NUMBER: _ClassVar[int]
+    FINISHED_AT_FIELD_NUMBER: _ClassVar[int]
+    mode: str
+    duration: float
+    refused_window: float
+    finished_at: int
+    def __init__(self, mode: _Optional[str] = ..., duration: _Optional[float] = ..., refused_window: _Optional[float] = ..., finished_at: _Optional[int] = ...) -> None: ...
+
 class BackendStats(_message.Message):
-    __slots__ = ("running",)
+    __slots__ = ("running", "last_restart")
     RUNNING_FIELD_NUMBER: _ClassVar[int]
+    LAST_RESTART_FIELD_NUMBER: _ClassVar[int]
     running: bool
-    def __init__(self, running: bool = ...) -> None: ...
+    last_restart: BackendRestartStats
+    def __init__(self, running: bool = ..., last_restart: _Optional[_Union[BackendRestartStats, _Mapping]] = ...) -> None: ...
 
 class HostSystemMetrics(_message.Message):
     __slots__ = ("cpu_usage", "memory_usage", "memory_total", "disk_usage", "disk_total", "network_interfaces", "uptime_seconds", "load_average_1m", "load_average_5m", "load_average_15m")
@@ -177,6 +225,42 @@ class NetworkInterface(_message.Message):
     packets_received: int
     def __init__(self, name: _Optional[str] = ..., bytes_sent: _Optional[int] = ..., bytes_received: _Optional[int] = ..., packets_sent: _Optional[int] = ..., packets_received: _Optional[int] = ...) -> None: ...
 
+class HostMetricsQuery(_message.Message):
+    __slots__ = ("since_ms", "until_ms", "max_points")
+    SINCE_MS_FIELD_NUMBER: _ClassVar[int]
+    UNTIL_MS_FIELD_NUMBER: _ClassVar[int]
+    MAX_POINTS_FIELD_NUMBER: _ClassVar[int]
+    since_ms: int
+    until_ms: int
+    max_points: int
+    def __init__(self, since_ms: _Optional[int] = ..., until_ms: _Optional[int] = ..., max_points: _Optional[int] = ...) -> None: ...
+
+class HostMetricsSample(_message.Message):
+    __slots__ = ("timestamp_ms", "cpu_usage", "memory_usage", "disk_usage", "load_average_1m", "network_bytes_sent", "network_bytes_received")
+    TIMESTAMP_MS_FIELD_NUMBER: _ClassVar[int]
+    CPU_USAGE_FIELD_NUMBER: _ClassVar[int]
+    MEMORY_USAGE_FIELD_NUMBER: _ClassVar[int]
+    DISK_USAGE_FIELD_NUMBER: _ClassVar[int]
+    LOAD_AVERAGE_1M_FIELD_NUMBER: _ClassVar[int]
+    NETWORK_BYTES_SENT_FIELD_NUMBER: _ClassVar[int]
+    NETWORK_BYTES_RECEIVED_FIELD_NUMBER: _ClassVar[int]
+    timestamp_ms: int
+    cpu_usage: float
+    memory_usage: float
+    disk_usage: float
+    load_average_1m: float
+    network_bytes_sent: int
+    network_bytes_received: int
+    def __init__(self, timestamp_ms: _Optional[int] = ..., cpu_usage: _Optional[float] = ..., memory_usage: _Optional[float] = ..., disk_usage: _Optional[float] = ..., load_average_1m: _Optional[float] = ..., network_bytes_sent: _Optional[int] = ..., network_bytes_received: _Optional[int] = ...) -> None: ...
+
+class HostMetricsHistory(_message.Message):
+    __slots__ = ("samples", "sample_interval_ms")
+    SAMPLES_FIELD_NUMBER: _ClassVar[int]
+    SAMPLE_INTERVAL_MS_FIELD_NUMBER: _ClassVar[int]
+    samples: _containers.RepeatedCompositeFieldContainer[HostMetricsSample]
+    sample_interval_ms: int
+    def __init__(self, samples: _Optional[_Iterable[_Union[HostMetricsSample, _Mapping]]] = ..., sample_interval_ms: _Optional[int] = ...) -> None: ...
+
 class PortActionRequest(_message.Message):
     __slots__ = ("port", "protocol")
     PORT_FIELD_NUMBER: _ClassVar[int]
@@ -278,6 +362,12 @@ class PeakEvent(_message.Message):
     seq: int
     def __init__(self, node_id: _Optional[int] = ..., category: _Optional[_Union[PeakCategory, str]] = ..., metric: _Optional[str] = ..., value: _Optional[float] = ..., threshold: _Optional[float] = ..., level: _Optional[_Union[PeakLevel, str]] = ..., dedupe_key: _Optional[str] = ..., context_json: _Optional[str] = ..., started_at_ms: _Optional[int] = ..., resolved_at_ms: _Optional[int] = ..., seq: _Optional[int] = ...) -> None: ...
 
+class PeakStreamRequest(_message.Message):
+    __slots__ = ("after_seq",)
+    AFTER_SEQ_FIELD_NUMBER: _ClassVar[int]
+    after_seq: int
+    def __init__(self, after_seq: _Optional[int] = ...) -> None: ...
+
 class PeakQuery(_message.Message):
     __slots__ = ("since_ms", "until_ms", "category")
     SINCE_MS_FIELD_NUMBER: _ClassVar[int]
@@ -79,6 +79,11 @@ class WildosServiceStub(object):
                 request_serializer=service__pb2.Empty.SerializeToString,
                 response_deserializer=service__pb2.HostSystemMetrics.FromString,
                 _registered_method=True)
+        self.GetHostMetricsHistory = channel.unary_unary(
+                '/wildosnode.WildosService/GetHostMetricsHistory',
+                request_serializer=service__pb2.HostMetricsQuery.SerializeToString,
+                response_deserializer=service__pb2.HostMetricsHistory.FromString,
+                _registered_method=True)
         self.OpenHostPort = channel.unary_unary(
                 '/wildosnode.WildosService/OpenHostPort',
                 request_serializer=service__pb2.PortActionRequest.SerializeToString,
@@ -111,7 +116,7 @@ class WildosServiceStub(object):
                 _registered_method=True)
         self.StreamPeakEvents = channel.unary_stream(
                 '/wildosnode.WildosService/StreamPeakEvents',
-                request_serializer=service__pb2.Empty.SerializeToString,
+                request_serializer=service__pb2.PeakStreamRequest.SerializeToString,
                 response_deserializer=service__pb2.PeakEvent.FromString,
                 _registered_method=True)
         self.FetchPeakEvents = channel.unary_stream(
@@ -179,6 +184,12 @@ class WildosServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetHostMetricsHistory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def OpenHostPort(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -278,6 +289,11 @@ def add_WildosServiceServicer_to_server(servicer, server):
                     request_deserializer=service__pb2.Empty.FromString,
                     response_serializer=service__pb2.HostSystemMetrics.SerializeToString,
             ),
+            'GetHostMetricsHistory': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetHostMetricsHistory,
+                    request_deserializer=service__pb2.HostMetricsQuery.FromString,
+                    response_serializer=service__pb2.HostMetricsHistory.SerializeToString,
+            ),
             'OpenHostPort': grpc.unary_unary_rpc_method_handler(
                     servicer.OpenHostPort,
                     request_deserializer=service__pb2.PortActionRequest.FromString,
@@ -310,7 +326,7 @@ def add_WildosServiceServicer_to_server(servicer, server):
             ),
             'StreamPeakEvents': grpc.unary_stream_rpc_method_handler(
                     servicer.StreamPeakEvents,
-                    request_deserializer=service__pb2.Empty.FromString,
+                    request_deserializer=service__pb2.PeakStreamRequest.FromString,
                     response_serializer=service__pb2.PeakEvent.SerializeToString,
             ),
             'FetchPeakEvents': grpc.unary_stream_rpc_method_handler(
@@ -572,6 +588,33 @@ class WildosService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetHostMetricsHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/wildosnode.WildosService/GetHostMetricsHistory',
+            service__pb2.HostMetricsQuery.SerializeToString,
+            service__pb2.HostMetricsHistory.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def OpenHostPort(request,
             target,
@@ -749,7 +792,7 @@ class WildosService(object):
             request,
             target,
             '/wildosnode.WildosService/StreamPeakEvents',
-            service__pb2.Empty.SerializeToString,
+            service__pb2.PeakStreamRequest.SerializeToString,
             service__pb2.PeakEvent.FromString,
             options,
             channel_credentials,
@@ -0,0 +1,30 @@
+"""Parse backend json configs, only paying for the comment-aware parser when needed"""
+
+import json
+
+import commentjson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_COMMENT_MARKERS = ("//", "/*", "#")
+
+
+def loads(text: str):
+    """
+    parses a json config with the C json parser, falling back to
+    commentjson only when the text may contain comments
+    :param text: the config contents
+    :return: the parsed config
+    :raises ValueError: if the text is not a valid (commented) json document
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(text)
+        return json.loads(text)
+    except ValueError:
+        if not any(marker in text for marker in _COMMENT_MARKERS):
+            raise
+    return commentjson.loads(text)
@@ -0,0 +1,36 @@
+"""Helpers for collecting and merging per-user traffic usages"""
+
+from array import array
+from functools import lru_cache
+from typing import Iterable
+
+
+@lru_cache(maxsize=65536)
+def identifier_uid(identifier: str) -> int:
+    """
+    extracts the user id from a backend identifier such as `12.username`
+    :param identifier: the email/name the backend reports usage under
+    :return: the user id
+    """
+    return int(identifier.partition(".")[0])
+
+
+def merge_usages(usages: Iterable[dict[int, int]]) -> list[tuple[int, int]]:
+    """
+    sums usages reported by several backends into (uid, usage) pairs
+    using a flat array indexed by uid instead of a growing dict
+    :param usages: per-backend mappings of uid to usage
+    :return: list of (uid, usage) pairs with a non-zero usage
+    """
+    usages = [usage for usage in usages if usage]
+    if not usages:
+        return []
+    if len(usages) == 1:
+        return [(uid, value) for uid, value in usages[0].items() if value]
+
+    uids = set().union(*usages)
+    totals = array("Q", bytes(8 * (max(uids) + 1)))
+    for usage in usages:
+        for uid, value in usage.items():
+            totals[uid] += value
+    return [(uid, totals[uid]) for uid in sorted(uids) if totals[uid]]
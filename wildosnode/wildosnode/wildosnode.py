@@ -1,13 +1,17 @@
 """start up and run wildosnode"""
 
+import asyncio
 import logging
 import os
 import sys
+import time
+from typing import Callable
 
 from grpclib.health.service import Health
 from grpclib.server import Server
 from grpclib.utils import graceful_exit
 
+from wildosnode.backends.abstract_backend import VPNBackend
 from wildosnode.backends.hysteria2.hysteria2_backend import HysteriaBackend
 from wildosnode.backends.singbox.singbox_backend import SingBoxBackend
 from wildosnode.backends.xray.xray_backend import XrayBackend
@@ -24,18 +28,35 @@ from wildosnode.config import (
     SING_BOX_CONFIG_PATH,
     SERVICE_ADDRESS,
     SERVICE_PORT,
+    SERVICE_TRANSPORT,
     INSECURE,
     SSL_CERT_FILE,
     SSL_KEY_FILE,
     SSL_CLIENT_CERT_FILE,
 )
+from wildosnode.monitoring import get_host_sampler
 from wildosnode.service import WildosService
+from wildosnode.service.grpcio_server import serve as serve_grpcio, server_credentials
 from wildosnode.storage import MemoryStorage
 from wildosnode.utils.ssl import generate_keypair, create_secure_context
 
 logger = logging.getLogger(__name__)
 
 
+async def _start_backend(
+    name: str, label: str, factory: Callable[[], VPNBackend]
+) -> tuple[str, VPNBackend | None]:
+    """create and start a backend, failures are logged and leave it out"""
+    try:
+        backend = factory()
+        await backend.start()
+    except Exception as e:
+        logger.error("Failed to start %s backend: %s", label, e)
+        return name, None
+    logger.info("%s backend started successfully", label)
+    return name, backend
+
+
 async def main():
     """start up and run xray and the service"""
     if INSECURE:
@@ -73,58 +94,71 @@ async def main():
                     trusted=SSL_CLIENT_CERT_FILE,
                 )
 
+    # start sampling host metrics early so history is available to the panel
+    get_host_sampler()
+
     storage = MemoryStorage()
-    backends = dict()
-    
+    factories = []
+
     if XRAY_ENABLED:
-        try:
-            if not os.path.isfile(XRAY_EXECUTABLE_PATH):
-                logger.error("Xray executable not found at %s", XRAY_EXECUTABLE_PATH)
-            else:
-                xray_backend = XrayBackend(
-                    XRAY_EXECUTABLE_PATH,
-                    XRAY_ASSETS_PATH,
-                    XRAY_CONFIG_PATH,
-                    storage,
-                )
-                await xray_backend.start()
-                backends.update({"xray": xray_backend})
-                logger.info("Xray backend started successfully")
-        except Exception as e:
-            logger.error("Failed to start Xray backend: %s", e)
-    
+        if not os.path.isfile(XRAY_EXECUTABLE_PATH):
+            logger.error("Xray executable not found at %s", XRAY_EXECUTABLE_PATH)
+        else:
+            factories.append(("xray", "Xray", lambda: XrayBackend(
+                XRAY_EXECUTABLE_PATH,
+                XRAY_ASSETS_PATH,
+                XRAY_CONFIG_PATH,
+                storage,
+            )))
+
     if HYSTERIA_ENABLED:
-        try:
-            if not os.path.isfile(HYSTERIA_EXECUTABLE_PATH):
-                logger.error("Hysteria executable not found at %s", HYSTERIA_EXECUTABLE_PATH)
-            else:
-                hysteria_backend = HysteriaBackend(
-                    HYSTERIA_EXECUTABLE_PATH, HYSTERIA_CONFIG_PATH, storage
-                )
-                await hysteria_backend.start()
-                backends.update({"hysteria2": hysteria_backend})
-                logger.info("Hysteria backend started successfully")
-        except Exception as e:
-            logger.error("Failed to start Hysteria backend: %s", e)
-    
+        if not os.path.isfile(HYSTERIA_EXECUTABLE_PATH):
+            logger.error("Hysteria executable not found at %s", HYSTERIA_EXECUTABLE_PATH)
+        else:
+            factories.append(("hysteria2", "Hysteria", lambda: HysteriaBackend(
+                HYSTERIA_EXECUTABLE_PATH, HYSTERIA_CONFIG_PATH, storage
+            )))
+
     if SING_BOX_ENABLED:
-        try:
-            if not os.path.isfile(SING_BOX_EXECUTABLE_PATH):
-                logger.error("Sing-box executable not found at %s", SING_BOX_EXECUTABLE_PATH)
-            else:
-                sing_box_backend = SingBoxBackend(
-                    SING_BOX_EXECUTABLE_PATH, SING_BOX_CONFIG_PATH, storage
-                )
-                await sing_box_backend.start()
-                backends.update({"sing-box": sing_box_backend})
-                logger.info("Sing-box backend started successfully")
-        except Exception as e:
-            logger.error("Failed to start Sing-box backend: %s", e)
+        if not os.path.isfile(SING_BOX_EXECUTABLE_PATH):
+            logger.error("Sing-box executable not found at %s", SING_BOX_EXECUTABLE_PATH)
+        else:
+            factories.append(("sing-box", "Sing-box", lambda: SingBoxBackend(
+                SING_BOX_EXECUTABLE_PATH, SING_BOX_CONFIG_PATH, storage
+            )))
+
+    # backends don't depend on each other, so they are started concurrently
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(_start_backend(name, label, factory) for name, label, factory in factories)
+    )
+    backends = {name: backend for name, backend in results if backend is not None}
+    if factories:
+        logger.info(
+            "Backends started in %.3fs: %s",
+            time.perf_counter() - started,
+            ", ".join(
+                f"{name} {sum(backend.startup_timings.values()):.3f}s"
+                for name, backend in backends.items()
+            ) or "none",
+        )
 
     if not backends:
         logger.warning("No backends enabled or successfully started. Service will run with no backends.")
     
-    server = Server([WildosService(storage, backends), Health()])
+    service = WildosService(storage, backends)
+    if SERVICE_TRANSPORT == "grpcio":
+        credentials = None
+        if ssl_context is not None:
+            credentials = server_credentials(
+                SSL_CERT_FILE,
+                SSL_KEY_FILE,
+                SSL_CLIENT_CERT_FILE if os.path.isfile(SSL_CLIENT_CERT_FILE) else None,
+            )
+        await serve_grpcio([service], SERVICE_ADDRESS, SERVICE_PORT, credentials)
+        return
+
+    server = Server([service, Health()])
 
     with graceful_exit([server]):
         await server.start(SERVICE_ADDRESS, SERVICE_PORT, ssl=ssl_context)